@@ -0,0 +1,243 @@
+import asyncio
+from typing import Optional, TypedDict
+import tempfile
+import shlex
+import time
+import os
+import re
+
+_RECEIVED_BYTES = re.compile(r"Total bytes received:\s*([\d,.]+)")
+_SENT_RECEIVED = re.compile(r"sent ([\d,.]+) bytes\s+received ([\d,.]+) bytes")
+
+# rsync 종료 코드 24: 전송 중 원본 파일이 사라짐 (학습 중 체크포인트 정리 등). 나머지는 정상 전송되었으므로 성공으로 봄
+_VANISHED_SOURCE_FILES = 24
+
+
+class PodSyncInfo(TypedDict):
+    pod_id: str
+    pod_ssh_public_ip: str
+    pod_user: str
+    pod_ssh_port: str
+    identity_file: str
+    source_dir: str
+    target_dir: str
+
+
+class StreamResult(TypedDict):
+    index: int
+    files: int
+    planned_bytes: int     # 목록 기준 파일 크기 합
+    bytes: int             # 실제로 받은 바이트 수 (rsync --stats, 변경분만 전송되므로 planned보다 작을 수 있음)
+    seconds: float
+    throughput_kbps: float
+    returncode: int
+    error: str
+
+
+class RsyncResult(TypedDict):
+    ok: bool
+    returncode: int
+    bytes: int
+    error: str
+    streams: list[StreamResult]
+
+
+class ParallelRsync:
+    """
+    pod의 source_dir을 여러 rsync 스트림으로 나눠 받음
+
+    1. ControlMaster로 SSH 연결 하나를 열고, 파일 목록 조회와 모든 스트림이 이 연결을 같이 씀
+    2. 파일을 크기 기준으로 K개 묶음에 나눠 담고(큰 파일부터 가장 가벼운 묶음에) --files-from으로 동시에 전송
+    3. 모든 스트림이 성공하면 --delete --ignore-existing으로 한 번 더 실행해
+       목록 조회 이후 생긴 파일/빈 디렉터리를 받고 원본에 없는 파일을 지움 (단일 rsync --delete와 같은 결과)
+
+    전체 크기가 parallel_min_bytes보다 작거나 streams가 1이면 rsync 하나로 전송한다.
+    """
+
+    def __init__(
+        self,
+        info: PodSyncInfo,
+        streams: int = 4,
+        bwlimit_kbps: int = 0,
+        rsync_options: Optional[list[str]] = None,
+        parallel_min_bytes: int = 256 * 1024 * 1024,
+        control_dir: str = "/tmp"
+    ):
+        """
+        :param bwlimit_kbps: 전체 대역폭 상한(KB/s). 스트림마다 똑같이 나눠 적용. 0이면 제한 없음
+        """
+        self.info = info
+        self.streams = max(1, streams)
+        self.bwlimit_kbps = bwlimit_kbps
+        self.rsync_options = rsync_options or ["-az", "--delete"]
+        self.parallel_min_bytes = parallel_min_bytes
+        self.control_path = os.path.join(control_dir, f"dolab-sync-{info['pod_id']}.sock")
+        self.remote = f'{info["pod_user"]}@{info["pod_ssh_public_ip"]}'
+
+    async def run(self) -> RsyncResult:
+        if self.streams == 1:
+            return await self._single()
+
+        if not await self._open_master():
+            print(f"[{self.info['pod_id']}] SSH ControlMaster 연결 실패, rsync 하나로 전송")
+            return await self._single()
+        try:
+            files = await self._list_files()
+            if files is None or sum(size for size, _ in files) < self.parallel_min_bytes:
+                return await self._single(shared=True)
+            return await self._parallel(files)
+        finally:
+            await self._close_master()
+
+    # ---------------------------------------------------------------- 전송
+
+    async def _single(self, shared: bool = False) -> RsyncResult:
+        stream = await self._rsync(0, self.rsync_options, self.bwlimit_kbps, shared=shared)
+        return {
+            "ok": stream["returncode"] == 0,
+            "returncode": stream["returncode"],
+            "bytes": stream["bytes"],
+            "error": stream["error"],
+            "streams": [stream],
+        }
+
+    async def _parallel(self, files: list[tuple[int, str]]) -> RsyncResult:
+        buckets = _partition(files, self.streams)
+        stream_options = [option for option in self.rsync_options if not option.startswith("--delete")]
+        per_stream_bwlimit = max(1, self.bwlimit_kbps // len(buckets)) if self.bwlimit_kbps > 0 else 0
+
+        list_paths = []
+        try:
+            for bucket in buckets:
+                with tempfile.NamedTemporaryFile("wb", prefix="dolab-sync-", suffix=".list", delete=False) as f:
+                    f.write(b"\0".join(path.encode(errors="surrogateescape") for _, path in bucket) + b"\0")
+                    list_paths.append(f.name)
+
+            streams = list(await asyncio.gather(*(
+                self._rsync(index, stream_options + ["--from0", f"--files-from={list_path}"], per_stream_bwlimit,
+                            shared=True, files=len(bucket), planned_bytes=sum(size for size, _ in bucket))
+                for index, (bucket, list_path) in enumerate(zip(buckets, list_paths))
+            )))
+        finally:
+            for list_path in list_paths:
+                os.remove(list_path)
+
+        failed = [stream for stream in streams if stream["returncode"] != 0]
+        if not failed:
+            # 스트림으로 받은 파일은 건너뛰고, 그 사이 생긴 파일/빈 디렉터리만 받으면서 원본에 없는 파일 삭제
+            reconcile_options = stream_options + ["--ignore-existing"]
+            if any(option.startswith("--delete") for option in self.rsync_options):
+                reconcile_options.append("--delete")
+            streams.append(await self._rsync(len(streams), reconcile_options, self.bwlimit_kbps, shared=True))
+            failed = [stream for stream in streams if stream["returncode"] != 0]
+
+        return {
+            "ok": not failed,
+            "returncode": failed[0]["returncode"] if failed else 0,
+            "bytes": sum(stream["bytes"] for stream in streams),
+            "error": "\n".join(f"[stream {stream['index']}] {stream['error']}" for stream in failed),
+            "streams": streams,
+        }
+
+    async def _rsync(
+        self,
+        index: int,
+        options: list[str],
+        bwlimit_kbps: int,
+        shared: bool,
+        files: int = 0,
+        planned_bytes: int = 0
+    ) -> StreamResult:
+        command = ["rsync", *options, "--stats", "-e", " ".join(self._ssh_options(shared))]
+        if bwlimit_kbps > 0:
+            command.append(f"--bwlimit={bwlimit_kbps}")
+        command += [f'{self.remote}:{self.info["source_dir"]}', self.info["target_dir"]]
+
+        start = time.time()
+        process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
+        seconds = time.time() - start
+
+        returncode = process.returncode or 0
+        if returncode == _VANISHED_SOURCE_FILES:
+            returncode = 0
+        received = _received_bytes(stdout.decode(errors="replace"))
+        return {
+            "index": index,
+            "files": files,
+            "planned_bytes": planned_bytes,
+            "bytes": received,
+            "seconds": seconds,
+            "throughput_kbps": received / 1024 / seconds if seconds > 0 else 0.0,
+            "returncode": returncode,
+            "error": stderr.decode(errors="replace").strip()[-500:] if returncode != 0 else "",
+        }
+
+    # ---------------------------------------------------------------- SSH
+
+    def _ssh_options(self, shared: bool) -> list[str]:
+        options = [
+            "ssh",
+            "-i", self.info["identity_file"],
+            "-p", str(self.info["pod_ssh_port"]),
+            "-o", "StrictHostKeyChecking=no",
+            "-o", "IPQoS=throughput",
+        ]
+        if shared:
+            options += ["-o", "ControlMaster=no", "-o", f"ControlPath={self.control_path}"]
+        return options
+
+    async def _open_master(self) -> bool:
+        process = await asyncio.create_subprocess_exec(
+            *self._ssh_options(shared=False),
+            "-o", "ControlMaster=yes", "-o", f"ControlPath={self.control_path}", "-o", "ControlPersist=60",
+            "-fN", self.remote,
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            print(f"[{self.info['pod_id']}] ControlMaster 오류: {stderr.decode(errors='replace').strip()}")
+        return process.returncode == 0
+
+    async def _close_master(self) -> None:
+        process = await asyncio.create_subprocess_exec(
+            "ssh", "-o", f"ControlPath={self.control_path}", "-O", "exit", self.remote,
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+        await process.wait()
+
+    async def _list_files(self) -> Optional[list[tuple[int, str]]]:
+        """원본 파일 목록 [(크기, source_dir 기준 상대 경로)]. 실패하면 None"""
+        remote_command = f"cd {shlex.quote(self.info['source_dir'])} && find . -type f -printf '%s\\t%P\\0'"
+        process = await asyncio.create_subprocess_exec(
+            *self._ssh_options(shared=True), self.remote, remote_command,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            print(f"[{self.info['pod_id']}] 파일 목록 조회 실패: {stderr.decode(errors='replace').strip()}")
+            return None
+
+        files = []
+        for entry in stdout.split(b"\0"):
+            size, _, path = entry.partition(b"\t")
+            if path:
+                files.append((int(size), path.decode(errors="surrogateescape")))
+        return files
+
+
+def _partition(files: list[tuple[int, str]], streams: int) -> list[list[tuple[int, str]]]:
+    """큰 파일부터 현재 가장 가벼운 묶음에 넣어 스트림별 전송량을 비슷하게 맞춤 (빈 묶음은 제외)"""
+    buckets: list[list[tuple[int, str]]] = [[] for _ in range(min(streams, len(files)))]
+    loads = [0] * len(buckets)
+    for size, path in sorted(files, reverse=True):
+        index = loads.index(min(loads))
+        buckets[index].append((size, path))
+        # 작은 파일도 파일마다 왕복 비용이 있으므로 최소 가중치를 둠
+        loads[index] += max(size, 64 * 1024)
+    return [bucket for bucket in buckets if bucket]
+
+
+def _received_bytes(stats: str) -> int:
+    match = _RECEIVED_BYTES.search(stats)
+    if match:
+        return int(float(match.group(1).replace(",", "")))
+    match = _SENT_RECEIVED.search(stats)
+    return int(float(match.group(2).replace(",", ""))) if match else 0
@@ -15,15 +15,42 @@ MODEL_TIMESTAMP=$(date +"$TIMESTAMP_FORMAT")
 MODEL_ARCHIVE_NAME="${MODEL_BASENAME}_${MODEL_TIMESTAMP}.${ARCHIVE_FORMAT}"
 MODEL_ARCHIVE_PATH="${SOURCE_DIR}/${MODEL_ARCHIVE_NAME}"
 
+MANIFEST="${MODEL_DIR%/}/manifest.json"
+SYNCED_LIST="${MODEL_DIR%/}/.synced"
+
+# manifest가 있으면 아직 전송하지 않은 체크포인트와 manifest만 압축
+if [ -f "$MANIFEST" ]; then
+    touch "$SYNCED_LIST"
+    FILES=("${MODEL_BASENAME}/manifest.json")
+    NEW_CHECKPOINTS=()
+    while IFS= read -r CKPT; do
+        if ! grep -qxF "$CKPT" "$SYNCED_LIST"; then
+            FILES+=("${MODEL_BASENAME}/${CKPT}")
+            NEW_CHECKPOINTS+=("$CKPT")
+        fi
+    done < <(jq -r '.checkpoints[].file' "$MANIFEST")
+
+    if [ ${#NEW_CHECKPOINTS[@]} -eq 0 ]; then
+        echo "새 체크포인트가 없습니다. manifest만 전송합니다."
+    fi
+else
+    FILES=("$MODEL_BASENAME")
+    NEW_CHECKPOINTS=()
+fi
+
 if [ "$ARCHIVE_FORMAT" = "tar.gz" ]; then
-    tar -czf "$MODEL_ARCHIVE_PATH" -C "$(dirname "$MODEL_DIR")" "$MODEL_BASENAME"
+    tar -czf "$MODEL_ARCHIVE_PATH" -C "$(dirname "$MODEL_DIR")" "${FILES[@]}"
 elif [ "$ARCHIVE_FORMAT" = "zip" ]; then
-    zip -r "$MODEL_ARCHIVE_PATH" "$MODEL_DIR"
+    (cd "$(dirname "$MODEL_DIR")" && zip -r "$MODEL_ARCHIVE_PATH" "${FILES[@]}")
 else
     echo "지원하지 않는 압축 형식입니다: $ARCHIVE_FORMAT"
     exit 1
 fi
 
+if [ ${#NEW_CHECKPOINTS[@]} -gt 0 ]; then
+    printf '%s\n' "${NEW_CHECKPOINTS[@]}" >> "$SYNCED_LIST"
+fi
+
 echo "모델 압축 완료: $MODEL_ARCHIVE_PATH"
 
 # WebSocket 서버에 sync 신호 전송 (Unix 도메인 소켓 사용)
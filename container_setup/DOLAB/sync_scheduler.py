@@ -0,0 +1,202 @@
+import asyncio
+from parallel_rsync import ParallelRsync, PodSyncInfo, StreamResult
+from typing import Optional, TypedDict
+import itertools
+import json
+import time
+
+PRIORITY_FINAL = 0      # terminate 직전의 마지막 sync (가장 먼저 실행)
+PRIORITY_PERIODIC = 1   # 체크포인트마다 들어오는 sync
+
+
+class SyncResult(TypedDict):
+    pod_id: str
+    priority: int
+    ok: bool
+    returncode: int
+    bytes: int             # pod에서 받은 바이트 수 (rsync --stats)
+    seconds: float
+    throughput_kbps: float
+    bwlimit_kbps: int      # 이 전송에 적용한 대역폭 제한 (0: 제한 없음)
+    waited: float          # 대기열에서 기다린 시간(초)
+    error: str
+    streams: list[StreamResult]   # rsync 스트림별 전송량/처리량
+
+
+class _SyncRequest:
+    def __init__(self, info: PodSyncInfo, priority: int):
+        self.info = info
+        self.priority = priority
+        self.submitted = time.time()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class SyncScheduler:
+    """
+    pod → 컨테이너 rsync 전송 스케줄러
+
+    - 동시에 실행하는 전송 수를 max_concurrent로 제한
+    - 전체 대역폭 상한을 max_concurrent로 나눈 몫을 전송마다 rsync --bwlimit으로 적용 (pod별 상한이 더 작으면 그 값)
+    - terminate 직전의 마지막 sync를 주기적 sync보다 먼저 실행하고,
+      같은 pod의 sync가 이미 대기 중이면 새로 쌓지 않고 기존 요청에 합침 (rsync는 최신 상태를 한 번에 가져옴)
+    - 큰 디렉터리는 ParallelRsync로 streams개의 rsync를 동시에 실행 (대역폭 제한은 스트림끼리 나눔)
+    - ssh는 IPQoS=throughput으로 실행해 대화형 SSH 세션이 밀리지 않도록 함
+    - 전송마다 받은 바이트 수와 처리량을 기록 (stats_path, JSON Lines)
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        bwlimit_kbps: int = 0,
+        per_pod_bwlimit_kbps: int = 0,
+        stats_path: Optional[str] = None,
+        rsync_options: Optional[list[str]] = None,
+        streams: int = 1,
+        parallel_min_bytes: int = 256 * 1024 * 1024
+    ):
+        """
+        :param bwlimit_kbps: 전체 대역폭 상한(KB/s). 0이면 제한 없음
+        :param per_pod_bwlimit_kbps: pod 하나의 전송 대역폭 상한(KB/s). 0이면 제한 없음
+        :param streams: 전송 하나에 쓸 rsync 스트림 수
+        :param parallel_min_bytes: 원본 크기가 이보다 작으면 스트림을 나누지 않음
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.bwlimit_kbps = bwlimit_kbps
+        self.per_pod_bwlimit_kbps = per_pod_bwlimit_kbps
+        self.stats_path = stats_path
+        self.rsync_options = rsync_options or ["-az", "--delete"]
+        self.streams = max(1, streams)
+        self.parallel_min_bytes = parallel_min_bytes
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._pending: dict[str, _SyncRequest] = {}
+        self._parked: dict[str, _SyncRequest] = {}   # 같은 pod의 전송이 끝나길 기다리는 요청 (끝나면 다시 대기열로)
+        self._running: dict[str, int] = {}
+        self._counter = itertools.count()
+        self._workers: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrent)]
+
+    async def close(self) -> None:
+        """대기 중인 전송까지 마친 뒤 종료"""
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    def submit(self, info: PodSyncInfo, priority: int = PRIORITY_PERIODIC) -> asyncio.Future:
+        """sync 요청. 완료되면 SyncResult가 담기는 Future 반환"""
+        self.start()
+        pending = self._pending.get(info["pod_id"])
+        if pending is not None:
+            if priority < pending.priority:
+                # 대기 중인 요청을 더 높은 우선순위로 다시 넣음 (이전 항목은 꺼낼 때 무시)
+                pending.priority = priority
+                self._queue.put_nowait((priority, next(self._counter), pending))
+            return pending.future
+
+        request = _SyncRequest(info, priority)
+        self._pending[info["pod_id"]] = request
+        self._queue.put_nowait((priority, next(self._counter), request))
+        return request.future
+
+    def status(self) -> dict:
+        return {
+            "queued": {pod_id: request.priority for pod_id, request in self._pending.items()},
+            "running": dict(self._running),
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            priority, _, request = await self._queue.get()
+            pod_id = request.info["pod_id"]
+            try:
+                # 우선순위가 올라가 다시 들어간 요청의 이전 항목, 또는 이미 다른 작업자가 꺼낸 요청
+                if priority != request.priority or request.future.done() or self._pending.get(pod_id) is not request:
+                    continue
+                # 같은 pod는 한 번에 하나만 전송 (--delete가 겹치지 않도록). 실행 중이면 작업자를 잡고 기다리지 않고
+                # 옆에 두었다가 그 전송이 끝날 때 다시 대기열에 넣음 (그 사이 들어온 sync는 이 요청에 합쳐짐)
+                if pod_id in self._running:
+                    self._parked[pod_id] = request
+                    continue
+                # 확인과 꺼내기 사이에 await가 없으므로 다른 작업자가 같은 요청을 가져가지 못함
+                del self._pending[pod_id]
+                result = await self._transfer(request)
+                if not request.future.done():
+                    request.future.set_result(result)
+            except Exception as e:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def _bwlimit(self) -> int:
+        """
+        새 전송에 줄 대역폭(KB/s)
+
+        rsync --bwlimit은 시작 후 바꿀 수 없으므로 실행 중인 전송 수가 아니라 최대 동시 전송 수로 나눔.
+        이후 전송이 더 시작되어도 합계가 전체 상한을 넘지 않음
+        """
+        limits = []
+        if self.bwlimit_kbps > 0:
+            limits.append(max(1, self.bwlimit_kbps // self.max_concurrent))
+        if self.per_pod_bwlimit_kbps > 0:
+            limits.append(self.per_pod_bwlimit_kbps)
+        return min(limits) if limits else 0
+
+    async def _transfer(self, request: _SyncRequest) -> SyncResult:
+        info = request.info
+        bwlimit = self._bwlimit()
+        self._running[info["pod_id"]] = bwlimit
+
+        engine = ParallelRsync(info, streams=self.streams, bwlimit_kbps=bwlimit, rsync_options=self.rsync_options,
+                               parallel_min_bytes=self.parallel_min_bytes)
+        start = time.time()
+        try:
+            transfer = await engine.run()
+        finally:
+            del self._running[info["pod_id"]]
+            # 이 전송을 기다리던 같은 pod의 요청을 다시 대기열로 (작업이 끝나기 전에 넣어 close()의 join이 기다리도록)
+            parked = self._parked.pop(info["pod_id"], None)
+            if parked is not None and self._pending.get(info["pod_id"]) is parked:
+                self._queue.put_nowait((parked.priority, next(self._counter), parked))
+
+        seconds = time.time() - start
+        result: SyncResult = {
+            "pod_id": info["pod_id"],
+            "priority": request.priority,
+            "ok": transfer["ok"],
+            "returncode": transfer["returncode"],
+            "bytes": transfer["bytes"],
+            "seconds": seconds,
+            "throughput_kbps": transfer["bytes"] / 1024 / seconds if seconds > 0 else 0.0,
+            "bwlimit_kbps": bwlimit,
+            "waited": start - request.submitted,
+            "error": transfer["error"],
+            "streams": transfer["streams"],
+        }
+        received = result["bytes"]
+
+        kind = "마지막 sync" if request.priority == PRIORITY_FINAL else "sync"
+        if result["ok"]:
+            print(f"[{info['pod_id']}] {kind} 완료: {received / 1024 / 1024:.1f}MB, {seconds:.1f}s, "
+                  f"{result['throughput_kbps']:.0f}KB/s (제한 {bwlimit or '없음'}, 대기 {result['waited']:.1f}s)")
+            if len(result["streams"]) > 1:
+                for stream in result["streams"]:
+                    print(f"  stream {stream['index']}: 파일 {stream['files']}개, {stream['bytes'] / 1024 / 1024:.1f}MB, "
+                          f"{stream['seconds']:.1f}s, {stream['throughput_kbps']:.0f}KB/s")
+        else:
+            print(f"[{info['pod_id']}] {kind} 실패 (rc={result['returncode']}): {result['error']}")
+        self._record(result)
+        return result
+
+    def _record(self, result: SyncResult) -> None:
+        if not self.stats_path:
+            return
+        try:
+            with open(self.stats_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"ts": time.time(), **result}, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"sync 통계 기록 실패: {e}")
+
@@ -1,69 +1,120 @@
 import asyncio
 import websockets
-import subprocess
+import glob
 import json
 import os
+from sync_scheduler import PRIORITY_FINAL, PRIORITY_PERIODIC, PodSyncInfo, SyncScheduler
 
 WEBSOCKET_CONFIG_PATH = "/root/DOLAB/websocket_config.json"
-POD_INFO_PATH = "/root/DOLAB/pod_info.json"
-
-
-def run_sync():
-    try:
-        with open(POD_INFO_PATH, "r", encoding="utf-8") as f:
-            pod_info = json.load(f)
-        with open(WEBSOCKET_CONFIG_PATH, "r", encoding="utf-8") as f:
-            config = json.load(f)
-
-        source_dir = config["source_dir"]
-        target_dir = config["target_dir"]
-
-        ssh_opts = [
-            "ssh",
-            "-i", pod_info["identity_file"],
-            "-p", str(pod_info["pod_ssh_port"]),
-            "-o", "StrictHostKeyChecking=no"
-        ]
-        rsync_cmd = [
-            "rsync", "-avz", "--delete",
-            "-e", " ".join(ssh_opts),
-            f'{pod_info["pod_user"]}@{pod_info["pod_ssh_public_ip"]}:{source_dir}',
-            f"{target_dir}"
-        ]
-        result = subprocess.run(rsync_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print("sync 실패:", result.stderr)
-            return False
-        print("sync 완료:", result.stdout)
-        return True
-    except Exception as e:
-        print("sync 예외:", e)
-        return False
-
-
-async def listen():
-    with open(POD_INFO_PATH, "r", encoding="utf-8") as f:
-        pod_info = json.load(f)
+POD_INFO_PATH = "/root/DOLAB/pod_info.json"   # 이전 방식: pod 하나 (target_dir로 바로 동기화)
+POD_INFO_DIR = "/root/DOLAB/pods"             # pod별 정보: pods/<pod_id>.json (target_dir/<sync_dir 또는 pod_id>/로 동기화)
+SYNC_STATS_PATH = "/root/DOLAB/sync_stats.jsonl"
+POD_SCAN_INTERVAL = 5
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_pod_infos() -> list[str]:
+    paths = sorted(glob.glob(os.path.join(POD_INFO_DIR, "*.json")))
+    if os.path.exists(POD_INFO_PATH):
+        paths.append(POD_INFO_PATH)
+    return paths
+
+
+def build_sync_info(pod_info_path, pod_info, config) -> PodSyncInfo:
+    target_dir = config["target_dir"]
+    # 여러 pod가 같은 컨테이너로 동기화하므로 pod마다 디렉터리를 나눠 --delete가 서로의 파일을 지우지 않도록 함
+    if pod_info_path != POD_INFO_PATH:
+        target_dir = os.path.join(target_dir, pod_info.get("sync_dir", pod_info["pod_id"]), "")
+        os.makedirs(target_dir, exist_ok=True)
+    return {
+        "pod_id": pod_info["pod_id"],
+        "pod_ssh_public_ip": pod_info["pod_ssh_public_ip"],
+        "pod_user": pod_info["pod_user"],
+        "pod_ssh_port": str(pod_info["pod_ssh_port"]),
+        "identity_file": os.path.expanduser(pod_info["identity_file"]),
+        "source_dir": config["source_dir"],
+        "target_dir": target_dir,
+    }
+
+
+def log_failure(future):
+    if not future.cancelled() and future.exception():
+        print("sync 예외:", future.exception())
+
+
+async def listen(pod_info_path, config, scheduler: SyncScheduler):
+    pod_info = load_json(pod_info_path)
+    sync_info = build_sync_info(pod_info_path, pod_info, config)
     uri = f'wss://{pod_info["pod_id"]}-8080.proxy.runpod.net/ws'
     async with websockets.connect(uri, ping_interval=None) as websocket:
-        print("서버에 연결됨.")
+        print(f"[{pod_info['pod_id']}] 서버에 연결됨.")
         while True:
-            message = await websocket.recv()
-            print(f"수신 메시지: {message}")
+            # 풀 임대가 끝나 pod 정보 파일이 지워지면 연결을 끊음 (pod는 다음 임대에서 다른 디렉터리로 동기화)
+            try:
+                message = await asyncio.wait_for(websocket.recv(), timeout=POD_SCAN_INTERVAL)
+            except asyncio.TimeoutError:
+                message = None
+            if not os.path.exists(pod_info_path):
+                print(f"[{pod_info['pod_id']}] pod 정보 파일 삭제됨: 동기화 종료")
+                return
+            if message is None:
+                continue
+            print(f"[{pod_info['pod_id']}] 수신 메시지: {message}")
 
             if message == "sync":
-                await asyncio.to_thread(run_sync)
+                # 기다리지 않고 다음 메시지를 받음 (대기 중인 sync가 있으면 하나로 합쳐짐)
+                scheduler.submit(sync_info, PRIORITY_PERIODIC).add_done_callback(log_failure)
             elif message == "terminate":
-                print("terminate 신호 수신: 마지막 sync 후 종료")
-                run_sync()
-                with open(POD_INFO_PATH, "r", encoding="utf-8") as f:
-                    pod_info = json.load(f)
+                print(f"[{pod_info['pod_id']}] terminate 신호 수신: 마지막 sync 후 종료")
+                try:
+                    await scheduler.submit(sync_info, PRIORITY_FINAL)
+                except Exception as e:
+                    print("sync 예외:", e)
                 import runpod
                 runpod.api_key = pod_info["runpod_api_key"]
                 runpod.terminate_pod(pod_id=pod_info["pod_id"])
 
-                os.remove(POD_INFO_PATH)
+                os.remove(pod_info_path)
+                return
+
+
+async def main():
+    config = load_json(WEBSOCKET_CONFIG_PATH)
+    sync_config = config.get("sync", {})
+    scheduler = SyncScheduler(
+        max_concurrent=sync_config.get("max_concurrent", 2),
+        bwlimit_kbps=sync_config.get("bwlimit_kbps", 0),
+        per_pod_bwlimit_kbps=sync_config.get("per_pod_bwlimit_kbps", 0),
+        stats_path=sync_config.get("stats_path", SYNC_STATS_PATH),
+        streams=sync_config.get("streams", 1),
+        parallel_min_bytes=sync_config.get("parallel_min_mb", 256) * 1024 * 1024
+    )
+
+    # pod 정보 파일이 추가되면 연결하고, 연결이 끊겼는데 파일이 남아 있으면 다시 연결
+    listeners: dict[str, asyncio.Task] = {}
+    connected_once = False
+    while True:
+        for path in find_pod_infos():
+            task = listeners.get(path)
+            if task is None or task.done():
+                if task is not None and not task.cancelled() and task.exception():
+                    print(f"연결 종료 ({path}): {task.exception()}")
+                listeners[path] = asyncio.create_task(listen(path, config, scheduler))
+                connected_once = True
+
+        for path, task in list(listeners.items()):
+            if task.done() and not os.path.exists(path):
+                del listeners[path]
+
+        if connected_once and not listeners:
+            break
+        await asyncio.sleep(POD_SCAN_INTERVAL)
 
-                os._exit(0)
+    await scheduler.close()
+    os._exit(0)
 
-asyncio.run(listen())
+asyncio.run(main())
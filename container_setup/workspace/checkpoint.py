@@ -0,0 +1,221 @@
+import torch
+from typing import Any, Literal, Optional, TypedDict
+from logger import Log
+import threading
+import hashlib
+import queue
+import json
+import time
+import os
+
+MANIFEST_NAME = "manifest.json"
+
+
+class CheckpointEntry(TypedDict):
+    file: str
+    epoch: int
+    step: int
+    metric: Optional[float]
+    sha256: str
+    size: int
+    created: float
+
+
+def _to_cpu(obj: Any) -> Any:
+    """state를 CPU로 복사 (학습이 계속 갱신해도 안전하도록 CPU 텐서도 clone)"""
+    if isinstance(obj, torch.Tensor):
+        if obj.device.type == "cpu":
+            return obj.detach().clone()
+        return obj.detach().to("cpu", non_blocking=True)
+    if isinstance(obj, dict):
+        return {key: _to_cpu(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_to_cpu(value) for value in obj)
+    return obj
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write_json(path: str, data: Any) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class CheckpointManager:
+    """
+    비동기 체크포인트 저장 관리자
+
+    - state를 CPU로 복사한 뒤 백그라운드 스레드에서 직렬화
+    - 임시 파일에 기록 후 fsync + 원자적 rename으로 교체
+    - 최근 keep_last개와 best 체크포인트만 유지
+    - manifest.json에 유효한 체크포인트 목록 기록 (sync.sh가 새 체크포인트만 전송하는 데 사용)
+    """
+
+    def __init__(self, save_dir: str, keep_last: int = 3, mode: Literal["min", "max"] = "min", prefix: str = "ckpt"):
+        if keep_last < 1:
+            raise ValueError("keep_last는 1 이상이어야 합니다.")
+        self.save_dir = save_dir
+        self.keep_last = keep_last
+        self.mode = mode
+        self.prefix = prefix
+        self.manifest_path = os.path.join(save_dir, MANIFEST_NAME)
+        os.makedirs(save_dir, exist_ok=True)
+
+        self._manifest = self._read_manifest()
+        # 대기열 크기를 1로 제한해 직렬화가 밀릴 경우 CPU 사본이 메모리에 쌓이지 않도록 함
+        self._queue: "queue.Queue[tuple[dict, int, int, Optional[float]] | None]" = queue.Queue(maxsize=1)
+        self._error: Optional[BaseException] = None
+        self._worker = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._worker.start()
+
+    def save(self, state: dict, epoch: int, step: int = 0, metric: Optional[float] = None) -> None:
+        """state를 CPU로 복사한 뒤 백그라운드 저장을 예약 (학습 스레드는 복사 시간만 대기)"""
+        self._raise_pending_error()
+        cpu_state = _to_cpu(state)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()  # non_blocking 복사 완료 보장
+        self._queue.put((cpu_state, epoch, step, metric))
+
+    def wait(self) -> None:
+        """예약된 저장이 모두 끝날 때까지 대기"""
+        self._queue.join()
+        self._raise_pending_error()
+
+    def close(self) -> None:
+        self.wait()
+        self._queue.put(None)
+        self._worker.join()
+
+    def load_latest(self, resume_dir: Optional[str] = None, map_location: Any = "cpu") -> Optional[tuple[dict, CheckpointEntry]]:
+        """
+        가장 최근의 유효한 체크포인트를 불러온다.
+
+        manifest의 항목을 최신순으로 sha256 검증하며, 손상되었거나 없는 파일은 건너뛴다.
+
+        :param resume_dir: 체크포인트 디렉터리 (기본값: save_dir)
+        :return: (state, entry) 또는 유효한 체크포인트가 없으면 None
+        """
+        resume_dir = resume_dir or self.save_dir
+        if os.path.realpath(resume_dir) == os.path.realpath(self.save_dir):
+            manifest = self._manifest
+        else:
+            manifest = self._read_manifest(os.path.join(resume_dir, MANIFEST_NAME))
+
+        for entry in reversed(manifest["checkpoints"]):
+            path = os.path.join(resume_dir, entry["file"])
+            if not os.path.exists(path):
+                Log.w(f"체크포인트 파일 없음, 건너뜀: {path}")
+                continue
+            if _sha256(path) != entry["sha256"]:
+                Log.w(f"체크포인트 checksum 불일치, 건너뜀: {path}")
+                continue
+            try:
+                state = torch.load(path, map_location=map_location, weights_only=False)
+            except Exception as e:
+                Log.w(f"체크포인트 로드 실패, 건너뜀: {path} ({e})")
+                continue
+            Log.i(f"체크포인트 로드: {entry['file']} (epoch={entry['epoch']}, step={entry['step']})")
+            return state, entry
+
+        Log.i(f"재개할 유효한 체크포인트가 없습니다: {resume_dir}")
+        return None
+
+    def entries(self) -> list[CheckpointEntry]:
+        return list(self._manifest["checkpoints"])
+
+    def best(self) -> Optional[CheckpointEntry]:
+        return next((e for e in self._manifest["checkpoints"] if e["file"] == self._manifest["best"]), None)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except BaseException as e:
+                Log.e(f"체크포인트 저장 실패: {e}")
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, state: dict, epoch: int, step: int, metric: Optional[float]) -> None:
+        file_name = f"{self.prefix}_e{epoch:04d}_s{step:08d}.pt"
+        path = os.path.join(self.save_dir, file_name)
+        tmp_path = f"{path}.tmp"
+        start = time.perf_counter()
+
+        with open(tmp_path, "wb") as f:
+            torch.save(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        entry: CheckpointEntry = {
+            "file": file_name,
+            "epoch": epoch,
+            "step": step,
+            "metric": metric,
+            "sha256": _sha256(path),
+            "size": os.path.getsize(path),
+            "created": time.time(),
+        }
+        checkpoints = [e for e in self._manifest["checkpoints"] if e["file"] != file_name] + [entry]
+        self._manifest = self._apply_retention(checkpoints)
+        _atomic_write_json(self.manifest_path, self._manifest)
+        Log.v(f"체크포인트 저장 완료: {file_name} ({entry['size']} bytes, {time.perf_counter() - start:.2f}s)")
+
+    def _apply_retention(self, checkpoints: list[CheckpointEntry]) -> dict:
+        best_file = self._select_best(checkpoints)
+        recent_files = {e["file"] for e in checkpoints[-self.keep_last:]}
+
+        kept: list[CheckpointEntry] = []
+        for entry in checkpoints:
+            if entry["file"] in recent_files or entry["file"] == best_file:
+                kept.append(entry)
+                continue
+            try:
+                os.remove(os.path.join(self.save_dir, entry["file"]))
+                Log.v(f"오래된 체크포인트 삭제: {entry['file']}")
+            except FileNotFoundError:
+                pass
+
+        return {
+            "latest": kept[-1]["file"] if kept else None,
+            "best": best_file,
+            "checkpoints": kept,
+        }
+
+    def _select_best(self, checkpoints: list[CheckpointEntry]) -> Optional[str]:
+        scored = [e for e in checkpoints if e["metric"] is not None]
+        if not scored:
+            return None
+        pick = min if self.mode == "min" else max
+        return pick(scored, key=lambda e: e["metric"])["file"]  # type: ignore
+
+    def _read_manifest(self, manifest_path: Optional[str] = None) -> dict:
+        manifest_path = manifest_path or self.manifest_path
+        empty = {"latest": None, "best": None, "checkpoints": []}
+        if not os.path.exists(manifest_path):
+            return empty
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            Log.w(f"manifest 읽기 실패, 새로 작성합니다: {e}")
+            return empty
+
+    def _raise_pending_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"이전 체크포인트 저장 실패: {error}") from error
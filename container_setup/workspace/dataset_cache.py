@@ -0,0 +1,144 @@
+from typing import Callable, Optional
+from logger import Log
+import hashlib
+import shutil
+import time
+import os
+
+CACHE_DIR = os.environ.get("DOLAB_DATASET_CACHE", "/datasets")             # 호스트 캐시 (읽기 전용 마운트)
+INBOX_DIR = os.environ.get("DOLAB_DATASET_INBOX", "/datasets-inbox")       # 새 데이터셋을 호스트 캐시로 올리는 곳
+STAGING_DIR = os.environ.get("DOLAB_DATASET_STAGING", "/workspace/.datasets")
+# pod: 로컬 컨테이너가 올리고 있는 데이터셋 이름 (쉼표 구분). 올라올 때까지 기다렸다가 캐시를 씀
+PENDING = [name for name in os.environ.get("DOLAB_DATASET_PENDING", "").split(",") if name]
+PENDING_TIMEOUT = float(os.environ.get("DOLAB_DATASET_WAIT", "1800"))
+_COMPLETE_MARKER = ".complete"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tree_hash(path: str) -> str:
+    """
+    디렉터리 내용 해시 (호스트 libs/dataset_cache.py의 tree_hash와 같은 계산)
+
+    상대 경로를 바이트 순으로 정렬해 "경로\\0파일sha256\\n"을 이어 붙인 sha256의 앞 16자리
+    """
+    files = []
+    for current, _, names in os.walk(path):
+        for name in names:
+            full = os.path.join(current, name)
+            if os.path.isfile(full) and not os.path.islink(full):
+                files.append(os.fsencode(os.path.relpath(full, path)))
+    digest = hashlib.sha256()
+    for relative in sorted(files):
+        digest.update(relative + b"\0" + _file_sha256(os.path.join(os.fsencode(path), relative)).encode() + b"\n")
+    return digest.hexdigest()[:16]
+
+
+def _wait_for_upload(name: str) -> None:
+    """DOLAB_DATASET_PENDING에 있는 데이터셋이면 업로드가 끝나거나 실패할 때까지 대기"""
+    if name not in PENDING:
+        return
+    directory = os.path.join(CACHE_DIR, name)
+    deadline = time.time() + PENDING_TIMEOUT
+    Log.i(f"[데이터셋] 업로드 대기: {name}")
+    while time.time() < deadline:
+        if os.path.exists(os.path.join(directory, ".failed")):
+            Log.w(f"[데이터셋] 업로드 실패, 직접 받음: {name}")
+            return
+        if os.path.isdir(os.path.join(directory, "latest")) and not os.path.exists(os.path.join(directory, ".staging")):
+            return
+        time.sleep(2)
+    Log.w(f"[데이터셋] 업로드 대기 시간 초과, 직접 받음: {name}")
+
+
+def _chown_to_inbox_owner(path: str) -> None:
+    """
+    컨테이너(root)가 inbox에 만든 파일을 마운트된 inbox의 소유자(호스트 사용자)로 바꿈
+
+    호스트의 ingest가 root가 아닌 사용자로 실행되므로, 그렇지 않으면 캐시로 옮기거나 지우지 못함
+    """
+    info = os.stat(INBOX_DIR)
+    if os.geteuid() != 0 or info.st_uid == 0:
+        return
+    os.lchown(path, info.st_uid, info.st_gid)
+    for current, directories, names in os.walk(path):
+        for name in directories + names:
+            os.lchown(os.path.join(current, name), info.st_uid, info.st_gid)
+
+
+def _cached(name: str, sha256: Optional[str]) -> Optional[str]:
+    """호스트 캐시에서 찾은 경로. 사용 기록을 inbox에 남겨 LRU 삭제 대상에서 밀려나게 함"""
+    version = sha256 or "latest"
+    path = os.path.join(CACHE_DIR, name, version)
+    if not os.path.isdir(path):
+        return None
+    if version == "latest":
+        version = os.readlink(path)
+        path = os.path.join(CACHE_DIR, name, version)
+
+    access_dir = os.path.join(INBOX_DIR, ".access")
+    if os.path.isdir(access_dir):
+        try:
+            access = os.path.join(access_dir, f"{name}@{version}")
+            with open(access, "a"):
+                pass
+            _chown_to_inbox_owner(access)
+        except OSError as e:
+            Log.w(f"[데이터셋] 사용 기록 실패: {e}")
+    return path
+
+
+def _publish(name: str, path: str) -> None:
+    """받은 데이터셋을 inbox로 복사 (호스트가 다음 컨테이너 생성 시 해시 검증 후 캐시에 추가)"""
+    if not os.path.isdir(INBOX_DIR):
+        return
+    sha = tree_hash(path)
+    target = os.path.join(INBOX_DIR, f"{name}@{sha}")
+    if os.path.exists(target):
+        return
+    partial = os.path.join(INBOX_DIR, f".{name}@{sha}.partial")
+    try:
+        shutil.rmtree(partial, ignore_errors=True)
+        shutil.copytree(path, partial, ignore=shutil.ignore_patterns(_COMPLETE_MARKER))
+        _chown_to_inbox_owner(partial)
+        os.rename(partial, target)
+        Log.i(f"[데이터셋] 호스트 캐시로 올림: {name}@{sha}")
+    except OSError as e:
+        shutil.rmtree(partial, ignore_errors=True)
+        Log.w(f"[데이터셋] 호스트 캐시로 올리기 실패: {e}")
+
+
+def resolve_dataset(name: str, fetch: Callable[[str], None], sha256: Optional[str] = None) -> str:
+    """
+    데이터셋 경로를 반환. 호스트 캐시에 있으면 다운로드하지 않음
+
+    1. 호스트 캐시 /datasets/<name>/<sha256 또는 latest> (pod에서는 로컬 컨테이너가 올려준 DOLAB_DATASET_CACHE)
+    2. 이 컨테이너에서 이미 받은 STAGING_DIR/<name>
+    3. fetch(경로)로 받은 뒤 inbox에 올려 다음 컨테이너부터 캐시를 쓰도록 함
+
+    :param fetch: 주어진 디렉터리에 데이터셋을 받는 함수
+    :param sha256: 특정 버전(tree_hash 값)을 요구할 때 지정. None이면 가장 최근 버전
+    """
+    _wait_for_upload(name)
+    cached = _cached(name, sha256)
+    if cached:
+        Log.i(f"[데이터셋] 호스트 캐시 사용: {cached}")
+        return cached
+
+    staging = os.path.join(STAGING_DIR, name)
+    marker = os.path.join(staging, _COMPLETE_MARKER)
+    if not os.path.exists(marker):
+        Log.i(f"[데이터셋] 캐시에 없어 다운로드: {name}")
+        os.makedirs(staging, exist_ok=True)
+        fetch(staging)
+        if sha256 and tree_hash(staging) != sha256:
+            Log.w(f"[데이터셋] 받은 데이터셋의 해시가 요청한 버전과 다름: {name} (요청 {sha256})")
+        _publish(name, staging)
+        open(marker, "w").close()
+    return staging
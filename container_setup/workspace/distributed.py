@@ -0,0 +1,67 @@
+import torch
+import torch.distributed as dist
+from typing import TypedDict
+import os
+
+
+class DistContext(TypedDict):
+    enabled: bool
+    rank: int
+    local_rank: int
+    world_size: int
+    device: torch.device
+    is_main: bool
+
+
+def init_distributed() -> DistContext:
+    """
+    torchrun이 설정한 환경변수(RANK, LOCAL_RANK, WORLD_SIZE)로 분산 학습을 초기화한다.
+
+    - CUDA 사용 가능: nccl 백엔드, 프로세스당 GPU 1개
+    - CPU: gloo 백엔드 (여러 프로세스로 CPU에서 테스트 가능)
+    - torchrun 없이 실행하면 단일 프로세스 모드로 동작
+    """
+    world_size = int(os.environ.get("WORLD_SIZE", "1"))
+    if world_size <= 1:
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        return DistContext(enabled=False, rank=0, local_rank=0, world_size=1, device=device, is_main=True)
+
+    rank = int(os.environ["RANK"])
+    local_rank = int(os.environ.get("LOCAL_RANK", "0"))
+
+    if torch.cuda.is_available():
+        torch.cuda.set_device(local_rank)
+        device = torch.device("cuda", local_rank)
+        backend = "nccl"
+    else:
+        device = torch.device("cpu")
+        backend = "gloo"
+
+    dist.init_process_group(backend=backend)
+    return DistContext(enabled=True, rank=rank, local_rank=local_rank, world_size=world_size, device=device, is_main=rank == 0)
+
+
+def all_reduce_sum(tensor: torch.Tensor) -> torch.Tensor:
+    """모든 rank의 값을 합산 (단일 프로세스 모드에서는 그대로 반환)"""
+    if dist.is_available() and dist.is_initialized():
+        dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+    return tensor
+
+
+def any_rank(flag: bool, device: torch.device) -> bool:
+    """한 rank라도 flag가 참이면 모든 rank에서 참 (종료 신호 합의용)"""
+    if not (dist.is_available() and dist.is_initialized()):
+        return flag
+    value = torch.tensor([1 if flag else 0], device=device)
+    dist.all_reduce(value, op=dist.ReduceOp.MAX)
+    return bool(value.item())
+
+
+def barrier() -> None:
+    if dist.is_available() and dist.is_initialized():
+        dist.barrier()
+
+
+def cleanup() -> None:
+    if dist.is_available() and dist.is_initialized():
+        dist.destroy_process_group()
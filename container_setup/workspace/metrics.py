@@ -0,0 +1,43 @@
+import torch
+
+
+class MetricAccumulator:
+    """
+    디바이스 텐서에 지표를 누적하는 집계기
+
+    배치마다 .item()을 호출하면 GPU→CPU 동기화가 발생해 파이프라인이 직렬화되므로,
+    값은 디바이스에 누적해두고 로그 출력 시점이나 에폭 종료 시 read()로 한 번에 읽는다.
+
+    사용 예:
+        metrics = MetricAccumulator(device, ["loss_sum", "correct", "samples"])
+        metrics.add(loss_sum=loss.detach() * len(target), samples=len(target))
+        values = metrics.read()   # {"loss_sum": ..., "correct": ..., "samples": ...}
+    """
+
+    def __init__(self, device: torch.device, names: list[str]):
+        self.device = device
+        self.names = list(names)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        # MPS 등 float64 미지원 디바이스 대비
+        dtype = torch.float64 if device.type in ("cpu", "cuda") else torch.float32
+        self._values = torch.zeros(len(self.names), dtype=dtype, device=device)
+
+    def add(self, **values: torch.Tensor | int | float) -> None:
+        """지표 누적 (텐서는 동기화 없이 디바이스에서 더함)"""
+        for name, value in values.items():
+            slot = self._values[self._index[name]]
+            if isinstance(value, torch.Tensor):
+                slot.add_(value.detach().to(self._values.dtype))
+            else:
+                slot.add_(value)
+
+    def read(self) -> dict[str, float]:
+        """누적값을 한 번의 동기화로 읽어옴"""
+        return dict(zip(self.names, self._values.tolist()))
+
+    def reset(self) -> None:
+        self._values.zero_()
+
+    def tensor(self) -> torch.Tensor:
+        """누적값 텐서 (분산 학습 시 all_reduce 대상)"""
+        return self._values
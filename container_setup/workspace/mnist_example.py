@@ -2,18 +2,51 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 from torchvision import datasets, transforms
+from torch.nn.parallel import DistributedDataParallel
 from torch.utils.data import DataLoader
+from torch.utils.data.distributed import DistributedSampler
 import matplotlib.pyplot as plt
 import os
+import random
+import signal
+import subprocess
+import sys
+import time
 from logger import Log, LogLevel
+from train_options import load_train_options
+from checkpoint import CheckpointManager
+from preemption import PreemptionHandler
+from metrics import MetricAccumulator
+from dataset_cache import resolve_dataset
+import distributed
 
-Log.set_log_file("/workspace/logs")
-Log.set_console_output(True)
+dist_ctx = distributed.init_distributed()
+
+# 로그는 rank 0에서만 기록
+if dist_ctx["is_main"]:
+    Log.set_log_file("/workspace/logs")
+    Log.set_console_output(True)
+else:
+    Log.set_level(LogLevel.ERROR)
 Log.v("mnist_example.py start")
 
-# GPU 사용 여부 확인
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-Log.v(f"device: {device}")
+options = load_train_options()
+Log.v(f"train options: {options}")
+
+# GPU 사용 여부 확인 (분산 학습 시 rank별 GPU 할당)
+device = dist_ctx["device"]
+Log.v(f"device: {device}, world_size: {dist_ctx['world_size']}")
+
+# 전역 배치 크기를 rank 수로 나눠 rank별 배치 크기 결정
+if options["batch_size"] % dist_ctx["world_size"] != 0:
+    Log.w(f"전역 배치 크기({options['batch_size']})가 world_size({dist_ctx['world_size']})로 나누어떨어지지 않습니다.")
+local_batch_size = max(1, options["batch_size"] // dist_ctx["world_size"])
+
+# 실행 모드 설정 (AMP는 CUDA에서만 사용, CPU에서는 fp32로 대체)
+use_amp = options["amp"] and device.type == "cuda"
+if options["amp"] and not use_amp:
+    Log.w("CUDA를 사용할 수 없어 AMP를 비활성화하고 fp32로 학습합니다.")
+memory_format = torch.channels_last if options["channels_last"] else torch.contiguous_format
 
 # 데이터 전처리 및 로딩
 transform = transforms.Compose([
@@ -21,13 +54,24 @@ transform = transforms.Compose([
     transforms.Normalize((0.1307,), (0.3081,))
 ])
 
+# 호스트 데이터셋 캐시에 없을 때만 다운로드. 다운로드는 rank 0이 먼저 수행하고 나머지 rank는 완료 후 로드
+if not dist_ctx["is_main"]:
+    distributed.barrier()
+data_root = resolve_dataset(
+    "mnist", fetch=lambda root: [datasets.MNIST(root=root, train=train, download=True) for train in (True, False)])
 train_dataset = datasets.MNIST(
-    root='./data', train=True, download=True, transform=transform)
+    root=data_root, train=True, download=False, transform=transform)
 test_dataset = datasets.MNIST(
-    root='./data', train=False, download=True, transform=transform)
+    root=data_root, train=False, download=False, transform=transform)
+if dist_ctx["is_main"]:
+    distributed.barrier()
 
-train_loader = DataLoader(train_dataset, batch_size=64, shuffle=True)
-test_loader = DataLoader(test_dataset, batch_size=1000, shuffle=False)
+train_sampler = DistributedSampler(train_dataset, shuffle=True) if dist_ctx["enabled"] else None
+test_sampler = DistributedSampler(test_dataset, shuffle=False) if dist_ctx["enabled"] else None
+train_loader = DataLoader(train_dataset, batch_size=local_batch_size, shuffle=train_sampler is None,
+                          sampler=train_sampler, pin_memory=device.type == "cuda")
+test_loader = DataLoader(test_dataset, batch_size=options["test_batch_size"], shuffle=False,
+                         sampler=test_sampler, pin_memory=device.type == "cuda")
 Log.v("loaded dataset")
 
 # 간단한 CNN 모델 정의
@@ -52,59 +96,170 @@ class SimpleCNN(nn.Module):
         return x
 
 
-model = SimpleCNN().to(device)
+model = SimpleCNN().to(device, memory_format=memory_format)  # type: ignore
 criterion = nn.CrossEntropyLoss()
 optimizer = optim.Adam(model.parameters())  # type: ignore
+scaler = torch.cuda.amp.GradScaler(enabled=use_amp)
+
+# 저장은 원본 모델 기준으로 하고, 학습/평가는 DDP/컴파일된 모델로 수행
+# (DDP가 backward 중 gradient all-reduce를 수행)
+train_model = model
+if dist_ctx["enabled"]:
+    train_model = DistributedDataParallel(model, device_ids=[device.index] if device.type == "cuda" else None)
+if options["compile"]:
+    if hasattr(torch, "compile"):
+        train_model = torch.compile(train_model)
+        Log.v("torch.compile 적용")
+    else:
+        Log.w(f"torch {torch.__version__}은(는) torch.compile을 지원하지 않아 eager 모드로 실행합니다.")
+
+run_mode = (f"amp={use_amp}, channels_last={options['channels_last']}, "
+            f"compile={options['compile'] and hasattr(torch, 'compile')}, batch_size={options['batch_size']}, "
+            f"world_size={dist_ctx['world_size']}")
+Log.i(f"run mode: {run_mode}")
 
-save_path = './models/latest.pt'
-save_dir = os.path.dirname(save_path)
-if not os.path.exists(save_dir): os.makedirs(save_dir, exist_ok=True)
+# 체크포인트 저장은 rank 0만 수행 (로드는 모든 rank에서 수행)
+checkpoint_manager = CheckpointManager(save_dir=options["checkpoint_dir"], keep_last=options["keep_last"], mode="min")
+preemption = PreemptionHandler().install()
 
 train_losses = []
 test_losses = []
 test_accuracies = []
+start_epoch = 1
+global_step = 0
+
+
+def build_checkpoint_state(epoch):
+    return {
+        "model": model.state_dict(),
+        "optimizer": optimizer.state_dict(),
+        "scaler": scaler.state_dict(),
+        "epoch": epoch,
+        "global_step": global_step,
+        "history": {
+            "train_losses": train_losses,
+            "test_losses": test_losses,
+            "test_accuracies": test_accuracies,
+        },
+        "rng": {
+            "torch": torch.get_rng_state(),
+            "cuda": torch.cuda.get_rng_state_all() if torch.cuda.is_available() else [],
+            "python": random.getstate(),
+        },
+    }
+
+
+def restore_checkpoint_state(state):
+    global start_epoch, global_step
+    model.load_state_dict(state["model"])
+    optimizer.load_state_dict(state["optimizer"])
+    scaler.load_state_dict(state["scaler"])
+    train_losses[:] = state["history"]["train_losses"]
+    test_losses[:] = state["history"]["test_losses"]
+    test_accuracies[:] = state["history"]["test_accuracies"]
+    torch.set_rng_state(state["rng"]["torch"])
+    if torch.cuda.is_available() and state["rng"]["cuda"]:
+        torch.cuda.set_rng_state_all(state["rng"]["cuda"])
+    random.setstate(state["rng"]["python"])
+    start_epoch = state["epoch"] + 1
+    global_step = state["global_step"]
+
+
+def save_checkpoint(epoch, metric=None):
+    if dist_ctx["is_main"]:
+        checkpoint_manager.save(build_checkpoint_state(epoch), epoch=epoch, step=global_step, metric=metric)
+
+
+def run_sync_script():
+    if not dist_ctx["is_main"]:
+        return
+    if not os.path.exists(options["sync_script"]):
+        Log.w(f"sync 스크립트가 없어 sync 신호를 보내지 않습니다: {options['sync_script']}")
+        return
+    result = subprocess.run([options["sync_script"]], capture_output=True, text=True)
+    if result.returncode != 0:
+        Log.e(f"sync 스크립트 실행 실패: {result.stderr.strip()}")
+    else:
+        Log.i("sync 신호 전송 완료")
+
+
+if options["resume"]:
+    loaded = checkpoint_manager.load_latest(resume_dir=options["resume"], map_location="cpu")
+    if loaded:
+        restore_checkpoint_state(loaded[0])
+        Log.i(f"학습 재개: epoch {start_epoch}부터 (global_step={global_step})")
 
 # 학습 함수
 
 
 def train(model, loader, optimizer, criterion, epoch):
+    """한 에폭 학습. 종료 신호로 중단된 경우 False 반환"""
+    global global_step
     model.train()
-    running_loss = 0.0
+    metrics = MetricAccumulator(device, ["loss_sum", "batches", "samples"])
+    if train_sampler is not None:
+        train_sampler.set_epoch(epoch)
+    start_time = time.perf_counter()
     for batch_idx, (data, target) in enumerate(loader):
-        data, target = data.to(device), target.to(device)
-        optimizer.zero_grad()
-        output = model(data)
-        loss = criterion(output, target)
-        loss.backward()
-        optimizer.step()
-
-        running_loss += loss.item()
-        if batch_idx % 100 == 0:
+        data = data.to(device, non_blocking=True, memory_format=memory_format)
+        target = target.to(device, non_blocking=True)
+        optimizer.zero_grad(set_to_none=True)
+        with torch.autocast(device_type=device.type, dtype=torch.float16, enabled=use_amp):
+            output = model(data)
+            loss = criterion(output, target)
+        scaler.scale(loss).backward()
+        scaler.step(optimizer)
+        scaler.update()
+        global_step += 1
+        metrics.add(loss_sum=loss, batches=1, samples=len(target))
+
+        # 로그 출력 시점에만 loss를 호스트로 읽어옴
+        if batch_idx % 100 == 0 and dist_ctx["is_main"]:
             Log.i(
-                f'Train Epoch: {epoch} [{batch_idx * len(data)}/{len(loader.dataset)}]\tLoss: {loss.item():.6f}')
-    avg_loss = running_loss / len(train_loader)
+                f'Train Epoch: {epoch} [{batch_idx * len(data) * dist_ctx["world_size"]}/{len(loader.dataset)}]\tLoss: {loss.item():.6f}')
+        # 분산 학습 시 모든 rank가 같은 배치에서 멈추도록 주기적으로 종료 신호를 합의
+        if dist_ctx["enabled"]:
+            stop = batch_idx % 10 == 9 and distributed.any_rank(preemption.requested, device)
+        else:
+            stop = preemption.requested
+        if stop:
+            Log.w(f"Train Epoch: {epoch} 중단 (batch {batch_idx + 1}/{len(loader)})")
+            return False
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    elapsed = time.perf_counter() - start_time
+    distributed.all_reduce_sum(metrics.tensor())
+    totals = metrics.read()
+    avg_loss = totals["loss_sum"] / totals["batches"]
     train_losses.append(avg_loss)
     Log.i(f"Train Epoch: {epoch} Agverage loss: {avg_loss:.6f}")
+    Log.i(f"Train Epoch: {epoch} Throughput: {totals['samples'] / elapsed:.1f} samples/sec ({elapsed:.2f}s, {run_mode})")
+    return True
 
 
 # 평가 함수
 def test(model, loader, criterion):
     model.eval()
-    test_loss = 0
-    correct = 0
+    metrics = MetricAccumulator(device, ["loss_sum", "correct", "batches", "samples"])
     with torch.no_grad():
         for data, target in loader:
-            data, target = data.to(device), target.to(device)
-            output = model(data)
-            test_loss += criterion(output, target).item()
+            data = data.to(device, non_blocking=True, memory_format=memory_format)
+            target = target.to(device, non_blocking=True)
+            with torch.autocast(device_type=device.type, dtype=torch.float16, enabled=use_amp):
+                output = model(data)
             pred = output.argmax(dim=1)
-            correct += pred.eq(target).sum().item()
+            metrics.add(loss_sum=criterion(output, target), correct=pred.eq(target).sum(),
+                        batches=1, samples=len(target))
 
-    test_loss /= len(loader)
-    accuracy = 100. * correct / len(loader.dataset)
+    distributed.all_reduce_sum(metrics.tensor())
+    totals = metrics.read()
+    test_loss = totals["loss_sum"] / totals["batches"]
+    correct = int(totals["correct"])
+    accuracy = 100. * correct / totals["samples"]
     test_losses.append(test_loss)
     test_accuracies.append(accuracy)
-    Log.i(f'Test set: Average loss: {test_loss:.4f}, Accuracy: {correct}/{len(loader.dataset)} ({accuracy:.2f}%)')
+    Log.i(f'Test set: Average loss: {test_loss:.4f}, Accuracy: {correct}/{int(totals["samples"])} ({accuracy:.2f}%)')
+    return test_loss
 
 
 def save_loss_graph(epoch):
@@ -140,12 +295,30 @@ def save_loss_graph(epoch):
     plt.close()
 
 
+def exit_on_preemption(completed_epoch, save_final=True):
+    # 중단된 에폭은 재개 시 처음부터 다시 학습 (가중치/옵티마이저는 중단 시점 상태 유지)
+    if save_final:
+        save_checkpoint(completed_epoch)
+    checkpoint_manager.close()
+    run_sync_script()
+    Log.end(learn_step)
+    distributed.barrier()
+    distributed.cleanup()
+    sys.exit(128 + (preemption.received or signal.SIGTERM).value)
+
+
 # 학습 및 테스트 루프
 learn_step = Log.start("training")
-for epoch in range(1, 21):  # 20 에폭
-    train(model, train_loader, optimizer, criterion, epoch)
-    test(model, test_loader, criterion)
-    torch.save(model.state_dict(), save_path)
+for epoch in range(start_epoch, options["epochs"] + 1):
+    if not train(train_model, train_loader, optimizer, criterion, epoch):
+        exit_on_preemption(epoch - 1)
+
+    test_loss = test(train_model, test_loader, criterion)
+    save_checkpoint(epoch, metric=test_loss)
+    if distributed.any_rank(preemption.requested, device):
+        exit_on_preemption(epoch, save_final=False)
     # subprocess.run("/root/DOLAB/sync.sh")
+checkpoint_manager.close()
 Log.end(learn_step)
+distributed.cleanup()
 # subprocess.run("/root/DOLAB/terminate.sh")
@@ -0,0 +1,33 @@
+from logger import Log
+import signal
+
+
+class PreemptionHandler:
+    """
+    SIGTERM 등 종료 신호를 받으면 플래그만 세워두고,
+    학습 루프가 안전한 지점에서 확인해 마지막 체크포인트를 저장하고 종료하도록 한다.
+    """
+
+    def __init__(self, signals: tuple[signal.Signals, ...] = (signal.SIGTERM,)):
+        self.signals = signals
+        self.received: signal.Signals | None = None
+        self._previous_handlers: dict[signal.Signals, object] = {}
+
+    @property
+    def requested(self) -> bool:
+        return self.received is not None
+
+    def install(self) -> "PreemptionHandler":
+        for sig in self.signals:
+            self._previous_handlers[sig] = signal.signal(sig, self._handle)
+        return self
+
+    def uninstall(self) -> None:
+        for sig, handler in self._previous_handlers.items():
+            signal.signal(sig, handler)  # type: ignore
+        self._previous_handlers.clear()
+
+    def _handle(self, signum: int, frame: object) -> None:
+        # 핸들러 안에서는 무거운 작업을 하지 않고 플래그만 설정
+        self.received = signal.Signals(signum)
+        Log.w(f"종료 신호 수신: {self.received.name}, 현재 배치 후 체크포인트를 저장하고 종료합니다.")
@@ -5,6 +5,7 @@ CONFIG="/root/DOLAB/websocket_config.json"
 CLIENT_CONNECTED_SOCKET=$(jq -r '.client_connected_socket' "$CONFIG")
 WEBSOCKET_SERVER_PATH=$(jq -r '.websocket_server_path' "$CONFIG")
 MAIN_PATH=$(jq -r '.main_path' "$CONFIG")
+MODEL_DIR=$(jq -r '.model_dir' "$CONFIG")
 rm -f $CLIENT_CONNECTED_SOCKET
 
 # WebSocket 서버 시작 (백그라운드 실행)
@@ -17,9 +18,27 @@ echo "[2/3] 클라이언트 연결 대기 중..."
 signal=$(socat UNIX-RECVFROM:$CLIENT_CONNECTED_SOCKET STDOUT | head -n 1)
 echo "클라이언트 연결됨: $signal"
 
-# AI 학습 코드 실행
+# 사용할 프로세스 수 결정 (DOLAB_NPROC로 지정 가능, 기본값은 GPU 개수)
+GPU_COUNT=$(nvidia-smi -L 2>/dev/null | wc -l)
+NPROC=${DOLAB_NPROC:-$GPU_COUNT}
+
+# AI 학습 코드 실행 (가장 최근의 유효한 체크포인트부터 재개)
 echo "[3/3] AI 학습 코드 실행..."
-python3 $MAIN_PATH
+if [ "$NPROC" -gt 1 ]; then
+    echo "분산 학습 모드: 프로세스 ${NPROC}개 (GPU ${GPU_COUNT}개)"
+    torchrun --standalone --nproc_per_node=$NPROC $MAIN_PATH --resume "$MODEL_DIR" &
+else
+    python3 $MAIN_PATH --resume "$MODEL_DIR" &
+fi
+TRAIN_PID=$!
+
+# 종료 신호를 학습 프로세스에 전달해 마지막 체크포인트 저장 및 sync 후 종료하도록 함
+trap 'echo "종료 신호 수신: 학습 프로세스에 전달"; kill -TERM $TRAIN_PID 2>/dev/null' TERM INT
+wait $TRAIN_PID
+# trap으로 wait가 중단된 경우 학습 프로세스가 실제로 끝날 때까지 대기
+while kill -0 $TRAIN_PID 2>/dev/null; do
+    wait $TRAIN_PID
+done
 
 # 종료 시 서버도 함께 종료
 kill $SERVER_PID
\ No newline at end of file
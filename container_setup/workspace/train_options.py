@@ -0,0 +1,76 @@
+from typing import Optional, TypedDict
+import argparse
+import json
+import os
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "train_config.json")
+
+
+class TrainOptions(TypedDict):
+    epochs: int
+    batch_size: int         # 전역 배치 크기
+    test_batch_size: int
+    amp: bool               # autocast + GradScaler 사용 여부 (CUDA 전용)
+    channels_last: bool     # channels-last 메모리 포맷 사용 여부
+    compile: bool           # torch.compile 사용 여부
+    checkpoint_dir: str
+    keep_last: int          # 유지할 최근 체크포인트 수 (best는 별도 유지)
+    resume: Optional[str]   # 재개할 체크포인트 디렉터리 (None이면 처음부터 학습)
+    sync_script: str        # 종료 신호 수신 시 실행할 sync 스크립트
+
+
+DEFAULT_OPTIONS: TrainOptions = {
+    "epochs": 20,
+    "batch_size": 64,
+    "test_batch_size": 1000,
+    "amp": False,
+    "channels_last": False,
+    "compile": False,
+    "checkpoint_dir": "./models",
+    "keep_last": 3,
+    "resume": None,
+    "sync_script": "/root/DOLAB/sync.sh",
+}
+
+
+def _load_config_file(config_path: str) -> dict:
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    unknown_keys = set(config) - set(DEFAULT_OPTIONS)
+    if unknown_keys:
+        raise ValueError(f"알 수 없는 학습 설정 항목: {sorted(unknown_keys)}")
+    return config
+
+
+def load_train_options(argv: list[str] | None = None) -> TrainOptions:
+    """
+    학습 실행 옵션을 불러온다.
+
+    우선순위: CLI 인자 > 설정 파일(train_config.json) > 기본값
+    """
+    parser = argparse.ArgumentParser(description="DOLAB 학습 실행 옵션")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="학습 설정 JSON 파일 경로")
+    parser.add_argument("--epochs", type=int)
+    parser.add_argument("--batch-size", dest="batch_size", type=int, help="전역 배치 크기")
+    parser.add_argument("--test-batch-size", dest="test_batch_size", type=int)
+    parser.add_argument("--amp", action=argparse.BooleanOptionalAction, default=None, help="autocast + GradScaler 사용")
+    parser.add_argument("--channels-last", dest="channels_last", action=argparse.BooleanOptionalAction, default=None)
+    parser.add_argument("--compile", action=argparse.BooleanOptionalAction, default=None, help="torch.compile 사용")
+    parser.add_argument("--checkpoint-dir", dest="checkpoint_dir")
+    parser.add_argument("--keep-last", dest="keep_last", type=int)
+    parser.add_argument("--resume", help="가장 최근의 유효한 체크포인트부터 재개할 디렉터리")
+    parser.add_argument("--sync-script", dest="sync_script")
+    args = parser.parse_args(argv)
+
+    options: TrainOptions = {**DEFAULT_OPTIONS, **_load_config_file(args.config)}  # type: ignore
+    for key in DEFAULT_OPTIONS:
+        value = getattr(args, key)
+        if value is not None:
+            options[key] = value  # type: ignore
+
+    if options["batch_size"] <= 0 or options["test_batch_size"] <= 0:
+        raise ValueError("배치 크기는 1 이상이어야 합니다.")
+    return options
@@ -2,17 +2,20 @@ from .ssh_config_manager import SSHConfigManager
 from .ssh_profile import SSHProfile
 from .host_machine import HostMachine
 from .container_profile import ContainerProfile
-from .dockerhub_manager import DockerHubManager
+from .container_op_result import ContainerOpResult
+from .port_allocator import port_kind_for
 from .runpod_profile import GpuType
 from .runpod_manager import RunPodManager, RunPodProfile
-from .ssh_key_provisioner import SSHKeyProvisioner
-from .pod_info import PodInfoBuilder, PodInfoUploader
-from typing import Literal
-from tabulate import tabulate
+from .jobs import connect_pod_to_container
+from .ssh_key_provisioner import SyncKeyRegistry
+from typing import Literal, TYPE_CHECKING
 from pathlib import Path
 import json
 import os
 
+if TYPE_CHECKING:
+    from .dockerhub_manager import DockerHubManager
+
 CONFIG_PATH = Path("./.config/.cli_config.json")
 
 def _ensure_config_file_exists():
@@ -86,14 +89,22 @@ def create_container(host_machine: HostMachine) -> ContainerProfile:
         break
 
     while True:
-        ports_input = input("포트 바인딩을 입력하세요 (예: 2222:22,8080:8080): ").strip()
+        ports_input = input("포트 바인딩을 입력하세요 (예: 2222:22,8080:8080 / 호스트 포트 자동: auto:22,auto:8080 / 기본값: auto:22,auto:8080): ").strip()
+        ports_input = ports_input or "auto:22,auto:8080"
         try:
             ports = []
             for pair in ports_input.split(","):
                 host_port, container_port = pair.strip().split(":")
+                if host_port == "auto":
+                    # 실제 포트는 create_container에서 예약과 함께 할당
+                    if port_kind_for(container_port) is None:
+                        print(f"자동 할당을 지원하지 않는 컨테이너 포트입니다: {container_port} (지원: 22, 8080, 8888)")
+                        raise ValueError
+                    ports.append((host_port, container_port))
+                    continue
                 if not (host_port.isdigit() and container_port.isdigit()):
                     raise ValueError
-                if host_machine._is_port_in_use(host_port):
+                if not host_machine.port_allocator.is_free(host_port) or any(host_port == used for used, _ in ports):
                     print(f"이미 사용 중인 포트입니다: {host_port}")
                     raise ValueError
                 ports.append((host_port, container_port))
@@ -169,7 +180,7 @@ def select_container(host_machine: HostMachine) -> ContainerProfile:
         except ValueError:
             print("숫자를 입력해주세요.")
 
-    container_profile_list: list[ContainerProfile] = host_machine.list_containers(status=selected_status)
+    container_profile_list: list[ContainerProfile] = host_machine.list_containers(status=selected_status, cached=True)
 
     if not container_profile_list:
         raise RuntimeError("선택 가능한 컨테이너가 없습니다.")
@@ -191,6 +202,109 @@ def select_container(host_machine: HostMachine) -> ContainerProfile:
 
     return selected_container
 
+def select_containers_bulk(host_machine: HostMachine) -> tuple[list[str] | None, str | None, str | None]:
+    """
+    일괄 작업 대상 선택. (이름 목록, 이름 필터, 라벨 필터) 중 하나만 채워서 반환
+
+    - 번호 목록: 1,3,5-8 형식
+    - 이름 필터: docker --filter name= (부분 일치)
+    - 라벨 필터: key 또는 key=value
+    """
+    print("대상 지정 방식을 선택하세요:")
+    print("1. 목록에서 번호로 선택")
+    print("2. 이름 필터")
+    print("3. 라벨 필터")
+    mode = input("번호 입력: ").strip()
+
+    if mode == "2":
+        name_filter = input("이름 필터 입력: ").strip()
+        if not name_filter:
+            raise ValueError("이름 필터는 필수입니다.")
+        return None, name_filter, None
+    if mode == "3":
+        label_filter = input("라벨 필터 입력 (key 또는 key=value): ").strip()
+        if not label_filter:
+            raise ValueError("라벨 필터는 필수입니다.")
+        return None, None, label_filter
+
+    containers = host_machine.list_containers(status="all", cached=True)
+    if not containers:
+        raise RuntimeError("선택 가능한 컨테이너가 없습니다.")
+    for i, container in enumerate(containers, start=1):
+        print(f"{i}. {container['name']}")
+
+    selected: list[str] = []
+    for part in input("번호 입력 (예: 1,3,5-8, all): ").replace(" ", "").split(","):
+        if part == "all":
+            return [container["name"] for container in containers], None, None
+        start, _, end = part.partition("-")
+        try:
+            indexes = range(int(start), int(end or start) + 1)
+        except ValueError:
+            print(f"무시된 입력: {part}")
+            continue
+        selected += [containers[i - 1]["name"] for i in indexes if 1 <= i <= len(containers)]
+
+    if not selected:
+        raise ValueError("선택된 컨테이너가 없습니다.")
+    return list(dict.fromkeys(selected)), None, None
+
+def bulk_container_operation(host_machine: HostMachine) -> list[ContainerOpResult]:
+    actions: list[Literal["start", "stop", "commit", "delete"]] = ["start", "stop", "commit", "delete"]
+    print("일괄 작업을 선택하세요:")
+    for i, action in enumerate(actions, start=1):
+        print(f"{i}. {action}")
+
+    while True:
+        try:
+            index = int(input("번호 입력: "))
+            if 1 <= index <= len(actions):
+                action = actions[index - 1]
+                break
+            else:
+                print("유효한 번호를 입력하세요.")
+        except ValueError:
+            print("숫자를 입력해주세요.")
+
+    names, name_filter, label_filter = select_containers_bulk(host_machine=host_machine)
+    parallel_input = input("동시 실행 수 (기본값: 4): ").strip()
+    parallel = int(parallel_input) if parallel_input.isdigit() and int(parallel_input) > 0 else 4
+    targets = {"containers": names, "name_filter": name_filter, "label_filter": label_filter, "parallel": parallel}
+
+    if action == "start":
+        results = host_machine.start_containers(**targets)
+    elif action == "stop":
+        results = host_machine.stop_containers(**targets)
+    elif action == "commit":
+        image_name = input("이미지 이름 ({name}은 컨테이너 이름으로 치환, 기본값: '{name}'): ").strip() or "{name}"
+        tag = input("이미지 태그를 입력하세요 (기본값: 'latest'): ").strip() or "latest"
+        results = host_machine.commit_containers(**targets, image_name=image_name, tag=tag)
+    else:
+        confirm = input("선택한 컨테이너를 정지 후 삭제합니다. 계속할까요? (y/N): ").strip().lower()
+        if confirm != "y":
+            print("동작을 취소합니다.")
+            return []
+        results = host_machine.delete_containers(**targets, force=True, remove_ssh=True)
+
+    print_container_op_results(results)
+    return results
+
+def _print_table(table: list[list], headers: list[str]) -> None:
+    from tabulate import tabulate  # 표를 출력할 때만 로드
+    print(tabulate(table, headers=headers, tablefmt="pretty"))
+
+def print_container_op_results(results: list[ContainerOpResult]) -> None:
+    if not results:
+        print("대상 컨테이너가 없습니다.")
+        return
+    table = [
+        [result["name"], result["action"], "성공" if result["ok"] else "실패", f"{result['duration']:.1f}s", result["detail"][:80]]
+        for result in results
+    ]
+    _print_table(table, headers=["컨테이너", "작업", "결과", "소요 시간", "상세"])
+    failed = sum(1 for result in results if not result["ok"])
+    print(f"[완료] 성공 {len(results) - failed}개, 실패 {failed}개")
+
 def _print_gpu_options(gpu_info_list: list[GpuType], cloud_type: Literal["ALL", "SECURE", "COMMUNITY"]) -> None:
     table = []
 
@@ -220,7 +334,7 @@ def _print_gpu_options(gpu_info_list: list[GpuType], cloud_type: Literal["ALL",
     else:
         headers = ["번호", "이름", "GPU 수", "VRAM", "Secure Cloud 요금", "Community Cloud 요금"]
 
-    print(tabulate(table, headers=headers, tablefmt="pretty"))
+    _print_table(table, headers=headers)
 
 def _select_cloud_type() -> Literal["ALL", "SECURE", "COMMUNITY"]:
     cloud_options: list[Literal["ALL", "SECURE", "COMMUNITY"]] = ["ALL", "SECURE", "COMMUNITY"]
@@ -271,7 +385,7 @@ def select_gpus(cloud_type: Literal["ALL", "SECURE", "COMMUNITY"]) -> list[str]:
     return selected_gpus
 
 def select_pods(runpod_manager: RunPodManager) -> RunPodProfile | None:
-    pods = runpod_manager.get_pods()
+    pods = runpod_manager.list_pods(cached=True)
     if not pods:
         print("사용 가능한 Pod가 없습니다.")
         return
@@ -281,20 +395,21 @@ def select_pods(runpod_manager: RunPodManager) -> RunPodProfile | None:
     for idx, pod in enumerate(pods, start=1):
         table.append([
             idx,
-            pod.get("name", ""),
-            pod.get("machine", {}).get("gpuDisplayName", ""),
-            pod.get("gpuCount", 0)
+            pod["name"],
+            pod["gpu_display_name"],
+            pod["gpu_count"]
         ])
 
     headers = ["번호", "Pod 이름", "GPU 이름", "GPU 개수"]
-    print(tabulate(table, headers=headers, tablefmt="pretty"))
+    _print_table(table, headers=headers)
 
     # 사용자 입력
     while True:
         try:
             index = int(input("선택할 번호 입력: "))
             if 1 <= index <= len(pods):
-                return runpod_manager.convert_to_runpod_profile(pods[index - 1])
+                pod = pods[index - 1]
+                return pod["profile"] or runpod_manager.get_pod_info(pod_id=pod["id"])
             else:
                 print("유효한 번호를 입력하세요.")
         except ValueError:
@@ -310,9 +425,10 @@ def commit_container(host_machine: HostMachine) -> str:
         print("이미지 이름은 필수입니다.")
 
     commit_tag = input("이미지 태그를 입력하세요 (기본값: 'latest'): ").strip() or "latest"
+    squash = (input("변경분만 하나의 레이어로 합쳐 커밋하시겠습니까? (푸시 크기 감소) (y/N): ").strip().lower() or "n") == "y"
 
     print(f"[INFO] 컨테이너 '{container['name']}'을(를) 이미지 '{commit_image_name}:{commit_tag}'로 커밋합니다...")
-    host_machine.commit_container(container=container, image_name=commit_image_name, tag=commit_tag)
+    host_machine.commit_container(container=container, image_name=commit_image_name, tag=commit_tag, squash=squash)
     print("[완료] 이미지 커밋이 완료되었습니다.")
     return f"{commit_image_name}:{commit_tag}"
 
@@ -335,7 +451,7 @@ def select_local_image(host_machine: HostMachine) -> str | None:
         ])
 
     headers = ["번호", "이미지", "생성 날짜", "크기"]
-    print(tabulate(table, headers=headers, tablefmt="pretty"))
+    _print_table(table, headers=headers)
 
     # 사용자 입력
     while True:
@@ -348,9 +464,13 @@ def select_local_image(host_machine: HostMachine) -> str | None:
         except ValueError:
             print("숫자를 입력해주세요.")
 
+def _dockerhub_manager(host_machine: HostMachine, dockerhub_username: str) -> "DockerHubManager":
+    from .dockerhub_manager import DockerHubManager  # requests 세션/캐시는 DockerHub 작업 때만 로드
+    return DockerHubManager(host_machine=host_machine, dockerhub_username=dockerhub_username)
+
 def tag_and_push_to_dockerhub(host_machine: HostMachine) -> str | None:
     dockerhub_username = get_cli_config(key="dockerhub_username", prompt="DockerHub 사용자명을 입력하세요")
-    dockerhub_manager = DockerHubManager(host_machine=host_machine, dockerhub_username=dockerhub_username)
+    dockerhub_manager = _dockerhub_manager(host_machine, dockerhub_username)
 
     if not dockerhub_manager.is_logged_in():
         print(f"[오류] 호스트 '{host_machine.host_profile['host']}'에서 '{dockerhub_username}' 계정으로 DockerHub에 로그인되어 있지 않습니다.")
@@ -368,17 +488,16 @@ def tag_and_push_to_dockerhub(host_machine: HostMachine) -> str | None:
             break
         print("저장소 이름은 필수입니다.")
 
-    repo_tag = input("저장소 태그를 입력하세요 (기본값: 'latest'): ").strip() or "latest"
+    tags_input = input("저장소 태그를 입력하세요 (쉼표로 여러 개 지정 가능, 기본값: 'latest'): ").strip() or "latest"
+    # ","처럼 태그 없이 쉼표만 입력한 경우도 기본값 사용
+    repo_tags = list(dict.fromkeys(tag.strip() for tag in tags_input.split(",") if tag.strip())) or ["latest"]
 
-    print(f"[INFO] 태그 지정 중: {local_image} → {dockerhub_username}/{repo}:{repo_tag}")
-    dockerhub_manager.tag_image(local_image=local_image, repository=repo, tag=repo_tag)
-    print("[완료] 태그 지정 완료.")
+    print(f"[INFO] DockerHub로 이미지 푸시 중: {local_image} → {dockerhub_username}/{repo}:{{{','.join(repo_tags)}}} (수 분 소요될 수 있습니다.)")
+    dockerhub_manager.push_tags(
+        local_image=local_image, repository=repo, tags=repo_tags, on_progress=lambda line: print(f"  {line}"))
+    print(f"[완료] DockerHub 푸시 완료: {', '.join(f'{dockerhub_username}/{repo}:{tag}' for tag in repo_tags)}")
 
-    print("[INFO] DockerHub로 이미지 푸시 중... (수 분 소요될 수 있습니다.)")
-    dockerhub_manager.push_image(repository=repo, tag=repo_tag)
-    print(f"[완료] DockerHub 푸시 완료: {dockerhub_username}/{repo}:{repo_tag}")
-
-    return f"{dockerhub_username}/{repo}:{repo_tag}"
+    return f"{dockerhub_username}/{repo}:{repo_tags[0]}"
 
 def create_pod(runpod_manager: RunPodManager, host_machine: HostMachine) -> RunPodProfile:
     name = input("Pod 이름을 입력하세요: ").strip()
@@ -386,7 +505,7 @@ def create_pod(runpod_manager: RunPodManager, host_machine: HostMachine) -> RunP
         raise ValueError("Pod 이름은 필수입니다.")
 
     dockerhub_username = get_cli_config(key="dockerhub_username", prompt="DockerHub 사용자명을 입력하세요")
-    dockerhub_manager = DockerHubManager(host_machine, dockerhub_username)
+    dockerhub_manager = _dockerhub_manager(host_machine, dockerhub_username)
 
     repos = dockerhub_manager.get_repos()
     if not repos:
@@ -445,6 +564,11 @@ def create_pod(runpod_manager: RunPodManager, host_machine: HostMachine) -> RunP
 
     register_ssh = (input("SSH config에 자동 등록하시겠습니까? (Y/n): ").strip().lower() or "y") == "y"
 
+    # 컨테이너 공개키를 pod 생성 시 PUBLIC_KEY로 넣기 위해 동기화 대상을 먼저 선택
+    print("동기화할 컨테이너를 선택하세요")
+    sync_target_container = select_container(host_machine=host_machine)
+    sync_public_key = SyncKeyRegistry.default().public_key(sync_target_container["host_profile"]["host"], sync_target_container["name"])
+
     pod = runpod_manager.create_pod(
         name=name,
         image_name=image_name,
@@ -452,21 +576,10 @@ def create_pod(runpod_manager: RunPodManager, host_machine: HostMachine) -> RunP
         cloud_type=cloud_type,
         gpu_count=gpu_count,
         container_disk_in_gb=container_disk_in_gb,
-        start_jupyter=jupyter
+        start_jupyter=jupyter,
+        public_keys=[sync_public_key]
     )
 
-    print("동기화할 컨테이너를 선택하세요")
-    sync_target_container = select_container(host_machine=host_machine)
-
-    key_provisioner = SSHKeyProvisioner()
-    private_key_path, public_key_path = key_provisioner.generate_keypair()
-    key_provisioner.upload_public_key_to_pod(ssh_profile=pod["ssh_profile"], public_key_path=public_key_path)
-    key_provisioner.upload_private_key_to_container(ssh_profile=sync_target_container["container_profile"], private_key_path=private_key_path)
-
-    pod_info = PodInfoBuilder.build(runpod_profile=pod, runpod_api_key=runpod_manager.get_api_key(), identity_file_path=f"~/.ssh/{key_provisioner.key_name}")
-    PodInfoUploader.upload(info=pod_info, ssh_profile=sync_target_container["container_profile"])
-
-    if register_ssh:
-        SSHConfigManager.add_profile(pod["ssh_profile"])
+    connect_pod_to_container(runpod_manager, pod, sync_target_container, register_ssh=register_ssh, key_preinstalled=True)
 
     return pod
\ No newline at end of file
@@ -0,0 +1,337 @@
+from .logger import Log
+from .jobs import JobRunner, load_job_specs, validate_job_spec, DEFAULT_CONTAINER_PORTS
+from .job_spec import JobResult
+from .ssh_config_manager import SSHConfigManager
+from .state_store import StateStore
+from .experiment_queue import ExperimentQueue
+from .scheduler import LocalGPUBackend, RunPodBackend, Scheduler, ExecutionBackend
+from .pod_pool import PodPool
+from typing import Any
+import threading
+import time
+import argparse
+import json
+
+_print_lock = threading.Lock()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="dolab",
+        description="DOLAB 비대화형 명령. 인자 없이 실행하면 대화형 메뉴가 시작됩니다.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    # run: 작업 명세 실행
+    run = subparsers.add_parser("run", help="JSON/YAML 작업 명세 실행")
+    run.add_argument("specs", nargs="+", help="작업 명세 파일 경로")
+    run.add_argument("-j", "--concurrency", type=int, default=4, help="동시 실행 작업 수 (기본값: 4)")
+    run.add_argument("--dry-run", action="store_true", help="명세 검증 후 펼쳐진 작업 목록만 출력")
+    run.add_argument("--pool-max", type=int, default=4, help="pool 작업용 pod 수 상한 (기본값: 4)")
+    run.add_argument("--pool-budget", type=float, help="pool 전체 시간당 비용 상한($)")
+    run.add_argument("--keep-warm", action="store_true", help="종료 시 pool의 대기 pod를 남겨 다음 실행에서 재사용")
+
+    # container
+    container = subparsers.add_parser("container", help="컨테이너 작업")
+    container_sub = container.add_subparsers(dest="action", required=True)
+
+    create = container_sub.add_parser("create", help="컨테이너 생성")
+    create.add_argument("--host", required=True, help="~/.ssh/config의 Host 별칭")
+    create.add_argument("--name", required=True)
+    create.add_argument("--image", required=True)
+    create.add_argument("-p", "--port", dest="ports", action="append",
+                        help=f"포트 바인딩 (예: 2222:22, auto:8080). 반복 지정 가능. 기본값: {DEFAULT_CONTAINER_PORTS}")
+    create.add_argument("--jupyter", action="store_true")
+    create.add_argument("--no-register-ssh", dest="register_ssh", action="store_false")
+    create.add_argument("--public-key", dest="public_key_path")
+    create.add_argument("--private-key", dest="private_key_path")
+    create.add_argument("--backend", choices=["cli", "api"], default="cli")
+
+    listing = container_sub.add_parser("list", help="컨테이너 목록")
+    listing.add_argument("--host", required=True)
+    listing.add_argument("--status", choices=["running", "all", "exited"], default="all")
+    listing.add_argument("--name-filter")
+    listing.add_argument("--label")
+
+    for action in ("start", "stop", "delete", "commit"):
+        bulk = container_sub.add_parser(action, help=f"컨테이너 일괄 {action}")
+        bulk.add_argument("--host", required=True)
+        bulk.add_argument("names", nargs="*", help="대상 컨테이너 이름")
+        bulk.add_argument("--name-filter", help="이름 필터 (부분 일치)")
+        bulk.add_argument("--label", help="라벨 필터 (key 또는 key=value)")
+        bulk.add_argument("-j", "--parallel", type=int, default=4)
+        if action == "delete":
+            bulk.add_argument("--force", action="store_true", help="실행 중이면 정지 후 삭제")
+            bulk.add_argument("--keep-ssh", dest="remove_ssh", action="store_false", help="SSH config 항목 유지")
+        if action == "commit":
+            bulk.add_argument("--image-name", default="{name}", help="이미지 이름 ({name}은 컨테이너 이름으로 치환)")
+            bulk.add_argument("--tag", default="latest")
+
+    # pod
+    pod = subparsers.add_parser("pod", help="RunPod pod 작업")
+    pod_sub = pod.add_subparsers(dest="action", required=True)
+
+    pod_create = pod_sub.add_parser("create", help="pod 생성")
+    pod_create.add_argument("--name", required=True)
+    pod_create.add_argument("--image", required=True, help="DockerHub 이미지 (username/repo:tag)")
+    pod_create.add_argument("--gpu", dest="gpus", action="append", required=True, help="GPU ID 또는 표시 이름 (우선순위 순서로 반복 지정)")
+    pod_create.add_argument("--cloud-type", choices=["ALL", "SECURE", "COMMUNITY"], default="ALL")
+    pod_create.add_argument("--gpu-count", type=int, default=1)
+    pod_create.add_argument("--disk", dest="container_disk_in_gb", type=int)
+    pod_create.add_argument("--max-price", dest="max_price_per_hr", type=float, help="GPU 1개당 시간 요금 상한($)")
+    pod_create.add_argument("--jupyter", action="store_true")
+    pod_create.add_argument("--no-register-ssh", dest="register_ssh", action="store_false")
+    pod_create.add_argument("--host", help="동기화 대상 컨테이너가 있는 호스트")
+    pod_create.add_argument("--sync-target", help="동기화 대상 컨테이너 이름")
+
+    pod_sub.add_parser("list", help="pod 목록")
+
+    terminate = pod_sub.add_parser("terminate", help="pod 종료")
+    terminate.add_argument("pod_ids", nargs="+")
+
+    # state: 로컬 상태 저장소 조회 (원격 조회 없음)
+    state = subparsers.add_parser("state", help="로컬 상태 저장소 조회")
+    state.add_argument("what", choices=["containers", "pods", "links", "history", "usage"])
+    state.add_argument("--host", help="containers/links: 호스트 별칭")
+    state.add_argument("--all", dest="include_removed", action="store_true", help="삭제/종료된 항목 포함")
+    state.add_argument("--since-days", type=float, help="history/usage: 최근 N일")
+    state.add_argument("--limit", type=int, default=100, help="history 최대 개수")
+
+    # queue: 실험 큐 (로컬 GPU 우선, 부족하면 RunPod)
+    queue = subparsers.add_parser("queue", help="실험 작업 큐")
+    queue_sub = queue.add_subparsers(dest="action", required=True)
+
+    submit = queue_sub.add_parser("submit", help="experiment 작업 명세를 큐에 추가")
+    submit.add_argument("specs", nargs="+", help="작업 명세 파일 경로 (kind: experiment)")
+
+    queue_list = queue_sub.add_parser("list", help="큐 작업 목록")
+    queue_list.add_argument("--state", dest="states", action="append",
+                            choices=["queued", "provisioning", "running", "syncing", "teardown", "succeeded", "failed", "cancelled"])
+    queue_list.add_argument("--limit", type=int, default=100)
+
+    cancel = queue_sub.add_parser("cancel", help="대기 중인 작업 취소")
+    cancel.add_argument("job_ids", nargs="+")
+
+    queue_run = queue_sub.add_parser("run", help="스케줄러 실행")
+    queue_run.add_argument("--host", dest="hosts", action="append", default=[], help="로컬 GPU 호스트 (~/.ssh/config Host 별칭, 반복 지정)")
+    queue_run.add_argument("-j", "--concurrency", type=int, default=4, help="동시 실행 작업 수 (기본값: 4)")
+    queue_run.add_argument("--no-runpod", dest="runpod", action="store_false", help="RunPod로 넘기지 않음")
+    queue_run.add_argument("--runpod-gpu", dest="runpod_gpus", action="append", help="작업에 runpod_gpus가 없을 때 쓸 GPU 후보")
+    queue_run.add_argument("--max-pods", type=int, default=2, help="동시에 띄울 pod 수 상한 (기본값: 2)")
+    queue_run.add_argument("--budget", type=float, help="RunPod 시간당 총비용 상한($)")
+    queue_run.add_argument("--retry-backoff", type=float, default=60.0, help="용량 부족 시 재시도 간격(초, 시도 횟수만큼 늘어남)")
+    queue_run.add_argument("--results-dir", default="./experiments", help="sync_target이 없는 작업의 결과를 받을 로컬 경로")
+    queue_run.add_argument("--follow", action="store_true", help="큐가 비어도 종료하지 않고 새 작업을 기다림")
+
+    # dataset: 호스트 데이터셋 캐시 (컨테이너에 /datasets로 마운트)
+    dataset = subparsers.add_parser("dataset", help="호스트 데이터셋 캐시")
+    dataset_sub = dataset.add_subparsers(dest="action", required=True)
+    for action, help_text in (("list", "캐시된 데이터셋 목록"), ("ingest", "컨테이너가 올린 데이터셋을 캐시에 반영"),
+                              ("evict", "용량 상한을 넘는 오래된 데이터셋 삭제")):
+        dataset_action = dataset_sub.add_parser(action, help=help_text)
+        dataset_action.add_argument("--host", required=True, help="~/.ssh/config의 Host 별칭")
+        if action == "evict":
+            dataset_action.add_argument("--max-gb", type=float, help="캐시 크기 상한(GB). 기본값: 200")
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """비대화형 진입점. 결과는 stdout에 JSON으로 출력하고, 실패가 있으면 1을 반환"""
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "run":
+            return _run_specs(args)
+        if args.command == "container":
+            return _container(args)
+        if args.command == "state":
+            return _state(args)
+        if args.command == "queue":
+            return _queue(args)
+        if args.command == "dataset":
+            return _dataset(args)
+        return _pod(args)
+    except Exception as e:
+        Log.e(e)
+        _print_json({"ok": False, "error": str(e)})
+        return 1
+
+
+def _run_specs(args: argparse.Namespace) -> int:
+    specs = [spec for path in args.specs for spec in load_job_specs(path)]
+    if args.dry_run:
+        _print_json(specs, indent=2)
+        return 0
+
+    # 결과는 완료되는 대로 한 줄씩 출력 (JSON Lines)
+    runner = JobRunner(
+        max_workers=args.concurrency,
+        on_result=_print_json,
+        pool_options={"max_pods": args.pool_max, "max_cost_per_hr": args.pool_budget},
+        keep_warm_pods=args.keep_warm
+    )
+    try:
+        results = runner.run(specs)
+    finally:
+        runner.close()
+    return _exit_code(results)
+
+
+def _container(args: argparse.Namespace) -> int:
+    runner = JobRunner(max_workers=1)
+    try:
+        if args.action == "create":
+            spec: dict[str, Any] = {
+                "kind": "container", "name": args.name, "host": args.host, "image": args.image,
+                "ports": args.ports or DEFAULT_CONTAINER_PORTS, "jupyter": args.jupyter,
+                "register_ssh": args.register_ssh, "backend": args.backend,
+            }
+            if args.public_key_path:
+                spec["public_key_path"] = args.public_key_path
+            if args.private_key_path:
+                spec["private_key_path"] = args.private_key_path
+            result = runner.run_one(validate_job_spec(spec))
+            _print_json(result)
+            return _exit_code([result])
+
+        host_machine = runner.host_machine(args.host)
+        if args.action == "list":
+            containers = host_machine.list_containers(status=args.status, name_filter=args.name_filter, label_filter=args.label)
+            _print_json([
+                {"name": c["name"], "image": c["image_address"], "ssh_host": c["container_profile"]["hostname"], "ssh_port": c["ssh_port"]}
+                for c in containers
+            ])
+            return 0
+
+        targets: dict[str, Any] = {
+            "containers": args.names or None, "name_filter": args.name_filter, "label_filter": args.label, "parallel": args.parallel}
+        if args.action == "start":
+            op_results = host_machine.start_containers(**targets)
+        elif args.action == "stop":
+            op_results = host_machine.stop_containers(**targets)
+        elif args.action == "delete":
+            op_results = host_machine.delete_containers(**targets, force=args.force, remove_ssh=args.remove_ssh)
+        else:
+            op_results = host_machine.commit_containers(**targets, image_name=args.image_name, tag=args.tag)
+        _print_json(op_results)
+        return 0 if all(result["ok"] for result in op_results) else 1
+    finally:
+        runner.close()
+
+
+def _pod(args: argparse.Namespace) -> int:
+    runner = JobRunner(max_workers=1)
+    if args.action == "create":
+        spec = {key: value for key, value in vars(args).items() if key not in ("command", "action") and value is not None}
+        result = runner.run_one(validate_job_spec({"kind": "pod", **spec}))
+        _print_json(result)
+        return _exit_code([result])
+
+    runpod_manager = runner.runpod_manager()
+    if args.action == "list":
+        _print_json(runpod_manager.get_pods())
+        return 0
+
+    failed = False
+    for pod_id in args.pod_ids:
+        try:
+            try:
+                pod = runpod_manager.get_pod_info(pod_id=pod_id, suppress_log=True)
+            except ValueError:
+                pod = None  # SSH 포트가 없는(준비 전/정지된) pod
+            runpod_manager.terminate_pod(pod=pod or pod_id)
+            if pod:
+                SSHConfigManager.remove_profile(profile=pod["ssh_profile"])
+            _print_json({"id": pod_id, "ok": True, "error": ""})
+        except Exception as e:
+            failed = True
+            _print_json({"id": pod_id, "ok": False, "error": str(e)})
+    return 1 if failed else 0
+
+
+def _state(args: argparse.Namespace) -> int:
+    store = StateStore.default()
+    since = time.time() - args.since_days * 86400 if args.since_days is not None else None
+    if args.what == "containers":
+        if not args.host:
+            raise ValueError("containers 조회에는 --host가 필요합니다.")
+        _print_json(store.get_containers(args.host, status="all"))
+    elif args.what == "pods":
+        _print_json(store.get_pods(include_terminated=args.include_removed))
+    elif args.what == "links":
+        _print_json(store.get_sync_links(host=args.host, include_removed=args.include_removed))
+    elif args.what == "history":
+        _print_json(store.get_history(since=since, limit=args.limit))
+    else:
+        usage = store.get_pod_usage(since=since)
+        _print_json({"pods": usage, "total_cost": sum(entry["cost"] for entry in usage)})
+    return 0
+
+
+def _queue(args: argparse.Namespace) -> int:
+    queue = ExperimentQueue()
+    if args.action == "submit":
+        specs = [spec for path in args.specs for spec in load_job_specs(path)]
+        others = [spec["name"] for spec in specs if spec["kind"] != "experiment"]
+        if others:
+            raise ValueError(f"experiment 작업만 큐에 넣을 수 있습니다: {others}")
+        _print_json([{"id": queue.submit(spec), "name": spec["name"]} for spec in specs])  # type: ignore
+        return 0
+    if args.action == "list":
+        _print_json(queue.get_jobs(states=args.states, limit=args.limit))
+        return 0
+    if args.action == "cancel":
+        results = [{"id": job_id, "ok": queue.cancel(job_id)} for job_id in args.job_ids]
+        _print_json(results)
+        return 0 if all(result["ok"] for result in results) else 1
+
+    runner = JobRunner(max_workers=1)
+    backends: list[ExecutionBackend] = [LocalGPUBackend(runner.host_machine(host)) for host in args.hosts]
+    pod_pool = None
+    if args.runpod:
+        runpod_manager = runner.runpod_manager()
+        pod_pool = PodPool(runpod_manager, max_pods=args.max_pods, max_cost_per_hr=args.budget)
+        backends.append(RunPodBackend(runpod_manager, pod_pool=pod_pool, max_pods=args.max_pods,
+                                      max_cost_per_hr=args.budget, default_gpus=args.runpod_gpus))
+
+    failed = False
+
+    def on_finish(record: Any) -> None:
+        nonlocal failed
+        failed = failed or record["state"] == "failed"
+        _print_json({key: record[key] for key in ("id", "name", "state", "attempts", "returncode", "cost", "error")})
+
+    scheduler = Scheduler(queue, backends, host_machine=runner.host_machine, max_concurrent=args.concurrency,
+                          retry_backoff=args.retry_backoff, results_dir=args.results_dir, on_finish=on_finish)
+    try:
+        scheduler.run(until_empty=not args.follow)
+    finally:
+        if pod_pool:
+            pod_pool.close()
+        runner.close()
+    return 1 if failed else 0
+
+
+def _dataset(args: argparse.Namespace) -> int:
+    runner = JobRunner(max_workers=1)
+    try:
+        cache = runner.host_machine(args.host).dataset_cache
+        if args.action == "list":
+            _print_json(cache.entries())
+        elif args.action == "ingest":
+            _print_json(cache.ingest())
+        else:
+            max_bytes = int(args.max_gb * 1024 ** 3) if args.max_gb is not None else None
+            _print_json(cache.evict(max_bytes))
+        return 0
+    finally:
+        runner.close()
+
+
+def _exit_code(results: list[JobResult]) -> int:
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+def _print_json(data: Any, indent: int | None = None) -> None:
+    # 여러 작업 스레드에서 호출되므로 한 줄 단위로 출력이 섞이지 않게 잠금
+    with _print_lock:
+        print(json.dumps(data, ensure_ascii=False, indent=indent, default=str), flush=True)
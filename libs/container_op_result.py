@@ -0,0 +1,8 @@
+from typing import TypedDict
+
+class ContainerOpResult(TypedDict):
+    name: str
+    action: str      # start | stop | delete | commit
+    ok: bool
+    detail: str      # 성공 시 출력(이미지 ID 등), 실패 시 오류 메시지
+    duration: float  # 초
@@ -0,0 +1,241 @@
+from .logger import Log
+from .ssh_executor import SSHExecutor
+from .dataset_record import DatasetEntry
+from typing import Optional
+import threading
+import shlex
+import time
+
+CONTAINER_CACHE_DIR = "/datasets"          # 컨테이너 안의 캐시 경로 (읽기 전용)
+CONTAINER_INBOX_DIR = "/datasets-inbox"    # 컨테이너가 새 데이터셋/사용 기록을 두는 경로 (쓰기 가능)
+
+# 디렉터리 내용 해시: 상대 경로 순서(바이트 기준)로 "경로\0파일sha256\n"을 이어 붙인 sha256의 앞 16자리
+# (workspace/dataset_cache.py의 tree_hash와 같은 계산)
+_TREE_HASH = r"""tree_hash() {
+    (cd "$1" && find . -type f -printf '%P\0' | LC_ALL=C sort -z | while IFS= read -r -d '' f; do
+        printf '%s\0%s\n' "$f" "$(sha256sum < "$f" | cut -d' ' -f1)"
+    done | sha256sum | cut -c1-16)
+}
+"""
+
+# inbox 항목은 컨테이너(root)가 만들지만 workspace/dataset_cache.py가 inbox 소유자로 chown해 둠.
+# 옮기기/지우기가 실패하면(권한 등) FAILED로 보고하고 latest/사용 기록은 건드리지 않음.
+# 옮기지 못한 항목은 .<항목>.failed로 표시해 다음부터 다시 해시하지 않음 (표시를 지우면 재시도)
+_INGEST = r"""
+inbox="$root/.inbox"
+for dir in "$inbox"/*@*; do
+    [ -d "$dir" ] || continue
+    base=$(basename "$dir"); name=${base%@*}; claimed=${base##*@}
+    [ -e "$inbox/.$base.failed" ] && continue
+    actual=$(tree_hash "$dir")
+    if [ "$actual" != "$claimed" ]; then
+        echo "MISMATCH $name $claimed $actual"
+        rm -rf "$dir" 2>/dev/null || echo "FAILED $name $claimed 해시가 다른 항목 삭제 실패"
+        continue
+    fi
+    mkdir -p "$root/$name" || { echo "FAILED $name $actual 디렉터리 생성 실패"; continue; }
+    if [ -d "$root/$name/$actual" ]; then
+        rm -rf "$dir" 2>/dev/null || echo "FAILED $name $actual 중복 항목 삭제 실패"
+    elif ! err=$(mv "$dir" "$root/$name/$actual" 2>&1); then
+        echo "FAILED $name $actual $err"; touch "$inbox/.$base.failed"; continue
+    fi
+    [ -s "$root/$name/$actual.size" ] || du -sb "$root/$name/$actual" | cut -f1 > "$root/$name/$actual.size"
+    ln -sfn "$actual" "$root/$name/latest"
+    touch "$root/$name/$actual.used"
+    echo "INGESTED $name $actual"
+done
+for access in "$inbox/.access"/*@*; do
+    [ -e "$access" ] || continue
+    base=$(basename "$access"); name=${base%@*}; hash=${base##*@}
+    [ -d "$root/$name/$hash" ] && touch -r "$access" "$root/$name/$hash.used"
+    rm -f "$access" 2>/dev/null || echo "FAILED $name $hash 사용 기록 삭제 실패"
+done
+"""
+
+# inbox에 처리할 항목이 있는지 (잠금 없이 확인. 없으면 ingest를 건너뜀)
+_PENDING = r"""
+for dir in "$root/.inbox"/*@*; do [ -d "$dir" ] && [ ! -e "$root/.inbox/.$(basename "$dir").failed" ] && exit 0; done
+compgen -G "$root/.inbox/.access/*@*" > /dev/null
+"""
+
+_LIST = r"""
+for used in "$root"/*/*.used; do
+    [ -e "$used" ] || continue
+    dir=${used%.used}; name=$(basename "$(dirname "$dir")"); hash=$(basename "$dir")
+    [ -d "$dir" ] || { rm -f "$used" "$dir.size"; continue; }
+    latest=$(readlink "$root/$name/latest" 2>/dev/null)
+    # 크기는 ingest 때 기록한 값을 씀 (없으면 한 번만 계산해 기록)
+    [ -s "$dir.size" ] || du -sb "$dir" | cut -f1 > "$dir.size"
+    printf '%s\t%s\t%s\t%s\t%s\n' "$name" "$hash" "$(cat "$dir.size")" "$(stat -c %Y "$used")" "$([ "$latest" = "$hash" ] && echo 1 || echo 0)"
+done
+"""
+
+
+class HostDatasetCache:
+    """
+    호스트의 내용 주소 기반 데이터셋 캐시
+
+    호스트 디렉터리 구조 (root 기본값: ~/.dolab/datasets):
+        <root>/<이름>/<해시>/         데이터셋 내용 (컨테이너에는 /datasets로 읽기 전용 마운트)
+        <root>/<이름>/<해시>.used     마지막 사용 시각 (mtime, LRU 기준)
+        <root>/<이름>/<해시>.size     내용 크기(바이트). ingest 때 한 번 계산
+        <root>/<이름>/latest          가장 최근에 들어온 버전을 가리키는 심볼릭 링크
+        <root>/.inbox/<이름>@<해시>/   컨테이너가 처음 받은 데이터셋을 올려두는 곳 (/datasets-inbox)
+        <root>/.inbox/.access/        컨테이너의 사용 기록
+
+    ingest()가 inbox의 데이터셋을 해시 검증 후 캐시로 옮기고, evict()가 용량 상한을 넘으면
+    오래 쓰지 않은 버전부터 지운다. 여러 컨테이너를 동시에 만들어도 겹치지 않도록 flock으로 직렬화한다.
+    컨테이너 생성 시에는 maintain_in_background()로 백그라운드에서 실행해 생성을 막지 않는다.
+    """
+
+    def __init__(
+        self,
+        executor: SSHExecutor,
+        root: Optional[str] = None,
+        max_bytes: int = 200 * 1024 ** 3,
+        protect_seconds: float = 3600.0
+    ):
+        """
+        :param root: 호스트의 캐시 경로. None이면 호스트 사용자의 ~/.dolab/datasets
+        :param max_bytes: 캐시 전체 크기 상한
+        :param protect_seconds: 최근 이 시간 안에 쓰인 버전은 상한을 넘어도 지우지 않음 (실행 중인 학습 보호)
+        """
+        self.executor = executor
+        self.max_bytes = max_bytes
+        self.protect_seconds = protect_seconds
+        self._root = root
+        self._prepared = False
+        self._lock = threading.Lock()
+        self._maintenance: Optional[threading.Thread] = None
+
+    @property
+    def root(self) -> str:
+        self.prepare()
+        assert self._root
+        return self._root
+
+    def prepare(self) -> None:
+        """캐시/inbox 디렉터리 생성 (처음 한 번)"""
+        with self._lock:
+            if self._prepared:
+                return
+            root = shlex.quote(self._root) if self._root else '"$HOME/.dolab/datasets"'
+            command = f'root={root}; mkdir -p "$root/.inbox/.access" && chmod 1777 "$root/.inbox" "$root/.inbox/.access" && cd "$root" && pwd'
+            result = self.executor.execute(f"bash -c {shlex.quote(command)}", log=False)
+            if result["returncode"] != 0:
+                Log.e(f"데이터셋 캐시 디렉터리 생성 실패: {result['stderr']}")
+                raise RuntimeError(f"데이터셋 캐시 디렉터리 생성 실패: {result['stderr']}")
+            self._root = result["stdout"].strip()
+            self._prepared = True
+
+    def mount_args(self) -> list[tuple[str, str, bool]]:
+        """컨테이너 생성 시 마운트할 (호스트 경로, 컨테이너 경로, 읽기 전용)"""
+        return [(self.root, CONTAINER_CACHE_DIR, True), (f"{self.root}/.inbox", CONTAINER_INBOX_DIR, False)]
+
+    def ingest(self) -> list[str]:
+        """
+        inbox의 데이터셋을 해시 검증 후 캐시로 옮기고 사용 기록 반영
+
+        :return: 새로 들어온 "<이름>@<해시>" 목록
+        """
+        if not self.has_pending():
+            return []
+        result = self._run(_TREE_HASH + _INGEST)
+        ingested = []
+        for line in result.splitlines():
+            kind, _, rest = line.partition(" ")
+            if kind == "INGESTED":
+                name, sha = rest.split(" ", 1)
+                ingested.append(f"{name}@{sha}")
+                Log.i(f"[데이터셋 캐시] 추가: {name}@{sha}")
+            elif kind == "MISMATCH":
+                Log.w(f"[데이터셋 캐시] 해시가 맞지 않아 버림 (이름 해시 실제): {rest}")
+            elif kind == "FAILED":
+                Log.w(f"[데이터셋 캐시] inbox 처리 실패 (이름 해시 사유): {rest}")
+        return ingested
+
+    def has_pending(self) -> bool:
+        """inbox에 캐시로 옮길 데이터셋이나 사용 기록이 있는지 (잠금 없이 확인)"""
+        command = f'root={shlex.quote(self.root)}\n{_PENDING}'
+        return self.executor.execute(f"bash -c {shlex.quote(command)}", log=False)["returncode"] == 0
+
+    def entries(self) -> list[DatasetEntry]:
+        """캐시에 있는 모든 버전 (이름, 해시, 크기, 마지막 사용 시각)"""
+        entries: list[DatasetEntry] = []
+        for line in self._run(_LIST).splitlines():
+            fields = line.split("\t")
+            if len(fields) != 5:
+                continue
+            name, sha, size, used, latest = fields
+            entries.append({"name": name, "sha256": sha, "size": int(size), "last_used": float(used), "latest": latest == "1"})
+        return entries
+
+    def evict(self, max_bytes: Optional[int] = None) -> list[DatasetEntry]:
+        """용량 상한을 넘으면 마지막 사용이 오래된 버전부터 삭제"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries(), key=lambda entry: entry["last_used"])
+        total = sum(entry["size"] for entry in entries)
+        now = time.time()
+
+        victims: list[DatasetEntry] = []
+        for entry in entries:
+            if total <= max_bytes:
+                break
+            if now - entry["last_used"] < self.protect_seconds:
+                continue
+            victims.append(entry)
+            total -= entry["size"]
+        if not victims:
+            return []
+
+        # latest가 지워지는 버전을 가리키면 남은 버전 중 가장 최근에 쓰인 것으로 옮김
+        removals = []
+        for victim in victims:
+            path = f'"$root"/{shlex.quote(victim["name"])}/{victim["sha256"]}'
+            removals.append(f"rm -rf {path} {path}.used {path}.size 2>/dev/null || echo FAILED {shlex.quote(victim['name'] + '@' + victim['sha256'])}")
+        for name in sorted({victim["name"] for victim in victims}):
+            quoted = shlex.quote(name)
+            removals.append(
+                f'[ -e "$root"/{quoted}/latest ] || '
+                f'{{ next=$(ls -t "$root"/{quoted}/*.used 2>/dev/null | head -n 1); '
+                f'if [ -n "$next" ]; then ln -sfn "$(basename "${{next%.used}}")" "$root"/{quoted}/latest; '
+                f'else rm -rf "$root"/{quoted}; fi; }}')
+        failed = {line.split(" ", 1)[1] for line in self._run("\n".join(removals)).splitlines() if line.startswith("FAILED ")}
+        removed = []
+        for victim in victims:
+            key = f"{victim['name']}@{victim['sha256']}"
+            if key in failed:
+                Log.w(f"[데이터셋 캐시] 삭제 실패 (권한 확인 필요): {key}")
+                continue
+            Log.i(f"[데이터셋 캐시] 삭제: {key} ({victim['size'] / 1024 ** 3:.1f}GB)")
+            removed.append(victim)
+        return removed
+
+    def maintain(self) -> None:
+        """inbox에 새 항목이 있을 때만 ingest 후 evict"""
+        if self.ingest():
+            self.evict()
+
+    def maintain_in_background(self) -> None:
+        """maintain을 백그라운드 스레드에서 실행 (이미 실행 중이면 건너뜀). 실패는 경고만 남김"""
+        with self._lock:
+            if self._maintenance is not None and self._maintenance.is_alive():
+                return
+
+            def run() -> None:
+                try:
+                    self.maintain()
+                except RuntimeError as e:
+                    Log.w(f"[데이터셋 캐시] 정리 실패: {e}")
+
+            self._maintenance = threading.Thread(target=run, name="dataset-cache-maintenance", daemon=True)
+            self._maintenance.start()
+
+    def _run(self, script: str) -> str:
+        """캐시 잠금(flock)을 잡고 root 변수를 설정한 상태로 스크립트 실행"""
+        command = f'root={shlex.quote(self.root)}\nexec 9>"$root/.lock" && flock 9\n{script}'
+        result = self.executor.execute(f"bash -c {shlex.quote(command)}", log=False)
+        if result["returncode"] != 0:
+            Log.e(f"데이터셋 캐시 명령 실패: {result['stderr']}")
+            raise RuntimeError(f"데이터셋 캐시 명령 실패: {result['stderr']}")
+        return result["stdout"]
@@ -0,0 +1,16 @@
+from typing import TypedDict
+
+class DatasetEntry(TypedDict):
+    name: str
+    sha256: str        # 내용 해시 앞 16자리 (캐시 디렉터리 이름)
+    size: int          # 바이트
+    last_used: float   # 컨테이너에서 마지막으로 사용한 시각 (LRU 기준)
+    latest: bool       # <이름>/latest가 가리키는 버전인지
+
+class StagedDataset(TypedDict):
+    name: str
+    sha256: str        # 내용 해시 앞 16자리
+    files: int         # 데이터셋 전체 파일 수
+    sent_files: int    # 실제로 전송한 파일 수 (pod에 이미 같은 파일이 있으면 건너뜀)
+    sent_bytes: int
+    seconds: float
@@ -0,0 +1,200 @@
+from .logger import Log
+from .container_profile import ContainerProfile
+from .runpod_profile import RunPodProfile
+from .ssh_executor import SSHExecutor
+from .dataset_cache import CONTAINER_CACHE_DIR
+from .dataset_record import StagedDataset
+from concurrent.futures import Future
+import threading
+import base64
+import shlex
+import time
+
+# pod의 데이터셋 캐시. 풀 반납 시 /workspace가 정리되므로 그 밖에 두어 다음 임대에서도 재사용
+POD_DATASET_DIR = "/root/.dolab/datasets"
+
+# [pod] 매니페스트("sha256  경로" 줄)를 stdin으로 받아 없거나 내용이 다른 파일 경로를 NUL 구분으로 출력
+# 같은 버전이 이미 있으면 그대로, 없으면 latest(이전 버전)를 하드링크로 복사해 바뀐 파일만 받음
+_POD_PLAN = r"""set -e
+dir={dir}; hash={hash}
+stage="$dir/.$hash.partial"; manifest="$dir/.$hash.manifest.partial"; pending="$dir/.$hash.pending"
+mkdir -p "$dir"; rm -f "$dir/.failed"; touch "$dir/.staging"
+trap '[ $? -eq 0 ] || {{ touch "$dir/.failed"; rm -f "$dir/.staging"; }}' EXIT
+cat > "$manifest"
+: > "$pending"
+if [ -d "$dir/$hash" ] && cmp -s "$manifest" "$dir/$hash.manifest"; then exit 0; fi
+if [ -d "$dir/$hash" ]; then rm -rf "$stage"; mv "$dir/$hash" "$stage"
+elif [ ! -d "$stage" ] && [ -d "$dir/latest" ]; then cp -al "$dir/latest/." "$stage"; fi
+mkdir -p "$stage"; cd "$stage"
+find . -type f -printf '%P\n' | LC_ALL=C sort > "$dir/.$hash.present"
+cut -c67- "$manifest" | LC_ALL=C sort | comm -23 "$dir/.$hash.present" - | while IFS= read -r f; do rm -f "./$f"; done
+rm -f "$dir/.$hash.present"
+while IFS= read -r line; do
+    sum=${{line%%  *}}; f=${{line#*  }}
+    if [ -f "$f" ] && [ "$(sha256sum < "$f" | cut -d' ' -f1)" = "$sum" ]; then continue; fi
+    printf '%s\n' "$line" >> "$pending"; printf '%s\0' "$f"
+done < "$manifest"
+"""
+
+# [pod] 받은 파일을 풀고(-U: 하드링크로 공유하는 이전 버전은 건드리지 않음) 받은 파일만 sha256 검증 후 반영
+_POD_APPLY = r"""set -e
+dir={dir}; hash={hash}
+stage="$dir/.$hash.partial"; manifest="$dir/.$hash.manifest.partial"; pending="$dir/.$hash.pending"
+trap '[ $? -eq 0 ] || {{ touch "$dir/.failed"; rm -f "$dir/.staging"; }}' EXIT
+if [ -d "$stage" ]; then
+    cd "$stage"
+    {extract}
+    [ ! -s "$pending" ] || sha256sum -c --quiet --strict "$pending"
+    cd "$dir"; rm -rf "$hash"; mv "$stage" "$hash"
+fi
+mv "$manifest" "$dir/$hash.manifest"
+rm -f "$pending"
+ln -sfn "$hash" "$dir/latest"
+rm -f "$dir/.staging"
+"""
+
+# [컨테이너] 호스트 캐시(/datasets)의 데이터셋을 pod로 보냄. 매니페스트는 버전(내용 해시)마다 한 번만 계산
+_CONTAINER_PUSH = r"""set -e
+ssh_pod() {{ ssh {ssh_options} "$@"; }}
+name={name}; src={source}
+[ -d "$src" ] || {{ echo "호스트 데이터셋 캐시에 없음: $src" >&2; exit 3; }}
+hash=$(basename "$(readlink -f "$src")")
+manifest="/tmp/dolab-manifests/$name@$hash"
+if [ ! -s "$manifest" ]; then
+    mkdir -p /tmp/dolab-manifests
+    (cd "$src" && find . -type f -printf '%P\0' | LC_ALL=C sort -z | while IFS= read -r -d '' f; do
+        printf '%s  %s\n' "$(sha256sum < "$f" | cut -d' ' -f1)" "$f"
+    done) > "$manifest.$$"
+    mv "$manifest.$$" "$manifest"
+fi
+missing=$(mktemp); trap 'rm -f "$missing"' EXIT
+ssh_pod "$(plan "$hash")" < "$manifest" > "$missing"
+count=$(tr -cd '\0' < "$missing" | wc -c)
+bytes=$(cd "$src" && xargs -0 -r stat -c %s < "$missing" | awk '{{s += $1}} END {{print s + 0}}')
+if [ "$count" -gt 0 ]; then
+    (cd "$src" && tar -cf - --null -T "$missing") | ssh_pod "$(apply "$hash" 1)"
+else
+    ssh_pod "$(apply "$hash" 0)" < /dev/null
+fi
+echo "STAGED $name $hash $(wc -l < "$manifest") $count $bytes"
+"""
+
+
+class DatasetStager:
+    """
+    동기화 대상 컨테이너에서 pod로 데이터셋을 미리 올림
+
+    컨테이너에 마운트된 호스트 데이터셋 캐시(/datasets)를 원본으로, 컨테이너의 동기화 키로 pod에 접속해
+    tar 스트림 하나로 보낸다. pod에 이미 같은 내용의 파일이 있으면(이전 임대에서 받은 버전) 건너뛰고,
+    받은 파일은 sha256으로 검증한 뒤 POD_DATASET_DIR/<이름>/<해시>로 반영한다.
+    pod에서는 workspace/dataset_cache.py의 resolve_dataset이 이 경로를 쓴다 (DOLAB_DATASET_CACHE).
+    """
+
+    def __init__(
+        self,
+        container: ContainerProfile,
+        key_path: str,
+        source_dir: str = CONTAINER_CACHE_DIR,
+        pod_dir: str = POD_DATASET_DIR
+    ):
+        """
+        :param key_path: 컨테이너 안의 pod 접속용 개인키 경로 (SyncKeyRegistry.install_private_key)
+        """
+        self.container = container
+        self.key_path = key_path
+        self.source_dir = source_dir
+        self.pod_dir = pod_dir
+        self.executor = SSHExecutor(profile=container["container_profile"])
+
+    @staticmethod
+    def pod_env(datasets: list[str], pod_dir: str = POD_DATASET_DIR) -> dict[str, str]:
+        """pod 학습 코드가 올라오는 중인 데이터셋을 기다렸다가 쓰도록 하는 환경변수"""
+        return {
+            "DOLAB_DATASET_CACHE": pod_dir,
+            "DOLAB_DATASET_PENDING": ",".join(dataset.partition("@")[0] for dataset in datasets),
+        }
+
+    def start(self, pod: RunPodProfile, datasets: list[str]) -> "Future[list[StagedDataset]]":
+        """백그라운드에서 stage 실행 (pod의 나머지 준비 과정과 동시에 진행)"""
+        future: "Future[list[StagedDataset]]" = Future()
+
+        def run() -> None:
+            try:
+                future.set_result(self.stage(pod, datasets))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"dataset-stager-{pod['id']}", daemon=True).start()
+        return future
+
+    def stage(self, pod: RunPodProfile, datasets: list[str]) -> list[StagedDataset]:
+        """
+        :param datasets: "이름" 또는 "이름@해시" 목록 (해시가 없으면 호스트 캐시의 latest)
+        :raises RuntimeError: 전송 또는 검증 실패 (pod에는 <이름>/.failed를 남김)
+        """
+        staged: list[StagedDataset] = []
+        for dataset in datasets:
+            name, _, version = dataset.partition("@")
+            step_id = Log.start(f"[{pod['id']}] 데이터셋 업로드: {name}@{version or 'latest'}")
+            start = time.time()
+            try:
+                result = self.executor.execute(f"bash -c {shlex.quote(self._push_script(pod, name, version or 'latest'))}", log=False)
+            finally:
+                Log.end(step_id=step_id)
+
+            fields = result["stdout"].strip().splitlines()[-1].split() if result["stdout"].strip() else []
+            if result["returncode"] != 0 or len(fields) != 6 or fields[0] != "STAGED":
+                self._mark_failed(pod, name)
+                Log.e(f"[{pod['id']}] 데이터셋 업로드 실패: {name} ({result['stderr'].strip()[-500:]})")
+                raise RuntimeError(f"데이터셋 업로드 실패: {name} ({result['stderr'].strip()[-500:]})")
+
+            _, _, sha, files, sent_files, sent_bytes = fields
+            entry: StagedDataset = {
+                "name": name, "sha256": sha, "files": int(files), "sent_files": int(sent_files),
+                "sent_bytes": int(sent_bytes), "seconds": time.time() - start,
+            }
+            Log.i(f"[{pod['id']}] 데이터셋 준비 완료: {name}@{sha} (파일 {entry['sent_files']}/{entry['files']}개 전송, "
+                  f"{entry['sent_bytes'] / 1024 / 1024:.1f}MB, {entry['seconds']:.1f}s)")
+            staged.append(entry)
+        return staged
+
+    def _ssh_options(self, pod: RunPodProfile) -> str:
+        """컨테이너에서 동기화 키로 pod에 접속하는 ssh 인자"""
+        profile = pod["ssh_profile"]
+        return " ".join(shlex.quote(option) for option in [
+            "-i", self.key_path, "-p", str(profile["port"]),
+            "-o", "StrictHostKeyChecking=no", "-o", "BatchMode=yes", "-o", "IPQoS=throughput",
+            f"{profile['user']}@{profile['hostname']}",
+        ])
+
+    def _push_script(self, pod: RunPodProfile, name: str, version: str) -> str:
+        pod_dir = shlex.quote(f"{self.pod_dir}/{name}")
+        # 해시는 컨테이너에서 알아내므로 pod 스크립트에 인자로 넘김.
+        # pod 로그인 셸의 종류와 관계없이 전달되도록 스크립트는 base64로 감쌈
+        plan = _POD_PLAN.format(dir=pod_dir, hash="$1")
+        apply_script = _POD_APPLY.format(dir=pod_dir, hash="$1", extract='[ "$2" = 0 ] || tar -xUf -')
+        functions = (
+            f"plan() {{ echo \"bash -c \\\"\\$(echo {_b64(plan)} | base64 -d)\\\" _ $1\"; }}\n"
+            f"apply() {{ echo \"bash -c \\\"\\$(echo {_b64(apply_script)} | base64 -d)\\\" _ $1 $2\"; }}\n"
+        )
+        return functions + _CONTAINER_PUSH.format(
+            ssh_options=self._ssh_options(pod),
+            name=shlex.quote(name),
+            source=shlex.quote(f"{self.source_dir}/{name}/{version}"),
+        )
+
+    def _mark_failed(self, pod: RunPodProfile, name: str) -> None:
+        """
+        pod 학습 코드가 데이터셋을 기다리지 않고 직접 받도록 실패 표시
+
+        업로드와 같은 경로(컨테이너 → 동기화 키로 pod)로 접속. 표시하지 못하면 학습 코드는 대기 시간 초과 후 직접 받음
+        """
+        directory = shlex.quote(f"{self.pod_dir}/{name}")
+        remote = f"mkdir -p {directory} && touch {directory}/.failed && rm -f {directory}/.staging"
+        result = self.executor.execute(f"ssh {self._ssh_options(pod)} {shlex.quote(remote)}", log=False)
+        if result["returncode"] != 0:
+            Log.w(f"[{pod['id']}] 데이터셋 실패 표시 실패: {name} ({result['stderr'].strip()[-300:]})")
+
+
+def _b64(script: str) -> str:
+    return base64.b64encode(script.encode("utf-8")).decode("ascii")
@@ -0,0 +1,257 @@
+from .logger import Log
+from .ssh_executor import SSHExecutor
+from typing import Any, Iterator, Optional, TYPE_CHECKING
+from urllib.parse import quote
+import subprocess
+import threading
+import socket
+import json
+import time
+
+if TYPE_CHECKING:
+    # requests는 backend="api"일 때만 필요하므로 connect()에서 로드
+    import requests
+
+
+class DockerEngineError(RuntimeError):
+    """Docker Engine API가 오류 상태 코드를 반환한 경우"""
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"Docker API 오류 ({status_code}): {message}")
+        self.status_code = status_code
+        self.message = message
+
+
+class DockerEngineUnavailable(RuntimeError):
+    """소켓 포워딩이 끊기는 등 API에 접근할 수 없는 경우 (CLI 경로로 대체 필요)"""
+
+
+class DockerEngineClient:
+    """
+    SSH로 포워딩한 원격 docker.sock을 통해 Docker Engine HTTP API 호출
+
+    - `ssh -N -L 127.0.0.1:<로컬 포트>:/var/run/docker.sock` 터널 하나를 유지
+    - requests.Session의 keep-alive 커넥션 풀을 재사용해 호출마다 ssh/docker CLI를 띄우지 않음
+    - 응답은 Docker Engine API의 JSON 그대로 반환
+    """
+
+    def __init__(
+        self,
+        executor: SSHExecutor,
+        remote_socket: str = "/var/run/docker.sock",
+        pool_size: int = 8,
+        connect_timeout: float = 15.0
+    ):
+        self.executor = executor
+        self.remote_socket = remote_socket
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+
+        self.local_port: Optional[int] = None
+        self._tunnel: Optional[subprocess.Popen] = None
+        self._session: Optional["requests.Session"] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "DockerEngineClient":
+        self.connect()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    # ---------------------------------------------------------------- 연결 관리
+
+    def connect(self) -> None:
+        """소켓 포워딩 터널을 열고 /_ping 응답을 확인"""
+        with self._lock:
+            if self.is_connected():
+                return
+            self._close_tunnel()
+
+            self.local_port = _find_free_port()
+            ssh_command = self.executor.build_ssh_command() + [
+                "-N",
+                "-o", "ExitOnForwardFailure=yes",
+                "-o", "ServerAliveInterval=30",
+                "-L", f"127.0.0.1:{self.local_port}:{self.remote_socket}",
+            ]
+            Log.v(f"Docker 소켓 포워딩 시작: {' '.join(ssh_command)}")
+            try:
+                self._tunnel = subprocess.Popen(
+                    ssh_command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            except Exception as e:
+                raise DockerEngineUnavailable(f"Docker 소켓 포워딩 실행 실패: {e}")
+
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            self._session = session
+
+            deadline = time.time() + self.connect_timeout
+            while time.time() < deadline:
+                if self._tunnel.poll() is not None:
+                    stderr = self._tunnel.stderr.read().strip() if self._tunnel.stderr else ""
+                    self._close_tunnel()
+                    raise DockerEngineUnavailable(f"Docker 소켓 포워딩 실패: {stderr}")
+                try:
+                    response = session.get(f"{self._base_url()}/_ping", timeout=2)
+                    if response.status_code == 200:
+                        Log.i(f"Docker Engine API 연결 완료 (127.0.0.1:{self.local_port})")
+                        return
+                except requests.RequestException:
+                    pass
+                time.sleep(0.2)
+
+            self._close_tunnel()
+            raise DockerEngineUnavailable(f"Docker Engine API 응답 없음 (timeout {self.connect_timeout}s)")
+
+    def is_connected(self) -> bool:
+        return self._tunnel is not None and self._tunnel.poll() is None and self._session is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_tunnel()
+
+    def _close_tunnel(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self._tunnel is not None:
+            if self._tunnel.poll() is None:
+                self._tunnel.terminate()
+                try:
+                    self._tunnel.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._tunnel.kill()
+            Log.v("Docker 소켓 포워딩 종료")
+            self._tunnel = None
+
+    # ---------------------------------------------------------------- 컨테이너
+
+    def list_containers(self, all: bool = True, filters: Optional[dict[str, list[str]]] = None) -> list[dict[str, Any]]:
+        """GET /containers/json (filters 예: {"status": ["running"], "name": ["foo"]})"""
+        params: dict[str, str] = {"all": "1" if all else "0"}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        return self._request("GET", "/containers/json", params=params).json()
+
+    def inspect_container(self, name: str) -> dict[str, Any]:
+        return self._request("GET", f"/containers/{quote(name)}/json").json()
+
+    def create_container(self, name: str, config: dict[str, Any], pull: bool = True) -> str:
+        """
+        POST /containers/create. 이미지가 없으면(404) pull 후 한 번 더 시도
+
+        :return: 생성된 컨테이너 ID
+        """
+        try:
+            response = self._request("POST", "/containers/create", params={"name": name}, json=config)
+        except DockerEngineError as e:
+            if not pull or e.status_code != 404:
+                raise
+            self.pull_image(config["Image"])
+            response = self._request("POST", "/containers/create", params={"name": name}, json=config)
+        return response.json()["Id"]
+
+    def start_container(self, name: str) -> None:
+        self._request("POST", f"/containers/{quote(name)}/start", ok_status=(204, 304))
+
+    def stop_container(self, name: str, timeout: Optional[int] = None) -> None:
+        params = {"t": str(timeout)} if timeout is not None else None
+        self._request("POST", f"/containers/{quote(name)}/stop", params=params, ok_status=(204, 304), timeout=None)
+
+    def remove_container(self, name: str, force: bool = False) -> None:
+        self._request("DELETE", f"/containers/{quote(name)}", params={"force": "1" if force else "0"}, ok_status=(204,))
+
+    def commit_container(self, name: str, repository: str, tag: str = "latest", changes: Optional[list[str]] = None) -> str:
+        """POST /commit. changes는 `docker commit --change`와 같은 Dockerfile 지시어 목록. 이미지 ID 반환"""
+        params: dict[str, Any] = {"container": name, "repo": repository, "tag": tag}
+        if changes:
+            params["changes"] = changes
+        return self._request("POST", "/commit", params=params, ok_status=(201,), timeout=None).json()["Id"]
+
+    # ---------------------------------------------------------------- 이미지/이벤트
+
+    def list_images(self, filters: Optional[dict[str, list[str]]] = None) -> list[dict[str, Any]]:
+        params = {"filters": json.dumps(filters)} if filters else None
+        return self._request("GET", "/images/json", params=params).json()
+
+    def pull_image(self, image: str) -> None:
+        """POST /images/create. 진행 상황 스트림을 끝까지 읽고 오류가 있으면 예외"""
+        repository, tag = _split_image(image)
+        Log.i(f"이미지 pull: {repository}:{tag}")
+        for event in self._stream_json("POST", "/images/create", params={"fromImage": repository, "tag": tag}):
+            if "error" in event:
+                Log.e(f"이미지 pull 실패: {event['error']}")
+                raise DockerEngineError(500, event["error"])
+            Log.v(f"[pull] {event.get('id', '')} {event.get('status', '')}")
+
+    def events(
+        self,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        filters: Optional[dict[str, list[str]]] = None
+    ) -> Iterator[dict[str, Any]]:
+        """GET /events 스트림. until이 없으면 이벤트가 올 때까지 계속 대기"""
+        params: dict[str, str] = {}
+        if since is not None:
+            params["since"] = str(since)
+        if until is not None:
+            params["until"] = str(until)
+        if filters:
+            params["filters"] = json.dumps(filters)
+        yield from self._stream_json("GET", "/events", params=params)
+
+    # ---------------------------------------------------------------- HTTP
+
+    def _base_url(self) -> str:
+        return f"http://127.0.0.1:{self.local_port}"
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        ok_status: tuple[int, ...] = (200, 201),
+        timeout: Optional[float] = 60,
+        **kwargs
+    ) -> "requests.Response":
+        if not self.is_connected():
+            raise DockerEngineUnavailable("Docker 소켓 포워딩이 연결되어 있지 않습니다.")
+        import requests
+        try:
+            response = self._session.request(method, self._base_url() + path, timeout=timeout, **kwargs)  # type: ignore
+        except requests.RequestException as e:
+            raise DockerEngineUnavailable(f"Docker API 요청 실패 ({method} {path}): {e}")
+
+        if response.status_code not in ok_status:
+            raise DockerEngineError(response.status_code, _error_message(response))
+        return response
+
+    def _stream_json(self, method: str, path: str, **kwargs) -> Iterator[dict[str, Any]]:
+        response = self._request(method, path, stream=True, timeout=None, **kwargs)
+        with response:
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+
+def _find_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _split_image(image: str) -> tuple[str, str]:
+    """'repo/name:tag' → ('repo/name', 'tag'). 레지스트리 포트(host:5000/name)는 태그로 보지 않음"""
+    name, _, tag = image.rpartition(":")
+    if not name or "/" in tag:
+        return image, "latest"
+    return name, tag
+
+
+def _error_message(response: "requests.Response") -> str:
+    try:
+        return response.json().get("message", response.text)
+    except ValueError:
+        return response.text.strip()
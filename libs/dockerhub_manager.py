@@ -1,12 +1,57 @@
 from .host_machine import HostMachine
 from .logger import Log
+from .http_cache import HTTPCache
+from .registry_client import RegistryClient
+from .push_plan import PushPlan
+from typing import Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
 import shlex
+import math
+import json
+import re
+import time
 import requests
+from requests.adapters import HTTPAdapter
+
+DOCKERHUB_API_BASE = "https://hub.docker.com/v2"
+DOCKERHUB_CACHE_PATH = "./.config/dockerhub_cache.json"
+
+# 비TTY docker push 출력: "<레이어 ID 12자리>: <상태>" / "<태그>: digest: sha256:... size: N"
+_PUSH_LAYER_LINE = re.compile(r"^([0-9a-f]{12}): (.+)$")
+_PUSH_DIGEST_LINE = re.compile(r"^(\S+): digest: (sha256:[0-9a-f]{64}) size: \d+")
 
 class DockerHubManager:
-    def __init__(self, host_machine: HostMachine, dockerhub_username: str):
+    def __init__(
+        self,
+        host_machine: HostMachine,
+        dockerhub_username: str,
+        api_base: str = DOCKERHUB_API_BASE,
+        cache_path: str = DOCKERHUB_CACHE_PATH,
+        cache_ttl: float = 300.0,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        timeout: float = 15.0,
+        registry: Optional[RegistryClient] = None
+    ):
+        """
+        :param api_base: DockerHub API 주소 (테스트 시 로컬 스텁 서버 주소로 교체)
+        :param registry: 레이어 조회용 레지스트리 클라이언트 (기본: DockerHub 레지스트리)
+        :param cache_ttl: 저장소/태그 목록 캐시를 재검증 없이 사용할 시간(초)
+        :param max_workers: 페이지 동시 요청 수
+        """
         self.executor = host_machine.executor
         self.username = dockerhub_username
+        self.api_base = api_base.rstrip("/")
+        self.cache = HTTPCache(cache_path, ttl=cache_ttl)
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=self.max_workers))
+        self.session.mount("http://", HTTPAdapter(pool_maxsize=self.max_workers))
+        self.registry = registry or RegistryClient(self.session, timeout=timeout)
 
 
     def is_logged_in(self) -> bool:
@@ -39,42 +84,210 @@ class DockerHubManager:
             Log.e(f"이미지 태그 실패: {result['stderr']}")
             raise RuntimeError(f"이미지 태그 실패: {result['stderr']}")
 
-    def push_image(self, repository: str, tag: str = "latest") -> None:
-        """태그된 이미지를 DockerHub로 푸시"""
+    def push_image(
+        self,
+        repository: str,
+        tag: str = "latest",
+        on_progress: Optional[Callable[[str], None]] = None,
+        idle_timeout: float = 600
+    ) -> None:
+        """태그된 이미지를 DockerHub로 푸시 (push_tags의 단일 태그 버전)"""
         full_image = f"{self.username}/{repository}:{tag}"
-        command = f"docker push --quiet {shlex.quote(full_image)}"
+        self.push_tags(local_image=full_image, repository=repository, tags=[tag], on_progress=on_progress, idle_timeout=idle_timeout)
+
+    def get_local_layers(self, local_image: str) -> list[str]:
+        """로컬 이미지의 레이어 diff_id 목록 (아래 → 위)"""
+        command = f"docker image inspect --format '{{{{json .RootFS.Layers}}}}' {shlex.quote(local_image)}"
+        result = self.executor.execute(command, log=False)
+        if result["returncode"] != 0:
+            Log.e(f"이미지 레이어 조회 실패: {result['stderr']}")
+            raise RuntimeError(f"이미지 레이어 조회 실패: {result['stderr']}")
+        return json.loads(result["stdout"] or "[]")
+
+    def plan_push(self, local_image: str, repository: str, tags: list[str], compare_recent_tags: int = 3) -> PushPlan:
+        """
+        로컬 레이어와 레지스트리의 대상 태그/최근 태그 레이어를 비교해 업로드가 필요한 레이어 파악
+
+        레지스트리를 조회할 수 없으면(비공개 저장소 등) 모든 레이어를 missing으로 보고한다.
+        """
+        full_repository = f"{self.username}/{repository}"
+        layers = self.get_local_layers(local_image)
+
+        compare_tags = list(tags)
+        try:
+            compare_tags += [tag for tag in self.get_repo_tags(repository)[:compare_recent_tags] if tag not in compare_tags]
+        except RuntimeError:
+            pass  # 새 저장소
+
+        remote_layers: set[str] = set()
+        if compare_tags:  # 비교할 태그가 없으면 레지스트리 조회 생략 (모든 레이어가 missing)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(compare_tags))) as pool:
+                for diff_ids in pool.map(lambda tag: self.registry.get_diff_ids(full_repository, tag), compare_tags):
+                    remote_layers.update(diff_ids or [])
+
+        plan: PushPlan = {
+            "image": local_image,
+            "repository": full_repository,
+            "tags": list(tags),
+            "layers": layers,
+            "existing": [layer for layer in layers if layer in remote_layers],
+            "missing": [layer for layer in layers if layer not in remote_layers],
+        }
+        Log.i(f"푸시 계획 {local_image}: 레이어 {len(layers)}개 중 레지스트리에 있음 {len(plan['existing'])}개, 업로드 필요 {len(plan['missing'])}개")
+        return plan
+
+    def push_tags(
+        self,
+        local_image: str,
+        repository: str,
+        tags: list[str],
+        on_progress: Optional[Callable[[str], None]] = None,
+        idle_timeout: float = 600
+    ) -> dict[str, str]:
+        """
+        하나의 이미지를 여러 태그로 한 번에 푸시
+
+        - 먼저 레이어를 비교해 이미 레지스트리에 있는 레이어를 보고
+        - 태그 지정과 푸시를 각각 하나의 SSH 세션으로 실행 (두 번째 태그부터는 manifest만 업로드됨)
+        - 레이어별 상태 변화를 "[완료/전체] 레이어: 상태" 형식으로 on_progress에 전달
+        - idle_timeout초 동안 출력이 없으면 멈춘 것으로 보고 취소
+
+        :return: 태그 → 푸시된 manifest digest
+        """
+        if not tags:
+            raise ValueError("푸시할 태그가 필요합니다.")
+        report = on_progress or (lambda line: None)
+
+        plan = self.plan_push(local_image, repository, tags)
+        report(f"레이어 {len(plan['layers'])}개 중 {len(plan['existing'])}개는 레지스트리에 이미 있음, {len(plan['missing'])}개 업로드 예정")
+
+        full_images = [f"{plan['repository']}:{tag}" for tag in tags]
+        tag_commands = [f"docker tag {shlex.quote(local_image)} {shlex.quote(image)}" for image in full_images if image != local_image]
+        failed = [r for r in self.executor.execute_batch(tag_commands, stop_on_error=True) if r["returncode"] != 0]
+        if failed:
+            Log.e(f"이미지 태그 실패: {failed[0]['stderr']}")
+            raise RuntimeError(f"이미지 태그 실패: {failed[0]['stderr']}")
+
+        command = " && ".join(f"docker push {shlex.quote(image)}" for image in full_images)
         Log.d(f"도커 푸시 명령어: {command}")
 
-        result = self.executor.execute(command)
+        layer_states: dict[str, str] = {}
+        digests: dict[str, str] = {}
+        counts = {"uploaded": 0, "reused": 0}
+        finished_states = ("Pushed", "Layer already exists", "Mounted from")
+
+        def handle_line(stream_name: str, line: str) -> None:
+            Log.v(f"[push] {line}")
+            line = line.strip()
+            if line.startswith("The push refers to repository"):
+                layer_states.clear()  # 다음 태그 푸시 시작
+                report(line)
+            elif match := _PUSH_LAYER_LINE.match(line):
+                layer_id, status = match.groups()
+                if layer_states.get(layer_id) == status:
+                    return
+                layer_states[layer_id] = status
+                if status == "Pushed":
+                    counts["uploaded"] += 1
+                elif status.startswith(finished_states):
+                    counts["reused"] += 1
+                done = sum(1 for state in layer_states.values() if state.startswith(finished_states))
+                report(f"[{done}/{len(layer_states)}] {layer_id}: {status}")
+            elif match := _PUSH_DIGEST_LINE.match(line):
+                digests[match.group(1)] = match.group(2)
+                report(line)
+            elif line:
+                report(line)
+
+        result = self.executor.start(command, on_line=handle_line, idle_timeout=idle_timeout).wait()
         if result["returncode"] != 0:
             Log.e(f"이미지 푸시 실패: {result['stderr']}")
             raise RuntimeError(f"이미지 푸시 실패: {result['stderr']}")
 
-    def get_repos(self, page: int = 1, page_size: int = 100) -> list[str]:
-        url = f"https://hub.docker.com/v2/repositories/{self.username}/"
-        params = {"page": page, "page_size": page_size}
-        repos = []
-
-        while url:
-            resp = requests.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            repos.extend([repo["name"] for repo in data["results"]])
-            url = data["next"]  # 다음 페이지 있으면 계속
-
-        return repos
-
-    def get_repo_tags(self, repo: str, page_size: int = 100) -> list[str]:
-        tags_url = f"https://hub.docker.com/v2/repositories/{self.username}/{repo}/tags"
-        tags: list[str] = []
-
-        while tags_url:
-            response = requests.get(tags_url, params={"page_size": page_size})
-            if response.status_code != 200:
-                Log.w(f"태그 정보를 가져오는 데 실패했습니다: {response.status_code}")
-                raise RuntimeError(f"태그 정보를 가져오는 데 실패했습니다: {response.status_code}")
-            data = response.json()
-            tags += [tag["name"] for tag in data.get("results", [])]
-            tags_url = data.get("next")
-
-        return tags
+        Log.i(f"푸시 완료 {full_images}: 레이어 업로드 {counts['uploaded']}회, 재사용 {counts['reused']}회")
+        return digests
+
+    def get_repos(self, page_size: int = 100, refresh: bool = False) -> list[str]:
+        """사용자의 저장소 이름 목록 (캐시 우선, refresh=True면 캐시 재검증)"""
+        url = f"{self.api_base}/repositories/{self.username}/"
+        results = self._get_all_pages(url, page_size=page_size, refresh=refresh, error_message="저장소 목록을 가져오는 데 실패했습니다")
+        return [repo["name"] for repo in results]
+
+    def get_repo_tags(self, repo: str, page_size: int = 100, refresh: bool = False) -> list[str]:
+        """저장소의 태그 이름 목록 (캐시 우선, refresh=True면 캐시 재검증)"""
+        url = f"{self.api_base}/repositories/{self.username}/{repo}/tags"
+        results = self._get_all_pages(url, page_size=page_size, refresh=refresh, error_message="태그 정보를 가져오는 데 실패했습니다")
+        return [tag["name"] for tag in results]
+
+    def _get_all_pages(self, url: str, page_size: int, refresh: bool, error_message: str) -> list[dict[str, Any]]:
+        """
+        첫 페이지로 전체 개수를 확인한 뒤 나머지 페이지를 동시에 요청해 순서대로 합침
+        """
+        first = self._get_json(url, {"page": 1, "page_size": page_size}, refresh, error_message)
+        results = list(first.get("results", []))
+        page_count = math.ceil(first.get("count", 0) / page_size)
+
+        if page_count > 1:
+            pages = range(2, page_count + 1)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pages))) as pool:
+                for data in pool.map(lambda page: self._get_json(url, {"page": page, "page_size": page_size}, refresh, error_message), pages):
+                    results += data.get("results", [])
+
+        self.cache.flush()
+        return results
+
+    def _get_json(self, url: str, params: dict[str, Any], refresh: bool, error_message: str) -> dict[str, Any]:
+        """
+        캐시를 고려한 GET
+
+        - ttl 이내 캐시는 요청 없이 반환 (refresh=True면 생략)
+        - 캐시에 ETag가 있으면 조건부 요청, 304면 캐시 재사용
+        - 429는 Retry-After(없으면 지수 백오프)만큼 기다린 뒤 재시도
+        """
+        key = f"{url}?{urlencode(sorted(params.items()))}"
+        cached = self.cache.get(key)
+        if cached and not refresh and self.cache.is_fresh(cached):
+            return cached["body"]
+
+        headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else {}
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                if cached:
+                    Log.w(f"DockerHub 요청 실패, 캐시 사용: {e}")
+                    return cached["body"]
+                Log.e(f"{error_message}: {e}")
+                raise RuntimeError(f"{error_message}: {e}")
+
+            if response.status_code == 429 and attempt < self.max_retries:
+                wait = _retry_after_seconds(response, default=2 ** attempt)
+                Log.w(f"DockerHub 요청 한도 초과, {wait:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries})")
+                time.sleep(wait)
+                continue
+            break
+
+        if response.status_code == 304 and cached:
+            self.cache.touch(key)
+            return cached["body"]
+        if response.status_code != 200:
+            if cached:
+                Log.w(f"DockerHub 응답 {response.status_code}, 캐시 사용: {url}")
+                return cached["body"]
+            Log.w(f"{error_message}: {response.status_code}")
+            raise RuntimeError(f"{error_message}: {response.status_code}")
+
+        data = response.json()
+        self.cache.put(key, data, response.headers.get("ETag"))
+        return data
+
+
+def _retry_after_seconds(response: requests.Response, default: float) -> float:
+    """Retry-After(초) 또는 X-RateLimit-Reset(unix time) 헤더로 대기 시간 계산 (최대 60초)"""
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(60.0, float(retry_after))
+    reset = response.headers.get("X-RateLimit-Reset", "")
+    if reset.isdigit():
+        return min(60.0, max(0.0, int(reset) - time.time()))
+    return min(60.0, default)
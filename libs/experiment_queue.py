@@ -0,0 +1,205 @@
+from .logger import Log
+from .job_spec import ExperimentJobSpec
+from .experiment_record import ExperimentRecord, ExperimentState, Placement
+from typing import Any, Optional
+from pathlib import Path
+import threading
+import sqlite3
+import socket
+import json
+import uuid
+import time
+import os
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    id            TEXT PRIMARY KEY,
+    name          TEXT NOT NULL,
+    spec          TEXT NOT NULL,
+    state         TEXT NOT NULL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    placement     TEXT,
+    error         TEXT NOT NULL DEFAULT '',
+    returncode    INTEGER,
+    cost          REAL NOT NULL DEFAULT 0,
+    submitted_at  REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    not_before    REAL NOT NULL DEFAULT 0,
+    owner         TEXT,
+    heartbeat     REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS experiments_state ON experiments (state, not_before, submitted_at);
+"""
+
+ACTIVE_STATES: tuple[ExperimentState, ...] = ("provisioning", "running", "syncing", "teardown")
+FINAL_STATES: tuple[ExperimentState, ...] = ("succeeded", "failed", "cancelled")
+
+# 처리 중인 작업의 heartbeat가 이 시간(초) 넘게 갱신되지 않으면 담당 스케줄러가 종료된 것으로 봄
+HEARTBEAT_TIMEOUT = 60.0
+
+# 이전 버전 DB에 없는 열 (열 이름, 정의)
+_ADDED_COLUMNS = (("owner", "TEXT"), ("heartbeat", "REAL NOT NULL DEFAULT 0"))
+
+
+class ExperimentQueue:
+    """
+    실험 작업 큐 (SQLite, 기본값은 상태 저장소와 같은 ./.config/state.db)
+
+    제출된 작업은 queued → provisioning → running → syncing → teardown → succeeded/failed 순서로 상태가 바뀌고,
+    스케줄러가 중간에 종료되어도 다음 실행에서 이어서 처리할 수 있도록 모든 전이를 바로 기록한다.
+
+    같은 DB를 여러 스케줄러가 함께 쓸 수 있도록 대기 중인 작업은 claim()으로 한 스케줄러만 가져가고,
+    처리 중인 작업에는 담당 스케줄러(owner)와 heartbeat를 기록해 heartbeat가 끊긴 작업만 recover()로 되돌린다.
+    """
+
+    def __init__(self, path: str | Path = "./.config/state.db", owner: Optional[str] = None):
+        """
+        :param owner: 이 큐 객체로 작업을 가져가는 스케줄러 ID. None이면 호스트 이름/PID로 생성
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(experiments)")}
+            for column, definition in _ADDED_COLUMNS:
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE experiments ADD COLUMN {column} {definition}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def submit(self, spec: ExperimentJobSpec) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO experiments (id, name, spec, state, submitted_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+                (job_id, spec["name"], json.dumps(spec), now, now))
+        Log.i(f"[큐] 작업 제출: {spec['name']} ({job_id})")
+        return job_id
+
+    def pending(self, now: Optional[float] = None) -> list[ExperimentRecord]:
+        """배치를 기다리는 작업 (제출 순서)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM experiments WHERE state = 'queued' AND not_before <= ? ORDER BY submitted_at", (now,)).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def has_unfinished(self) -> bool:
+        placeholders = ",".join("?" * len(FINAL_STATES))
+        with self._lock:
+            row = self._conn.execute(f"SELECT 1 FROM experiments WHERE state NOT IN ({placeholders}) LIMIT 1", FINAL_STATES).fetchone()
+        return row is not None
+
+    def claim(self, job_id: str) -> bool:
+        """
+        대기 중인 작업을 이 스케줄러가 가져감 (provisioning으로 전이)
+
+        :return: 다른 스케줄러가 먼저 가져갔거나 취소되어 대기 중이 아니면 False
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE experiments SET state = 'provisioning', owner = ?, heartbeat = ?, updated_at = ? WHERE id = ? AND state = 'queued'",
+                (self.owner, now, now, job_id))
+        return cursor.rowcount > 0
+
+    def heartbeat(self) -> None:
+        """이 스케줄러가 처리 중인 작업의 heartbeat 갱신 (주기적으로 호출)"""
+        placeholders = ",".join("?" * len(ACTIVE_STATES))
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE experiments SET heartbeat = ? WHERE owner = ? AND state IN ({placeholders})",
+                (time.time(), self.owner, *ACTIVE_STATES))
+
+    def transition(self, job_id: str, state: ExperimentState, **fields: Any) -> bool:
+        """
+        상태 전이와 함께 attempts, placement, error, returncode, cost, started_at, finished_at, not_before 갱신
+
+        claim()으로 가져간 작업만 바꿀 수 있음 (heartbeat가 끊겨 다른 스케줄러가 되돌린 뒤에는 무시됨)
+
+        :return: 전이했으면 True
+        """
+        if "placement" in fields and fields["placement"] is not None:
+            fields["placement"] = json.dumps(fields["placement"])
+        if state == "queued" or state in FINAL_STATES:
+            fields["owner"] = None
+        columns = ["state = ?", "updated_at = ?"] + [f"{key} = ?" for key in fields]
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE experiments SET {', '.join(columns)} WHERE id = ? AND owner = ?",
+                [state, time.time(), *fields.values(), job_id, self.owner])
+        if cursor.rowcount == 0:
+            Log.w(f"[큐] 이 스케줄러가 담당하지 않는 작업이라 전이하지 않음: {job_id} → {state}")
+            return False
+        Log.v(f"[큐] {job_id} → {state}")
+        return True
+
+    def get(self, job_id: str) -> Optional[ExperimentRecord]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM experiments WHERE id = ?", (job_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def get_jobs(self, states: Optional[list[ExperimentState]] = None, limit: int = 200) -> list[ExperimentRecord]:
+        query, params = "SELECT * FROM experiments", []
+        if states:
+            query += f" WHERE state IN ({','.join('?' * len(states))})"
+            params = list(states)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY submitted_at DESC LIMIT ?", [*params, limit]).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def cancel(self, job_id: str) -> bool:
+        """대기 중인 작업만 취소 가능"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE experiments SET state = 'cancelled', updated_at = ?, finished_at = ? WHERE id = ? AND state = 'queued'",
+                (time.time(), time.time(), job_id))
+        return cursor.rowcount > 0
+
+    def recover(self, stale_after: float = HEARTBEAT_TIMEOUT) -> list[ExperimentRecord]:
+        """
+        담당 스케줄러가 처리 중에 종료된(heartbeat가 stale_after초 넘게 끊긴) 작업을 이 스케줄러가 넘겨받음
+
+        실행 중인 다른 스케줄러의 작업은 건드리지 않는다. 넘겨받은 작업은 teardown 상태로 두어
+        남은 컨테이너/pod를 정리하는 동안 다른 스케줄러가 같은 이름으로 다시 배치하지 않도록 한다.
+
+        :return: 넘겨받은 작업 (호출자가 placement를 정리한 뒤 queued로 전이)
+        """
+        placeholders = ",".join("?" * len(ACTIVE_STATES))
+        condition = f"state IN ({placeholders}) AND owner IS NOT ? AND heartbeat < ?"
+        params = (*ACTIVE_STATES, self.owner, time.time() - stale_after)
+        with self._lock:
+            # 여러 스케줄러가 동시에 되돌리지 않도록 조회와 갱신을 한 트랜잭션으로 처리
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(f"SELECT * FROM experiments WHERE {condition}", params).fetchall()
+                now = time.time()
+                self._conn.execute(
+                    f"UPDATE experiments SET state = 'teardown', owner = ?, heartbeat = ?, updated_at = ?, "
+                    f"error = '담당 스케줄러 종료로 재배치' WHERE {condition}", (self.owner, now, now, *params))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        records = [self._from_row(row) for row in rows]
+        if records:
+            Log.w(f"[큐] 종료된 스케줄러의 작업 {len(records)}개를 넘겨받음: {[record['name'] for record in records]}")
+        return records
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> ExperimentRecord:
+        record = dict(row)
+        record["spec"] = json.loads(record["spec"])
+        placement: Optional[Placement] = json.loads(record["placement"]) if record["placement"] else None
+        record["placement"] = placement
+        return record  # type: ignore
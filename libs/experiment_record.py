@@ -0,0 +1,31 @@
+from typing import Literal, Optional, TypedDict
+from .job_spec import ExperimentJobSpec
+
+ExperimentState = Literal["queued", "provisioning", "running", "syncing", "teardown", "succeeded", "failed", "cancelled"]
+
+class Placement(TypedDict):
+    job_id: str
+    backend: str           # local:<호스트> | runpod
+    host: str              # 로컬 호스트 별칭 (RunPod는 빈 문자열)
+    gpus: list[int]        # 로컬 GPU 번호
+    container: str         # 로컬 실행 컨테이너 이름
+    pod_id: str
+    cost_per_hr: float     # RunPod 시간당 비용 (예약 시 추정값, 생성 후 실제 값)
+
+class ExperimentRecord(TypedDict):
+    id: str
+    name: str
+    spec: ExperimentJobSpec
+    state: ExperimentState
+    attempts: int
+    placement: Optional[Placement]
+    error: str
+    returncode: Optional[int]
+    cost: float
+    submitted_at: float
+    updated_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    not_before: float      # 재시도 대기 (이 시각 이후에 다시 배치)
+    owner: Optional[str]   # 처리 중인 스케줄러 ID (대기/완료 상태에서는 None)
+    heartbeat: float       # 담당 스케줄러가 마지막으로 살아 있음을 기록한 시각
@@ -0,0 +1,69 @@
+from .logger import Log
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+import tempfile
+import time
+import os
+
+
+@contextmanager
+def file_lock(path: Path, timeout: float = 30.0, stale_after: float = 120.0, interval: float = 0.05) -> Iterator[None]:
+    """
+    `<path>.lock` 파일을 이용한 프로세스 간 잠금 (Windows/Linux 공통)
+
+    O_CREAT | O_EXCL로 잠금 파일을 생성하며, stale_after초 이상 남아있는 잠금은
+    비정상 종료된 프로세스가 남긴 것으로 보고 제거한다.
+    """
+    lock_path = path.with_name(path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.time() + timeout
+
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > stale_after:
+                    Log.w(f"오래된 잠금 파일 제거: {lock_path}")
+                    lock_path.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.time() > deadline:
+                Log.e(f"잠금 획득 시간 초과: {lock_path}")
+                raise TimeoutError(f"잠금 획득 시간 초과: {lock_path}")
+            time.sleep(interval)
+
+    try:
+        yield
+    finally:
+        try:
+            lock_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def atomic_write_text(path: Path, content: str, encoding: str = "utf-8") -> None:
+    """같은 디렉터리의 임시 파일에 기록한 뒤 원자적으로 교체 (기존 파일 권한 유지)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = path.stat().st_mode if path.exists() else None
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.remove(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
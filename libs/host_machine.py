@@ -2,29 +2,67 @@ from .logger import Log
 from .ssh_profile import SSHProfile
 from .ssh_config_manager import SSHConfigManager
 from .container_profile import ContainerProfile
+from .container_op_result import ContainerOpResult
 from .ssh_result import SSHResult
 from .ssh_executor import SSHExecutor
-from typing import Literal
+from .known_hosts_manager import KnownHostsManager
+from .docker_engine import DockerEngineClient, DockerEngineError, DockerEngineUnavailable
+from .port_allocator import PortAllocator, port_kind_for
+from .squash_commit import build_squash_commit_command
+from .state_store import StateStore
+from .dataset_cache import HostDatasetCache
+from typing import Any, Callable, Literal, Optional
+from concurrent.futures import ThreadPoolExecutor
+import math
+import json
 import time
 import shlex
 import re
 
 
 class HostMachine:
-    def __init__(self, ssh_profile: SSHProfile): 
+    def __init__(self, ssh_profile: SSHProfile, backend: Literal["cli", "api"] = "cli", state_store: Optional[StateStore] = None):
+        """
+        :param backend: "cli"는 ssh로 docker CLI 실행, "api"는 포워딩한 docker.sock으로 Engine API 호출.
+                        API 연결에 실패하거나 도중에 끊기면 CLI 경로로 대체한다.
+        :param state_store: 컨테이너 상태를 기록할 저장소 (기본값: StateStore.default())
+        """
         self.host_profile = ssh_profile
+        self.host_key = ssh_profile["host"]
+        self.state_store = state_store or StateStore.default()
         self.executor = SSHExecutor(profile=self.host_profile)
+        self.engine: Optional[DockerEngineClient] = None
+        self.port_allocator = PortAllocator(self)
+        self.dataset_cache = HostDatasetCache(self.executor)
+
+        if backend == "api":
+            engine = DockerEngineClient(executor=self.executor)
+            try:
+                engine.connect()
+                self.engine = engine
+            except DockerEngineUnavailable as e:
+                Log.w(f"Docker Engine API 연결 실패, CLI 방식 사용: {e}")
+
+    def close(self) -> None:
+        """API 백엔드의 소켓 포워딩 종료"""
+        if self.engine:
+            self.engine.close()
+            self.engine = None
 
     def create_container(
         self, 
         name: str, 
         image: str, 
-        ports: list[tuple[str, str]], # [(host_port, container_port), ...]
+        ports: list[tuple[str, str]], # [(host_port, container_port), ...], host_port가 "auto"면 자동 할당
         public_key_path: str, 
         private_key_path: str | None = None, 
         set_jupyter_lab: bool = False, 
-        register_ssh: bool = False
+        register_ssh: bool = False,
+        mount_datasets: bool = True
     ) -> ContainerProfile: 
+        """
+        :param mount_datasets: 호스트 데이터셋 캐시를 /datasets(읽기 전용)와 /datasets-inbox로 마운트
+        """
         Log.i(f"컨테이너 생성 시작: name={name}, image={image}, ports={ports}")
 
         # 이름 중복 확인
@@ -32,18 +70,6 @@ class HostMachine:
             Log.w(f"[{name}] 이미 존재하는 컨테이너 이름입니다.")
             raise RuntimeError(f"이미 존재하는 컨테이너 이름: {name}")
         
-        # SSH 연결용 22번 포트 존재 확인
-        ssh_port = next((host for host, cont in ports if cont == "22"), None)
-        if not ssh_port:
-            Log.w("SSH(22) 포트 바인딩을 찾지 못함")
-            raise RuntimeError("SSH(22) 포트 바인딩이 필요합니다.")
-
-        # 포트 중복 확인
-        for host_port, _ in ports:
-            if self._is_port_in_use(host_port):
-                Log.w(f"[{host_port}] 이미 다른 컨테이너에서 사용 중인 포트입니다.")
-                raise RuntimeError(f"이미 사용 중인 포트: {host_port}")
-
         # 공개키 로드
         try:
             with open(public_key_path, "r", encoding="utf-8") as f:
@@ -53,74 +79,134 @@ class HostMachine:
             Log.e(f"공개키 파일 읽기 실패: {e}")
             raise RuntimeError(f"공개키 파일 읽기 실패: {e}")
 
+        # SSH 연결용 22번 포트 존재 확인
+        if not any(cont == "22" for _, cont in ports):
+            Log.w("SSH(22) 포트 바인딩을 찾지 못함")
+            raise RuntimeError("SSH(22) 포트 바인딩이 필요합니다.")
 
-        # 기본 run_command
-        run_command = [
-            "docker", "run", "-d",
-            "-e", f'PUBLIC_KEY="{public_key}"',
-        ]
-
-        # 포트 추가
-        for host_port, container_port in ports:
-            run_command += ["-p", f"{host_port}:{container_port}"]
-
-        # 조건부 환경변수 추가
-        if set_jupyter_lab:
-            run_command += ["-p", f'8888:8888']
-            run_command += ["-e", f'JUPYTER_PASSWORD="jupyterpassword"']
-
-        # 나머지 고정 옵션 추가
-        run_command += [
-            "--name", name,
-            image
-        ]
-
-        docker_command = ' '.join(run_command)
-        Log.d(f"Docker 실행 명령: {docker_command}")
-
-        result = self.executor.execute(docker_command)
-        if result["returncode"] != 0:
-            Log.e(f"컨테이너 생성 실패: {result['stderr']}")
-            raise RuntimeError(f"컨테이너 생성 실패: {result['stderr']}")
-        Log.i(f"컨테이너 생성 성공: {name}")
-
-        identity_file = private_key_path if private_key_path else public_key_path.removesuffix(".pub")
-
-        # container_profile 구성
-        container_profile = self._build_container_profile(
-            name=name,
-            port=ssh_port,
-            identity_file=identity_file
-        )
-
-        profile = ContainerProfile(
-            name=name,
-            host_profile=self.host_profile,
-            container_profile=container_profile,
-            ssh_port=ssh_port,
-            image_address=image
-        )  
-
-        # register_ssh가 참인 경우 ssh config에 생성된 container_profile 추가 
-        if register_ssh:
-            SSHConfigManager.add_profile(container_profile)
-
-        try:
-            self._wait_for_ssh_ready(ssh_profile=container_profile, timeout=180, interval=10)
-        except TimeoutError as e:
-            # SSH 접속 불가 시 컨테이너 제거
-            Log.e(f"[{name}] SSH 연결 준비 타임아웃: {e}")
+        # 데이터셋 캐시 마운트 (캐시를 쓸 수 없어도 컨테이너는 생성)
+        # 이전 컨테이너가 inbox에 올려둔 데이터셋은 백그라운드에서 캐시에 반영 (마운트된 캐시에 바로 보임)
+        mounts: list[tuple[str, str, bool]] = []
+        if mount_datasets:
             try:
-                self.delete_container(container=profile, force=True)
-            except RuntimeError as cleanup_error:
-                Log.w(f"[{name}] 타임아웃 후 정리 실패: {cleanup_error}")
-            raise RuntimeError(f"[{name}] SSH 연결 실패로 컨테이너 생성 중단")
-        self._setup_container_env(container=profile)
+                mounts = self.dataset_cache.mount_args()
+                self.dataset_cache.maintain_in_background()
+            except RuntimeError as e:
+                Log.w(f"[{name}] 데이터셋 캐시를 마운트하지 않음: {e}")
+
+        # 포트 중복 확인 및 예약 (사용 중 포트는 한 번만 조회해 인덱스로 확인)
+        # auto 포트도 같은 잠금 안에서 예약되므로 여러 컨테이너를 동시에 생성해도 겹치지 않음
+        reserved: list[int] = []
+        try:
+            resolved_ports: list[tuple[str, str]] = []
+            for host_port, container_port in ports:
+                if host_port == "auto":
+                    kind = port_kind_for(container_port)
+                    if kind is None:
+                        raise RuntimeError(f"자동 할당을 지원하지 않는 컨테이너 포트: {container_port}")
+                    reserved.append(self.port_allocator.next_free(kind))
+                else:
+                    reserved.append(self.port_allocator.reserve(host_port))
+                resolved_ports.append((str(reserved[-1]), container_port))
+            ports = resolved_ports
+            if set_jupyter_lab:
+                jupyter_port = self.port_allocator.next_free("jupyter")
+                reserved.append(jupyter_port)
+                ports = ports + [(str(jupyter_port), "8888")]
+                Log.i(f"Jupyter Lab 포트 할당: {jupyter_port}")
+        except RuntimeError:
+            self.port_allocator.release(reserved)
+            raise
+        ssh_port = next(host for host, cont in ports if cont == "22")
+
+        # 예약 이후 단계(컨테이너 실행, SSH 대기, 환경 설정)가 실패하면 예약한 포트를 해제
+        try:
+            created = False
+            if self.engine:
+                try:
+                    self._api_run_container(name, image, ports, public_key, set_jupyter_lab, mounts)
+                    created = True
+                except DockerEngineUnavailable as e:
+                    self._fallback_to_cli(e)
+
+            if not created:
+                # 기본 run_command
+                run_command = [
+                    "docker", "run", "-d",
+                    "-e", f'PUBLIC_KEY="{public_key}"',
+                ]
+
+                # 포트 추가
+                for host_port, container_port in ports:
+                    run_command += ["-p", f"{host_port}:{container_port}"]
+
+                # 조건부 환경변수 추가
+                if set_jupyter_lab:
+                    run_command += ["-e", f'JUPYTER_PASSWORD="jupyterpassword"']
+
+                for host_path, container_path, read_only in mounts:
+                    run_command += ["-v", shlex.quote(f"{host_path}:{container_path}" + (":ro" if read_only else ""))]
+
+                # 나머지 고정 옵션 추가
+                run_command += [
+                    "--name", name,
+                    image
+                ]
+
+                docker_command = ' '.join(run_command)
+                Log.d(f"Docker 실행 명령: {docker_command}")
+
+                result = self.executor.execute(docker_command)
+                if result["returncode"] != 0:
+                    Log.e(f"컨테이너 생성 실패: {result['stderr']}")
+                    raise RuntimeError(f"컨테이너 생성 실패: {result['stderr']}")
+            Log.i(f"컨테이너 생성 성공: {name}")
+
+            identity_file = private_key_path if private_key_path else public_key_path.removesuffix(".pub")
+
+            # container_profile 구성
+            container_profile = self._build_container_profile(
+                name=name,
+                port=ssh_port,
+                identity_file=identity_file
+            )
 
-        return profile
+            profile = ContainerProfile(
+                name=name,
+                host_profile=self.host_profile,
+                container_profile=container_profile,
+                ssh_port=ssh_port,
+                image_address=image
+            )  
 
+            # register_ssh가 참인 경우 ssh config에 생성된 container_profile 추가 
+            if register_ssh:
+                SSHConfigManager.add_profile(container_profile)
 
-    def commit_container(self, container: ContainerProfile, image_name: str, tag: str = "latest") -> SSHResult:
+            try:
+                self._wait_for_ssh_ready(ssh_profile=container_profile, timeout=180, interval=10)
+            except TimeoutError as e:
+                # SSH 접속 불가 시 컨테이너 제거
+                Log.e(f"[{name}] SSH 연결 준비 타임아웃: {e}")
+                try:
+                    self.delete_container(container=profile, force=True)
+                except RuntimeError as cleanup_error:
+                    Log.w(f"[{name}] 타임아웃 후 정리 실패: {cleanup_error}")
+                raise RuntimeError(f"[{name}] SSH 연결 실패로 컨테이너 생성 중단")
+            self._setup_container_env(container=profile)
+            self.state_store.record_container(self.host_key, profile, status="running", action="create")
+
+            return profile
+        except BaseException:
+            self.port_allocator.release(reserved)
+            raise
+
+
+    def commit_container(self, container: ContainerProfile, image_name: str, tag: str = "latest", squash: bool = False) -> SSHResult:
+        """
+        :param squash: True면 docker commit 대신 최초 베이스 이미지 위에 누적 변경분 레이어만 두도록 다시 빌드
+                       (커밋/푸시를 반복해도 레이어가 늘지 않고 푸시할 양이 변경분으로 제한됨)
+        """
         name = container["name"]
 
         if not self.is_container_running(container):
@@ -128,6 +214,28 @@ class HostMachine:
             raise RuntimeError(f"컨테이너가 실행 중이 아닙니다: {name}")
 
         full_image = f"{image_name}:{tag}"
+        if squash:
+            Log.i(f"[{name}] squash 커밋 시작 → {full_image}")
+            result = self.executor.start(
+                build_squash_commit_command(name, full_image),
+                on_line=lambda stream_name, line: Log.v(f"[{name}] {line}"),
+                idle_timeout=600
+            ).wait()
+            if result["returncode"] != 0:
+                Log.e(f"[{name}] 컨테이너 squash 커밋 실패: {result['stderr']}")
+                raise RuntimeError(f"컨테이너 squash 커밋 실패: {result['stderr']}")
+            image_id = result["stdout"].splitlines()[-1] if result["stdout"] else ""
+            Log.i(f"[{name}] 커밋 성공 → {full_image} ({image_id})")
+            return {"returncode": 0, "stdout": image_id, "stderr": result["stderr"]}
+
+        if self.engine:
+            try:
+                image_id = self._api_call(f"[{name}] 컨테이너 커밋 실패", self.engine.commit_container, name, image_name, tag)
+                Log.i(f"[{name}] 커밋 성공 → {full_image}")
+                return {"returncode": 0, "stdout": image_id, "stderr": ""}
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
+
         command = f"docker commit {shlex.quote(name)} {shlex.quote(full_image)}"
 
         Log.d(f"[{name}] 이미지 커밋 명령어: {command}")
@@ -141,26 +249,72 @@ class HostMachine:
         return result
     
 
-    def list_containers(self, status: Literal["running", "all", "exited"] = "running") -> list[ContainerProfile]:
-        """지정한 상태의 컨테이너들을 ContainerProfile로 반환"""
-        Log.i(f"컨테이너 목록 조회: 상태={status}")
-
+    def list_containers(
+        self,
+        status: Literal["running", "all", "exited"] = "running",
+        name_filter: str | None = None,
+        label_filter: str | None = None,
+        cached: bool = False
+    ) -> list[ContainerProfile]:
+        """
+        지정한 상태의 컨테이너들을 ContainerProfile로 반환
+
+        :param name_filter: 이름 부분 일치 필터 (docker --filter name=)
+        :param label_filter: 라벨 필터, "key" 또는 "key=value" (docker --filter label=)
+        :param cached: 참이면 로컬 상태 저장소의 목록을 바로 반환하고 원격 목록과는 백그라운드에서 맞춤
+                       (필터를 쓰거나 한 번도 동기화한 적이 없으면 원격 조회)
+        """
+        if cached and not name_filter and not label_filter and self.state_store.last_synced(f"containers:{self.host_key}"):
+            self.state_store.reconcile_in_background(f"containers:{self.host_key}", lambda: self.list_containers(status="all"))
+            profiles = self.state_store.get_containers(self.host_key, status)
+            Log.d(f"[상태 저장소] {len(profiles)}개의 컨테이너 (상태={status})")
+            return [{**profile, "host_profile": self.host_profile} for profile in profiles]
+
+        Log.i(f"컨테이너 목록 조회: 상태={status}, name={name_filter}, label={label_filter}")
+
+        containers: list[tuple[ContainerProfile, str]] | None = None
+        if self.engine:
+            try:
+                containers = self._api_list_containers(status, name_filter, label_filter)
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
+
+        if containers is None:
+            containers = self._cli_list_containers(status, name_filter, label_filter)
+
+        # 필터 없는 전체 목록이면 저장소를 원격 상태로 맞추고, 일부 목록이면 조회된 항목만 갱신
+        if status == "all" and not name_filter and not label_filter:
+            self.state_store.sync_containers(self.host_key, containers)
+        else:
+            for profile, state in containers:
+                self.state_store.record_container(self.host_key, profile, status=state)
+
+        Log.d(f"{len(containers)}개의 컨테이너 검색됨")
+        return [profile for profile, _ in containers]
+
+    def _cli_list_containers(
+        self, status: Literal["running", "all", "exited"], name_filter: str | None = None, label_filter: str | None = None
+    ) -> list[tuple[ContainerProfile, str]]:
         status_filter = {
             "running": "--filter status=running",
             "exited": "--filter status=exited",
             "all": ""
         }[status]
+        if name_filter:
+            status_filter += f" --filter {shlex.quote(f'name={name_filter}')}"
+        if label_filter:
+            status_filter += f" --filter {shlex.quote(f'label={label_filter}')}"
 
-        command = f"docker ps -a {status_filter} --format '{{{{.Names}}}}|||{{{{.Image}}}}|||{{{{.Ports}}}}'"
+        command = f"docker ps -a {status_filter} --format '{{{{.Names}}}}|||{{{{.Image}}}}|||{{{{.Ports}}}}|||{{{{.State}}}}'"
         result = self.executor.execute(command)
 
         if result["returncode"] != 0:
             Log.e(f"컨테이너 목록 조회 실패: {result['stderr']}")
             raise RuntimeError(f"컨테이너 목록 조회 실패: {result['stderr']}")
 
-        profiles: list[ContainerProfile] = []
+        containers: list[tuple[ContainerProfile, str]] = []
         for line in result["stdout"].splitlines():
-            name, image, ports = line.strip().split("|||")
+            name, image, ports, state = line.strip().split("|||")
 
             # SSH 포트 추출
             try:
@@ -181,13 +335,17 @@ class HostMachine:
                 "ssh_port": ssh_port,
                 "image_address": image
             }
-            profiles.append(profile)
-
-        Log.d(f"{len(profiles)}개의 컨테이너 검색됨")
-        return profiles
+            containers.append((profile, state))
+        return containers
 
 
     def list_images(self, show_dangling: bool = False) -> list[dict[str, str]]:
+        if self.engine:
+            try:
+                return self._api_list_images(show_dangling)
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
+
         format_str = "'{{.Repository}}||{{.Tag}}||{{.ID}}||{{.CreatedSince}}||{{.Size}}'"
         cmd = ["docker", "images", "--format", format_str]
 
@@ -227,14 +385,25 @@ class HostMachine:
             Log.i(f"[{name}] 컨테이너가 실행 중이므로 정지 후 삭제합니다.")
             self.stop_container(container)
 
-        command = f"docker rm {shlex.quote(name)}"
-        Log.d(f"[{name}] 컨테이너 삭제 명령어: {command}")
+        result: SSHResult | None = None
+        if self.engine:
+            try:
+                self._api_call(f"[{name}] 컨테이너 삭제 실패", self.engine.remove_container, name)
+                result = {"returncode": 0, "stdout": name, "stderr": ""}
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
 
-        result = self.executor.execute(command)
+        if result is None:
+            command = f"docker rm {shlex.quote(name)}"
+            Log.d(f"[{name}] 컨테이너 삭제 명령어: {command}")
 
-        if result["returncode"] != 0:
-            Log.e(f"[{name}] 컨테이너 삭제 실패: {result['stderr']}")
-            raise RuntimeError(f"컨테이너 삭제 실패: {result['stderr']}")
+            result = self.executor.execute(command)
+
+            if result["returncode"] != 0:
+                Log.e(f"[{name}] 컨테이너 삭제 실패: {result['stderr']}")
+                raise RuntimeError(f"컨테이너 삭제 실패: {result['stderr']}")
+
+        self.state_store.mark_containers_removed(self.host_key, [name])
 
         # remove_ssh가 참인 경우 ssh config에서 container_profile 제거 
         if remove_ssh:
@@ -247,6 +416,15 @@ class HostMachine:
     def is_container_running(self, container: ContainerProfile) -> bool:
         """지정한 컨테이너가 실행 중인지 확인"""
         name = container["name"]
+        if self.engine:
+            try:
+                state = self._api_container_state(name)
+                is_running = bool(state and state.get("Running"))
+                Log.d(f"[{name}] 실행 중 여부: {is_running}")
+                return is_running
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
+
         command = f'docker ps --filter name={shlex.quote(name)} --filter status=running --format "{{{{.Names}}}}"'
 
         result = self.executor.execute(command)
@@ -274,15 +452,25 @@ class HostMachine:
                 "stderr": ""
             }
 
-        command = f"docker start {shlex.quote(name)}"
-        Log.d(f"[{name}] 컨테이너 시작 명령어: {command}")
+        result: SSHResult | None = None
+        if self.engine:
+            try:
+                self._api_call(f"[{name}] 컨테이너 시작 실패", self.engine.start_container, name)
+                result = {"returncode": 0, "stdout": name, "stderr": ""}
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
 
-        result = self.executor.execute(command)
+        if result is None:
+            command = f"docker start {shlex.quote(name)}"
+            Log.d(f"[{name}] 컨테이너 시작 명령어: {command}")
 
-        if result["returncode"] != 0:
-            Log.e(f"[{name}] 컨테이너 시작 실패: {result['stderr']}")
-            raise RuntimeError(f"컨테이너 시작 실패: {result['stderr']}")
+            result = self.executor.execute(command)
 
+            if result["returncode"] != 0:
+                Log.e(f"[{name}] 컨테이너 시작 실패: {result['stderr']}")
+                raise RuntimeError(f"컨테이너 시작 실패: {result['stderr']}")
+
+        self.state_store.set_container_status(self.host_key, [name], "running", action="start")
         Log.i(f"[{name}] 컨테이너 시작 완료")
         return result
 
@@ -300,21 +488,39 @@ class HostMachine:
                 "stderr": ""
             }
 
-        command = f"docker stop {shlex.quote(name)}"
-        Log.d(f"[{name}] 컨테이너 정지 명령어: {command}")
+        result: SSHResult | None = None
+        if self.engine:
+            try:
+                self._api_call(f"[{name}] 컨테이너 정지 실패", self.engine.stop_container, name)
+                result = {"returncode": 0, "stdout": name, "stderr": ""}
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
 
-        result = self.executor.execute(command)
+        if result is None:
+            command = f"docker stop {shlex.quote(name)}"
+            Log.d(f"[{name}] 컨테이너 정지 명령어: {command}")
 
-        if result["returncode"] != 0:
-            Log.e(f"[{name}] 컨테이너 정지 실패: {result['stderr']}")
-            raise RuntimeError(f"컨테이너 정지 실패: {result['stderr']}")
+            result = self.executor.execute(command)
+
+            if result["returncode"] != 0:
+                Log.e(f"[{name}] 컨테이너 정지 실패: {result['stderr']}")
+                raise RuntimeError(f"컨테이너 정지 실패: {result['stderr']}")
 
+        self.state_store.set_container_status(self.host_key, [name], "exited", action="stop")
         Log.i(f"[{name}] 컨테이너 정지 완료")
         return result
 
 
     def container_exists(self, name: str) -> bool:
         """지정한 이름의 컨테이너가 존재하는지 확인"""
+        if self.engine:
+            try:
+                exists = self._api_container_state(name) is not None
+                Log.d(f"컨테이너 존재 여부 확인: name={name}, exists={exists}")
+                return exists
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
+
         command = "docker ps -a --format '{{.Names}}'"
 
         result = self.executor.execute(command)
@@ -329,6 +535,319 @@ class HostMachine:
         return exists
 
 
+    # ---------------------------------------------------------------- 일괄 작업
+    # 대상은 containers(ContainerProfile 또는 이름 목록) 또는 name_filter/label_filter로 지정한다.
+    # CLI 방식은 `docker stop a b c`처럼 한 명령에 여러 컨테이너를 넘기고(parallel개 명령으로 분할),
+    # 한 번에 하나씩만 처리 가능한 작업(commit)과 API 방식은 parallel개 스레드로 호출한다.
+    # 실패해도 예외를 던지지 않고 컨테이너별 결과 목록을 반환한다.
+
+    def start_containers(
+        self,
+        containers: list[ContainerProfile] | list[str] | None = None,
+        name_filter: str | None = None,
+        label_filter: str | None = None,
+        parallel: int = 4
+    ) -> list[ContainerOpResult]:
+        names = self._resolve_bulk_targets(containers, name_filter, label_filter)
+        engine_call = self.engine.start_container if self.engine else None
+        return self._run_bulk("start", names, parallel, ["docker", "start"], engine_call)
+
+    def stop_containers(
+        self,
+        containers: list[ContainerProfile] | list[str] | None = None,
+        name_filter: str | None = None,
+        label_filter: str | None = None,
+        parallel: int = 4
+    ) -> list[ContainerOpResult]:
+        names = self._resolve_bulk_targets(containers, name_filter, label_filter)
+        engine_call = self.engine.stop_container if self.engine else None
+        return self._run_bulk("stop", names, parallel, ["docker", "stop"], engine_call)
+
+    def delete_containers(
+        self,
+        containers: list[ContainerProfile] | list[str] | None = None,
+        name_filter: str | None = None,
+        label_filter: str | None = None,
+        parallel: int = 4,
+        force: bool = False,
+        remove_ssh: bool = False
+    ) -> list[ContainerOpResult]:
+        """force=True면 실행 중인 컨테이너를 먼저 일괄 정지한 뒤 삭제"""
+        profiles = self._resolve_bulk_profiles(containers, name_filter, label_filter)
+        names = [profile["name"] for profile in profiles]
+        if force:
+            self.stop_containers(names, parallel=parallel)
+
+        engine_call = self.engine.remove_container if self.engine else None
+        results = self._run_bulk("delete", names, parallel, ["docker", "rm"], engine_call)
+
+        if remove_ssh:
+            deleted = {result["name"] for result in results if result["ok"]}
+            for profile in profiles:
+                if profile["name"] in deleted:
+                    SSHConfigManager.remove_profile(profile["container_profile"])
+        return results
+
+    def commit_containers(
+        self,
+        containers: list[ContainerProfile] | list[str] | None = None,
+        name_filter: str | None = None,
+        label_filter: str | None = None,
+        parallel: int = 4,
+        image_name: str = "{name}",
+        tag: str = "latest"
+    ) -> list[ContainerOpResult]:
+        """image_name의 {name}은 컨테이너 이름으로 치환 (예: "exp/{name}")"""
+        profiles = self._resolve_bulk_profiles(containers, name_filter, label_filter)
+
+        def commit(profile: ContainerProfile) -> ContainerOpResult:
+            start = time.time()
+            try:
+                result = self.commit_container(profile, image_name=image_name.format(name=profile["name"]), tag=tag)
+                return self._op_result(profile["name"], "commit", True, result["stdout"], start)
+            except Exception as e:
+                return self._op_result(profile["name"], "commit", False, str(e), start)
+
+        with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+            results = list(pool.map(commit, profiles))
+        self._log_bulk_summary("commit", results)
+        return results
+
+
+    def _resolve_bulk_profiles(
+        self,
+        containers: list[ContainerProfile] | list[str] | None,
+        name_filter: str | None,
+        label_filter: str | None
+    ) -> list[ContainerProfile]:
+        if containers is None and not name_filter and not label_filter:
+            raise ValueError("대상 컨테이너 목록 또는 필터가 필요합니다.")
+
+        if containers and not isinstance(containers[0], str):
+            return list(containers)  # type: ignore
+
+        profiles = self.list_containers(status="all", name_filter=name_filter, label_filter=label_filter)
+        if containers is None:
+            return profiles
+
+        by_name = {profile["name"]: profile for profile in profiles}
+        missing = [name for name in containers if name not in by_name]
+        if missing:
+            Log.w(f"존재하지 않는 컨테이너: {missing}")
+        return [by_name[name] for name in containers if name in by_name]  # type: ignore
+
+    def _resolve_bulk_targets(
+        self,
+        containers: list[ContainerProfile] | list[str] | None,
+        name_filter: str | None,
+        label_filter: str | None
+    ) -> list[str]:
+        # 이름 목록만 필요한 작업은 목록이 주어지면 조회 없이 그대로 사용 (없는 이름은 docker 오류로 보고됨)
+        if containers and isinstance(containers[0], str) and not name_filter and not label_filter:
+            return list(containers)  # type: ignore
+        return [profile["name"] for profile in self._resolve_bulk_profiles(containers, name_filter, label_filter)]
+
+    def _run_bulk(
+        self,
+        action: str,
+        names: list[str],
+        parallel: int,
+        docker_command: list[str],
+        engine_call: Optional[Callable[[str], None]]
+    ) -> list[ContainerOpResult]:
+        if not names:
+            Log.i(f"[일괄 {action}] 대상 컨테이너 없음")
+            return []
+        Log.i(f"[일괄 {action}] {len(names)}개 컨테이너, 병렬 {parallel}")
+        parallel = max(1, parallel)
+
+        results: dict[str, ContainerOpResult] = {}
+        remaining = names
+        if engine_call:
+            def call(name: str) -> ContainerOpResult | None:
+                start = time.time()
+                try:
+                    engine_call(name)
+                    return self._op_result(name, action, True, "", start)
+                except DockerEngineError as e:
+                    return self._op_result(name, action, False, e.message, start)
+                except DockerEngineUnavailable:
+                    return None
+
+            with ThreadPoolExecutor(max_workers=parallel) as pool:
+                for name, result in zip(names, pool.map(call, names)):
+                    if result is not None:
+                        results[name] = result
+            remaining = [name for name in names if name not in results]
+            if remaining:
+                self._fallback_to_cli(DockerEngineUnavailable(f"일괄 {action} 중 연결 끊김"))
+
+        if remaining:
+            # docker CLI는 여러 컨테이너를 한 명령으로 처리하므로 병렬 수만큼의 명령으로만 나눔
+            chunk_size = math.ceil(len(remaining) / parallel)
+            chunks = [remaining[i:i + chunk_size] for i in range(0, len(remaining), chunk_size)]
+
+            def run_chunk(chunk: list[str]) -> list[ContainerOpResult]:
+                start = time.time()
+                command = " ".join(docker_command + [shlex.quote(name) for name in chunk])
+                result = self.executor.execute(command)
+                succeeded = set(result["stdout"].split())
+                errors = result["stderr"].splitlines()
+                return [
+                    self._op_result(name, action, True, "", start) if name in succeeded else
+                    self._op_result(name, action, False, next((line for line in errors if name in line), result["stderr"] or "실패"), start)
+                    for name in chunk
+                ]
+
+            with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                for chunk_results in pool.map(run_chunk, chunks):
+                    results.update({result["name"]: result for result in chunk_results})
+
+        ordered = [results[name] for name in names]
+        succeeded = [result["name"] for result in ordered if result["ok"]]
+        if action == "delete":
+            self.state_store.mark_containers_removed(self.host_key, succeeded)
+        else:
+            self.state_store.set_container_status(self.host_key, succeeded, "running" if action == "start" else "exited", action=action)
+        self._log_bulk_summary(action, ordered)
+        return ordered
+
+    @staticmethod
+    def _op_result(name: str, action: str, ok: bool, detail: str, start: float) -> ContainerOpResult:
+        return {"name": name, "action": action, "ok": ok, "detail": detail.strip(), "duration": time.time() - start}
+
+    @staticmethod
+    def _log_bulk_summary(action: str, results: list[ContainerOpResult]) -> None:
+        failed = [result["name"] for result in results if not result["ok"]]
+        if failed:
+            Log.w(f"[일괄 {action}] 성공 {len(results) - len(failed)}개, 실패 {len(failed)}개: {failed}")
+        else:
+            Log.i(f"[일괄 {action}] {len(results)}개 모두 성공")
+
+
+    def get_events(self, since: int, until: int, filters: Optional[dict[str, list[str]]] = None) -> list[dict[str, Any]]:
+        """since~until(unix time) 사이의 docker 이벤트 목록 (Engine API 이벤트 JSON 형식)"""
+        if self.engine:
+            try:
+                return list(self._api_call("이벤트 조회 실패", self.engine.events, since=since, until=until, filters=filters))
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
+
+        command = f"docker events --since {since} --until {until} --format '{{{{json .}}}}'"
+        for key, values in (filters or {}).items():
+            command += "".join(f" --filter {shlex.quote(f'{key}={value}')}" for value in values)
+        result = self.executor.execute(command, log=False)
+        if result["returncode"] != 0:
+            Log.e(f"이벤트 조회 실패: {result['stderr']}")
+            raise RuntimeError(f"이벤트 조회 실패: {result['stderr']}")
+        return [json.loads(line) for line in result["stdout"].splitlines() if line.strip()]
+
+
+    # ---------------------------------------------------------------- Engine API 백엔드
+
+    def _fallback_to_cli(self, error: Exception) -> None:
+        Log.w(f"Docker Engine API 연결 끊김, CLI 방식으로 전환: {error}")
+        if self.engine:
+            self.engine.close()
+        self.engine = None
+
+
+    def _api_call(self, error_message: str, func, *args, **kwargs):
+        """API 오류 응답은 CLI 경로와 같은 형태의 RuntimeError로 변환 (연결 오류는 그대로 전달)"""
+        try:
+            return func(*args, **kwargs)
+        except DockerEngineError as e:
+            Log.e(f"{error_message}: {e.message}")
+            raise RuntimeError(f"{error_message}: {e.message}")
+
+
+    def _api_container_state(self, name: str) -> Optional[dict[str, Any]]:
+        """컨테이너 State 정보. 존재하지 않으면 None"""
+        assert self.engine
+        try:
+            return self.engine.inspect_container(name).get("State", {})
+        except DockerEngineError as e:
+            if e.status_code == 404:
+                return None
+            Log.e(f"[{name}] 컨테이너 상태 조회 실패: {e.message}")
+            raise RuntimeError(f"컨테이너 상태 조회 실패: {e.message}")
+
+
+    def _api_run_container(
+        self, name: str, image: str, ports: list[tuple[str, str]], public_key: str, set_jupyter_lab: bool,
+        mounts: Optional[list[tuple[str, str, bool]]] = None
+    ) -> None:
+        """`docker run -d`와 같은 동작 (create + start)"""
+        assert self.engine
+        env = [f"PUBLIC_KEY={public_key}"]
+        port_pairs = list(ports)
+        if set_jupyter_lab:
+            env.append("JUPYTER_PASSWORD=jupyterpassword")
+
+        port_bindings: dict[str, list[dict[str, str]]] = {}
+        for host_port, container_port in port_pairs:
+            port_bindings.setdefault(f"{container_port}/tcp", []).append({"HostPort": str(host_port)})
+
+        config = {
+            "Image": image,
+            "Env": env,
+            "ExposedPorts": {key: {} for key in port_bindings},
+            "HostConfig": {
+                "PortBindings": port_bindings,
+                "Binds": [f"{host}:{container}" + (":ro" if read_only else "") for host, container, read_only in mounts or []],
+            },
+        }
+        Log.d(f"Docker API 컨테이너 생성: {name}, ports={port_pairs}")
+        self._api_call("컨테이너 생성 실패", self.engine.create_container, name, config)
+        self._api_call("컨테이너 생성 실패", self.engine.start_container, name)
+
+
+    def _api_list_containers(
+        self, status: Literal["running", "all", "exited"], name_filter: str | None = None, label_filter: str | None = None
+    ) -> list[tuple[ContainerProfile, str]]:
+        assert self.engine
+        filters: dict[str, list[str]] = {"status": [status]} if status != "all" else {}
+        if name_filter:
+            filters["name"] = [name_filter]
+        if label_filter:
+            filters["label"] = [label_filter]
+        containers = self._api_call("컨테이너 목록 조회 실패", self.engine.list_containers, all=True, filters=filters or None)
+
+        profiles: list[tuple[ContainerProfile, str]] = []
+        for container in containers:
+            name = (container.get("Names") or ["/"])[0].lstrip("/")
+            ssh_port = next(
+                (str(p["PublicPort"]) for p in container.get("Ports") or [] if p.get("PrivatePort") == 22 and p.get("PublicPort")),
+                ""
+            )
+            profiles.append(({
+                "name": name,
+                "host_profile": self.host_profile,
+                "container_profile": self._build_container_profile(
+                    name=name, port=ssh_port, identity_file=self.host_profile.get("identity_file", None)),
+                "ssh_port": ssh_port,
+                "image_address": container.get("Image", ""),
+            }, container.get("State", "")))
+        return profiles
+
+
+    def _api_list_images(self, show_dangling: bool) -> list[dict[str, str]]:
+        assert self.engine
+        filters = None if show_dangling else {"dangling": ["false"]}
+        images: list[dict[str, str]] = []
+        for image in self._api_call("이미지 목록 조회 실패", self.engine.list_images, filters=filters):
+            for repo_tag in image.get("RepoTags") or ["<none>:<none>"]:
+                repository, _, tag = repo_tag.rpartition(":")
+                images.append({
+                    "repository": repository,
+                    "tag": tag,
+                    "image_id": image["Id"].removeprefix("sha256:")[:12],
+                    "created": _format_since(image.get("Created", 0)),
+                    "size": _format_size(image.get("Size", 0)),
+                })
+        return images
+
+
     def _extract_ssh_port(self, ports: str) -> str:
         # 예: "0.0.0.0:2222->22/tcp, [::]:2222->22/tcp"
         for segment in ports.split(","):
@@ -351,26 +870,80 @@ class HostMachine:
 
 
     def _is_port_in_use(self, port: str) -> bool:
-        command = "docker ps -a --format '{{.Ports}}'"
-        result = self.executor.execute(command)
-        if result["returncode"] != 0:
-            Log.w(f"포트 확인 명령 실패: {result['stderr']}")
-            raise RuntimeError(f"포트 확인 명령 실패: {result['stderr']}")
+        return not self.port_allocator.is_free(port)
 
-        for line in result["stdout"].splitlines():
-            if f":{port}->22" in line or f":{port}->" in line:
-                Log.d(f"[포트 충돌 확인] 사용 중인 포트 발견: {port}")
-                return True
-        return False
+
+    def list_bound_ports(self, include_listening: bool = True) -> set[int]:
+        """
+        호스트에서 사용 중인 포트 집합
+
+        docker 포트 바인딩은 정지된 컨테이너 것도 포함하고(재시작 시 다시 점유하므로),
+        include_listening이면 `ss -ltn`으로 docker 외 프로세스의 LISTEN 포트도 포함한다.
+        """
+        listen_command = "ss -ltnH 2>/dev/null || netstat -ltn 2>/dev/null"
+        bindings: list[dict[str, Any]] = []
+        listen_output = ""
+
+        used_api = False
+        if self.engine:
+            try:
+                containers = self._api_call("포트 확인 실패", self.engine.list_containers, all=True)
+                for container in containers:
+                    try:
+                        bindings.append(self.engine.inspect_container(container["Id"]).get("HostConfig", {}).get("PortBindings") or {})
+                    except DockerEngineError:
+                        continue  # 조회 사이에 삭제된 컨테이너
+                if include_listening:
+                    listen_output = self.executor.execute(listen_command, log=False)["stdout"]
+                used_api = True
+            except DockerEngineUnavailable as e:
+                self._fallback_to_cli(e)
+
+        if not used_api:
+            commands = ["docker ps -aq | xargs -r docker inspect --format '{{json .HostConfig.PortBindings}}'"]
+            if include_listening:
+                commands.append(listen_command)
+            results = self.executor.execute_batch(commands, log=False)
+            if not results or results[0]["returncode"] != 0:
+                stderr = results[0]["stderr"] if results else ""
+                Log.w(f"포트 확인 명령 실패: {stderr}")
+                raise RuntimeError(f"포트 확인 명령 실패: {stderr}")
+            for line in results[0]["stdout"].splitlines():
+                line = line.strip()
+                if line and line != "null":
+                    bindings.append(json.loads(line))
+            if include_listening and len(results) > 1:
+                listen_output = results[1]["stdout"]
+
+        ports: set[int] = set()
+        for binding in bindings:
+            for host_bindings in binding.values():
+                for host_binding in host_bindings or []:
+                    if str(host_binding.get("HostPort", "")).isdigit():
+                        ports.add(int(host_binding["HostPort"]))
+
+        for line in listen_output.splitlines():
+            # ss: "LISTEN 0 4096 0.0.0.0:2222 0.0.0.0:*", netstat: "tcp 0 0 0.0.0.0:22 0.0.0.0:* LISTEN"
+            for field in line.split():
+                match = re.search(r":(\d+)$", field)
+                if match:
+                    ports.add(int(match.group(1)))
+                    break
+
+        return ports
 
 
     def _wait_for_ssh_ready(self, ssh_profile: SSHProfile, timeout: int = 60, interval: int = 5) -> None:
         start = time.time()
         step_id = Log.start("SSH 연결 준비")
         ssh_executor = SSHExecutor(profile=ssh_profile)
+        target = (ssh_profile["hostname"], ssh_profile["port"])
         while time.time() - start < timeout:
             try: 
-                result = ssh_executor.execute("echo ready", log=False, StrictHostKeyChecking=False)
+                # 첫 배너 교환에서 호스트 키를 수집/고정한 뒤 엄격한 호스트 키 검사로 접속 확인
+                if not KnownHostsManager.pin([target]):
+                    raise ConnectionError("호스트 키 수집 실패")
+                result = ssh_executor.execute("echo ready", log=False)
                 if result["returncode"] == 0:
                     Log.end(step_id=step_id)
                     return
@@ -388,12 +961,17 @@ class HostMachine:
 
         base_apt_packages = ["rsync", "curl", "jq", "socat"]
         base_pip_packages = ["runpod", "matplotlib"]
-        install_cmd = [f"apt update -qq 2>/dev/null",
-                       f"DEBIAN_FRONTEND=noninteractive apt-get install -y -qq {' '.join(base_apt_packages)}",
-                       f"pip install -qq {' '.join(base_pip_packages)}"]
+        install_cmd = [f"apt update -q 2>/dev/null",
+                       f"DEBIAN_FRONTEND=noninteractive apt-get install -y -q {' '.join(base_apt_packages)}",
+                       f"pip install --progress-bar off {' '.join(base_pip_packages)}"]
         Log.v(f"[{container["name"]}] 패키지 설치 명령: {install_cmd}")
 
-        result = SSHExecutor(profile=container["container_profile"]).execute(install_cmd)
+        # 설치 로그를 실시간으로 남기고, 오랫동안 출력이 없으면 멈춘 것으로 보고 취소
+        result = SSHExecutor(profile=container["container_profile"]).start(
+            install_cmd,
+            on_line=lambda stream_name, line: Log.v(f"[{container['name']}] {line}"),
+            idle_timeout=300
+        ).wait()
 
         if result["returncode"] != 0:
             Log.e(f"[{container["name"]}] 패키지 설치 실패: {result["stderr"]}")
@@ -409,7 +987,31 @@ class HostMachine:
             Log.e(f"[{container["name"]}] 기본 폴더 업로드 실패")
             raise RuntimeError(f"컨테이너 환경 설정 실패")
         
-        chmod_cmd = "chmod +x /root/DOLAB/* && chmod +x /workspace/*"
-        result = SSHExecutor(profile=container["container_profile"]).execute(chmod_cmd)
+        results = SSHExecutor(profile=container["container_profile"]).execute_batch([
+            "chmod +x /root/DOLAB/*",
+            "chmod +x /workspace/*",
+        ])
+        for failed in [r for r in results if r["returncode"] != 0]:
+            Log.w(f"[{container["name"]}] 실행 권한 설정 실패: {failed["stderr"]}")
+
+        Log.end(step_id=step_id)
+
 
-        Log.end(step_id=step_id)
\ No newline at end of file
+def _format_since(timestamp: int) -> str:
+    """docker CLI의 CreatedSince와 같은 형식 (예: "3 days ago")"""
+    seconds = max(0, int(time.time()) - int(timestamp))
+    for unit, size in (("year", 31536000), ("month", 2592000), ("week", 604800), ("day", 86400), ("hour", 3600), ("minute", 60)):
+        if seconds >= size:
+            count = seconds // size
+            return f"{count} {unit}{'s' if count > 1 else ''} ago"
+    return "Less than a minute ago"
+
+
+def _format_size(size: int) -> str:
+    """docker CLI와 같은 10진 단위 크기 표기 (예: "1.23GB")"""
+    value = float(size)
+    for unit in ("B", "kB", "MB", "GB"):
+        if value < 1000:
+            return f"{value:.3g}{unit}"
+        value /= 1000
+    return f"{value:.3g}TB"
@@ -0,0 +1,92 @@
+from .logger import Log
+from .file_utils import file_lock, atomic_write_text
+from typing import Any, Optional, TypedDict
+from pathlib import Path
+import threading
+import json
+import time
+
+
+class CacheEntry(TypedDict):
+    etag: Optional[str]
+    fetched_at: float
+    body: Any
+
+
+class HTTPCache:
+    """
+    URL별 JSON 응답을 ETag와 함께 보관하는 디스크 캐시
+
+    - ttl 이내의 항목은 요청 없이 그대로 사용
+    - ttl이 지난 항목은 If-None-Match로 재검증하고, 304면 본문을 재사용
+    - 파일은 잠금 + 원자적 교체로 저장해 여러 프로세스가 함께 써도 깨지지 않음
+    """
+
+    def __init__(self, path: str | Path, ttl: float = 300.0, max_entries: int = 2000):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, CacheEntry] | None = None
+        self._dirty: set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._load().get(key)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def put(self, key: str, body: Any, etag: Optional[str]) -> None:
+        with self._lock:
+            self._load()[key] = {"etag": etag, "fetched_at": time.time(), "body": body}
+            self._dirty.add(key)
+
+    def touch(self, key: str) -> None:
+        """304 응답으로 재검증된 항목의 유효 기간 갱신"""
+        with self._lock:
+            entry = self._load().get(key)
+            if entry:
+                entry["fetched_at"] = time.time()
+                self._dirty.add(key)
+
+    def invalidate(self, prefix: str = "") -> None:
+        with self._lock:
+            for key, entry in self._load().items():
+                if key.startswith(prefix):
+                    entry["fetched_at"] = 0.0
+                    self._dirty.add(key)
+
+    def flush(self) -> None:
+        """변경된 항목만 디스크의 최신 내용에 병합해 저장"""
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            try:
+                with file_lock(self.path):
+                    on_disk = self._read_file()
+                    for key in self._dirty:
+                        if key in self._entries:
+                            on_disk[key] = self._entries[key]
+                    if len(on_disk) > self.max_entries:
+                        newest = sorted(on_disk.items(), key=lambda item: item[1]["fetched_at"], reverse=True)
+                        on_disk = dict(newest[:self.max_entries])
+                    atomic_write_text(self.path, json.dumps(on_disk, ensure_ascii=False))
+                self._entries = on_disk
+                self._dirty.clear()
+            except (OSError, TimeoutError) as e:
+                Log.w(f"HTTP 캐시 저장 실패 ({self.path}): {e}")
+
+    def _load(self) -> dict[str, CacheEntry]:
+        if self._entries is None:
+            self._entries = self._read_file()
+        return self._entries
+
+    def _read_file(self) -> dict[str, CacheEntry]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            Log.w(f"HTTP 캐시 파일을 읽을 수 없어 무시합니다 ({self.path}): {e}")
+            return {}
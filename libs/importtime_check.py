@@ -0,0 +1,83 @@
+"""
+main.py 시작 시간 점검 (`python -X importtime` 기반)
+
+    python -m libs.importtime_check [--runs 5] [--budget-ms 300] [--top 10]
+
+무거운 의존성(runpod, requests, tabulate 등)이 시작 시점에 import되거나
+import 시간 중앙값이 예산을 넘으면 종료 코드 1을 반환한다.
+"""
+from pathlib import Path
+from typing import NamedTuple
+import statistics
+import subprocess
+import argparse
+import time
+import sys
+import re
+
+# 처음 사용할 때 로드해야 하는 모듈 (runpod는 serverless/aiohttp까지 불러와 1초 이상 걸림)
+HEAVY_MODULES = ("runpod", "requests", "urllib3", "tabulate", "yaml", "aiohttp", "asyncio")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class ImportTime(NamedTuple):
+    total_us: int                  # 대상 모듈의 누적 import 시간
+    wall_s: float                  # 인터프리터 시작 ~ 종료까지 걸린 시간
+    self_us: dict[str, int]        # 모듈별 자체 import 시간
+
+
+def measure(target: str = "main") -> ImportTime:
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True)
+    wall_s = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"'{target}' import 실패:\n{process.stderr[-2000:]}")
+
+    total_us = 0
+    self_us: dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_time, cumulative, indent, module = match.groups()
+        self_us[module] = int(self_time)
+        if module == target and not indent:
+            total_us = int(cumulative)
+    return ImportTime(total_us=total_us, wall_s=wall_s, self_us=self_us)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="main.py import 시간 점검")
+    parser.add_argument("--target", default="main", help="측정할 모듈 (기본값: main)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="import 시간 중앙값 상한 (ms)")
+    parser.add_argument("--top", type=int, default=10, help="자체 시간이 긴 모듈 출력 개수")
+    args = parser.parse_args(argv)
+
+    results = [measure(args.target) for _ in range(max(1, args.runs))]
+    total_ms = statistics.median(result.total_us for result in results) / 1000
+    wall_ms = statistics.median(result.wall_s for result in results) * 1000
+    print(f"import {args.target}: {total_ms:.1f}ms (중앙값, {len(results)}회), 프로세스 전체: {wall_ms:.1f}ms")
+
+    slowest = sorted(results[-1].self_us.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for module, self_time in slowest:
+        print(f"  {self_time / 1000:8.1f}ms  {module}")
+
+    failed = False
+    heavy = sorted({m.split(".")[0] for m in results[-1].self_us} & set(HEAVY_MODULES))
+    if heavy:
+        failed = True
+        print(f"[실패] 시작 시점에 로드되면 안 되는 모듈: {', '.join(heavy)}")
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"[실패] import 시간이 예산을 초과했습니다: {total_ms:.1f}ms > {args.budget_ms:.1f}ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+from typing import Any, Literal, NotRequired, TypedDict
+
+
+class ContainerJobSpec(TypedDict):
+    kind: Literal["container"]
+    name: str
+    host: str                                # ~/.ssh/config의 Host 별칭
+    image: str
+    ports: NotRequired[list[str]]            # ["2222:22", "auto:8080"], 기본값: ["auto:22", "auto:8080"]
+    jupyter: NotRequired[bool]
+    register_ssh: NotRequired[bool]
+    public_key_path: NotRequired[str]
+    private_key_path: NotRequired[str]
+    backend: NotRequired[Literal["cli", "api"]]
+
+
+class PodJobSpec(TypedDict):
+    kind: Literal["pod"]
+    name: str
+    image: str                               # DockerHub 이미지 (username/repo:tag)
+    gpus: list[str]                          # 우선순위 순서의 GPU ID 또는 표시 이름
+    cloud_type: NotRequired[Literal["ALL", "SECURE", "COMMUNITY"]]
+    gpu_count: NotRequired[int]
+    container_disk_in_gb: NotRequired[int]
+    max_price_per_hr: NotRequired[float]     # GPU 1개당 시간 요금 상한 (초과하는 GPU는 후보에서 제외)
+    jupyter: NotRequired[bool]
+    register_ssh: NotRequired[bool]
+    env: NotRequired[dict[str, str]]
+    host: NotRequired[str]                   # sync_target 컨테이너가 있는 호스트
+    sync_target: NotRequired[str]            # 학습 결과를 동기화할 컨테이너 이름
+    datasets: NotRequired[list[str]]         # sync_target 컨테이너가 pod 준비와 동시에 올려줄 데이터셋 ("이름" 또는 "이름@해시")
+    pool: NotRequired[bool]                  # 참이면 PodPool에서 임대한 pod로 command를 실행하고 반납
+    command: NotRequired[str]                # pod에서 실행할 명령 (pool 사용 시 필수)
+    timeout: NotRequired[float]              # command 실행 시간 제한(초)
+
+
+class ExperimentJobSpec(TypedDict):
+    kind: Literal["experiment"]
+    name: str
+    image: str                               # 실행할 이미지 (로컬 호스트/pod 공통)
+    command: str                             # 컨테이너/pod 안에서 실행할 명령
+    gpu_count: NotRequired[int]              # 기본값: 1
+    env: NotRequired[dict[str, str]]
+    placement: NotRequired[Literal["auto", "local", "runpod"]]  # auto: 로컬 GPU 우선, 없으면 RunPod
+    hosts: NotRequired[list[str]]            # 로컬 후보 호스트 (기본값: 스케줄러에 등록된 전체)
+    runpod_gpus: NotRequired[list[str]]      # RunPod GPU 후보 (우선순위 순서의 ID 또는 표시 이름)
+    cloud_type: NotRequired[Literal["ALL", "SECURE", "COMMUNITY"]]
+    max_price_per_hr: NotRequired[float]     # GPU 1개당 시간 요금 상한
+    pool: NotRequired[bool]                  # RunPod 실행 시 PodPool 사용
+    outputs: NotRequired[str]                # 동기화할 결과 디렉터리 (기본값: /workspace/logs)
+    sync_host: NotRequired[str]              # 결과를 받을 컨테이너가 있는 호스트
+    sync_target: NotRequired[str]            # 결과를 받을 컨테이너 이름
+    max_retries: NotRequired[int]            # 용량 부족(GPU/pod 없음) 시 재시도 횟수
+    timeout: NotRequired[float]              # command 실행 시간 제한(초)
+
+
+JobSpec = ContainerJobSpec | PodJobSpec | ExperimentJobSpec
+
+
+class JobResult(TypedDict):
+    name: str
+    kind: str
+    ok: bool
+    error: str
+    duration: float
+    result: dict[str, Any]
@@ -0,0 +1,432 @@
+from .logger import Log
+from .job_spec import ContainerJobSpec, JobResult, JobSpec, PodJobSpec
+from .host_machine import HostMachine
+from .container_profile import ContainerProfile
+from .ssh_config_manager import SSHConfigManager
+from .runpod_manager import RunPodManager, RunPodProfile
+from .runpod_profile import GpuType
+from .ssh_key_provisioner import SyncKeyRegistry
+from .known_hosts_manager import KnownHostsManager
+from .pod_info import POD_INFO_DIR, PodInfoBuilder, PodInfoUploader
+from .pod_pool import PodPool
+from .dataset_stager import DatasetStager, POD_DATASET_DIR
+from .dataset_record import StagedDataset
+from .ssh_executor import SSHExecutor
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Literal, Optional
+from pathlib import Path
+import threading
+import shlex
+import json
+import time
+import os
+
+DEFAULT_CONTAINER_PORTS = ["auto:22", "auto:8080"]
+
+_REQUIRED_KEYS: dict[str, tuple[str, ...]] = {
+    "container": ("name", "host", "image"),
+    "pod": ("name", "image", "gpus"),
+    "experiment": ("name", "image", "command"),
+}
+
+
+def load_job_specs(path: str | Path) -> list[JobSpec]:
+    """
+    JSON/YAML 작업 명세 파일 로드
+
+    지원 형식:
+        - 작업 하나: {"kind": "container", ...}
+        - 작업 목록: [{...}, {...}]
+        - 공통 값: {"defaults": {...}, "jobs": [{...}, ...]}
+    작업에 "count": N이 있으면 이름 뒤에 -01 ~ -N을 붙여 N개로 펼친다.
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml  # YAML 작업 명세를 쓸 때만 필요
+        except ImportError:
+            raise RuntimeError("YAML 작업 명세를 읽으려면 PyYAML이 필요합니다. (pip install pyyaml)")
+        data = yaml.safe_load(text)
+    else:
+        data = json.loads(text)
+
+    if isinstance(data, dict) and "jobs" in data:
+        defaults = data.get("defaults") or {}
+        raw_jobs = [{**defaults, **job} for job in data["jobs"]]
+    elif isinstance(data, dict):
+        raw_jobs = [data]
+    elif isinstance(data, list):
+        raw_jobs = data
+    else:
+        raise ValueError(f"작업 명세 형식이 올바르지 않습니다: {path}")
+
+    specs: list[JobSpec] = []
+    for job in raw_jobs:
+        count = int(job.pop("count", 1))
+        if count <= 1:
+            specs.append(validate_job_spec(job))
+            continue
+        width = len(str(count))
+        for i in range(1, count + 1):
+            specs.append(validate_job_spec({**job, "name": f"{job.get('name', '')}-{i:0{max(2, width)}d}"}))
+    return specs
+
+
+def validate_job_spec(spec: dict[str, Any]) -> JobSpec:
+    kind = spec.get("kind")
+    if kind not in _REQUIRED_KEYS:
+        raise ValueError(f"알 수 없는 작업 종류: {kind!r} (container, pod 또는 experiment)")
+    missing = [key for key in _REQUIRED_KEYS[kind] if not spec.get(key)]
+    if missing:
+        raise ValueError(f"[{spec.get('name', '?')}] 필수 항목 누락: {missing}")
+
+    if kind == "container":
+        for port in spec.get("ports", DEFAULT_CONTAINER_PORTS):
+            host_port, _, container_port = str(port).partition(":")
+            if not container_port.isdigit() or not (host_port.isdigit() or host_port == "auto"):
+                raise ValueError(f"[{spec['name']}] 포트 형식 오류: {port!r} (예: 2222:22, auto:22)")
+    elif kind == "experiment":
+        if isinstance(spec.get("runpod_gpus"), str):
+            spec["runpod_gpus"] = [spec["runpod_gpus"]]
+        if spec.get("placement", "auto") not in ("auto", "local", "runpod"):
+            raise ValueError(f"[{spec['name']}] placement는 auto, local, runpod 중 하나여야 합니다: {spec['placement']!r}")
+        if spec.get("sync_target") and not spec.get("sync_host"):
+            raise ValueError(f"[{spec['name']}] sync_target을 쓰려면 sync_host가 필요합니다.")
+    else:
+        if isinstance(spec["gpus"], str):
+            spec["gpus"] = [spec["gpus"]]
+        if spec.get("sync_target") and not spec.get("host"):
+            raise ValueError(f"[{spec['name']}] sync_target을 쓰려면 host가 필요합니다.")
+        if isinstance(spec.get("datasets"), str):
+            spec["datasets"] = [spec["datasets"]]
+        if spec.get("datasets") and not spec.get("sync_target"):
+            raise ValueError(f"[{spec['name']}] datasets를 쓰려면 데이터셋을 올려줄 sync_target 컨테이너가 필요합니다.")
+        if spec.get("pool") and not spec.get("command"):
+            raise ValueError(f"[{spec['name']}] pool을 쓰려면 pod에서 실행할 command가 필요합니다.")
+    return spec  # type: ignore
+
+
+def connect_pod_to_container(
+    runpod_manager: RunPodManager,
+    pod: RunPodProfile,
+    container: Optional[ContainerProfile],
+    register_ssh: bool,
+    key_preinstalled: bool = False,
+    sync_dir: Optional[str] = None
+) -> None:
+    """
+    생성된 pod를 SSH config에 등록하고 동기화 대상 컨테이너와 키/접속 정보를 연결
+
+    :param key_preinstalled: 컨테이너 공개키를 create_pod(public_keys=...)로 이미 넣은 경우 SSH로 다시 올리지 않음
+    :param sync_dir: 컨테이너 target_dir 아래 동기화 디렉터리 이름 (기본: pod ID). 풀 임대처럼 같은 pod를 여러 작업이 쓸 때 지정
+    """
+    # SSH config 등록 시 known_hosts의 이전 항목이 정리되므로 호스트 키 고정 전에 등록
+    if register_ssh:
+        SSHConfigManager.add_profile(pod["ssh_profile"])
+
+    if container is None:
+        return
+
+    key_registry = SyncKeyRegistry.default()
+    key_provisioner = key_registry.key_for(container["host_profile"]["host"], container["name"])
+    if not key_preinstalled:
+        # upload_public_key_to_pod가 공개키 업로드 전에 호스트 키를 고정함
+        key_provisioner.upload_public_key_to_pod(ssh_profile=pod["ssh_profile"])
+    else:
+        # 공개키 업로드를 건너뛰어도 이후 SSH 접속(엄격한 호스트 키 검사)을 위해 호스트 키는 고정
+        ssh_profile = pod["ssh_profile"]
+        if not KnownHostsManager.pin([(ssh_profile["hostname"], ssh_profile["port"])]):
+            Log.e(f"pod 호스트 키 수집 실패: {ssh_profile['hostname']}:{ssh_profile['port']}")
+            raise RuntimeError("pod 호스트 키 수집 실패")
+    container_key_path = key_registry.install_private_key(container)
+
+    pod_info = PodInfoBuilder.build(runpod_profile=pod, runpod_api_key=runpod_manager.get_api_key(), identity_file_path=container_key_path)
+    remote_path = None
+    if sync_dir:
+        pod_info["sync_dir"] = sync_dir
+        remote_path = f"{POD_INFO_DIR}/{sync_dir}.json"
+    PodInfoUploader.upload(info=pod_info, ssh_profile=container["container_profile"], remote_path=remote_path)
+    runpod_manager.state_store.link_sync(
+        pod_id=pod["id"],
+        host=container["host_profile"]["host"],
+        container=container["name"],
+        key_path=str(key_provisioner.private_key_path),
+        container_key_path=container_key_path
+    )
+
+
+def disconnect_pod_from_container(
+    runpod_manager: RunPodManager,
+    pod: RunPodProfile,
+    container: Optional[ContainerProfile],
+    sync_dir: Optional[str] = None
+) -> None:
+    """connect_pod_to_container로 만든 동기화 연결 해제 (컨테이너의 pod 정보 파일과 sync 링크 삭제)"""
+    if container is None:
+        return
+    if not PodInfoUploader.remove(sync_dir or pod["id"], container["container_profile"]):
+        Log.w(f"[{pod['id']}] 컨테이너 {container['name']}의 pod 정보 파일 삭제 실패")
+    runpod_manager.state_store.unlink_sync(pod_id=pod["id"], host=container["host_profile"]["host"], container=container["name"])
+
+
+def resolve_gpus(
+    gpu_types: list[GpuType], preferences: list[str], cloud_type: str, max_price_per_hr: Optional[float]
+) -> list[tuple[str, Optional[float]]]:
+    """
+    GPU ID/표시 이름을 ID로 변환하고, cloud 종류와 가격 상한으로 후보를 거름 (우선순위 유지)
+
+    :return: [(GPU ID, GPU 1개당 시간 요금), ...]. 목록에 없는 항목은 요금 None으로 그대로 사용
+    """
+    def price(gpu: GpuType) -> Optional[float]:
+        prices = []
+        if cloud_type in ("ALL", "SECURE") and gpu.get("secureCloud"):
+            prices.append(gpu["securePrice"])
+        if cloud_type in ("ALL", "COMMUNITY") and gpu.get("communityCloud"):
+            prices.append(gpu["communityPrice"])
+        return min(prices) if prices else None
+
+    candidates: dict[str, Optional[float]] = {}
+    for preference in preferences:
+        gpu = next((g for g in gpu_types if preference in (g["id"], g["displayName"]) or preference.lower() == g["displayName"].lower()), None)
+        if gpu is None:
+            Log.w(f"GPU 목록에 없는 항목은 그대로 사용: {preference}")
+            candidates.setdefault(preference, None)
+            continue
+        gpu_price = price(gpu)
+        if gpu_price is None:
+            Log.w(f"{cloud_type} cloud에서 사용할 수 없는 GPU 제외: {gpu['id']}")
+            continue
+        if max_price_per_hr is not None and gpu_price > max_price_per_hr:
+            Log.w(f"가격 상한 초과 GPU 제외: {gpu['id']} (${gpu_price:.2f}/hr > ${max_price_per_hr:.2f}/hr)")
+            continue
+        candidates.setdefault(gpu["id"], gpu_price)
+
+    if not candidates:
+        raise RuntimeError(f"조건에 맞는 GPU가 없습니다: {preferences}")
+    return list(candidates.items())
+
+
+class JobRunner:
+    """
+    작업 명세 여러 개를 동시에 실행
+
+    - 호스트별 HostMachine과 RunPodManager, GPU 목록은 작업 간에 공유
+    - 작업 하나가 실패해도 나머지는 계속 실행하고, 결과는 완료되는 순서대로 on_result로 전달
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        on_result: Optional[Callable[[JobResult], None]] = None,
+        runpod_manager: Optional[RunPodManager] = None,
+        pod_pool: Optional[PodPool] = None,
+        pool_options: Optional[dict[str, Any]] = None,
+        keep_warm_pods: bool = False
+    ):
+        """
+        :param pod_pool: pool 작업이 쓸 풀. 없으면 처음 필요할 때 pool_options(PodPool 인자)로 생성
+        :param keep_warm_pods: close() 시 풀의 대기 pod를 종료하지 않고 남겨 다음 실행에서 재사용
+        """
+        self.max_workers = max(1, max_workers)
+        self.on_result = on_result
+        self._runpod_manager = runpod_manager
+        self._pod_pool = pod_pool
+        self._owns_pod_pool = pod_pool is None
+        self.pool_options = pool_options or {}
+        self.keep_warm_pods = keep_warm_pods
+        self._host_machines: dict[tuple[str, str], HostMachine] = {}
+        self._gpu_types: Optional[list[GpuType]] = None
+        self._lock = threading.Lock()
+
+    def run(self, specs: list[JobSpec]) -> list[JobResult]:
+        """모든 작업을 실행하고 명세 순서대로 결과 반환"""
+        step_id = Log.start(f"작업 {len(specs)}개 실행 (동시 {self.max_workers}개)")
+        results: list[JobResult | None] = [None] * len(specs)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.run_one, spec): index for index, spec in enumerate(specs)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if self.on_result:
+                    self.on_result(result)
+        Log.end(step_id=step_id)
+        return results  # type: ignore
+
+    def run_one(self, spec: JobSpec) -> JobResult:
+        start = time.time()
+        try:
+            if spec["kind"] == "container":
+                output = self._run_container(spec)  # type: ignore
+            elif spec["kind"] == "experiment":
+                raise RuntimeError("experiment 작업은 실험 큐로 실행합니다. (queue submit / queue run)")
+            else:
+                output = self._run_pod(spec)  # type: ignore
+            return {"name": spec["name"], "kind": spec["kind"], "ok": True, "error": "", "duration": time.time() - start, "result": output}
+        except Exception as e:
+            Log.e(f"[{spec['name']}] 작업 실패: {e}")
+            return {"name": spec["name"], "kind": spec["kind"], "ok": False, "error": str(e), "duration": time.time() - start, "result": {}}
+
+    def host_machine(self, host: str, backend: Literal["cli", "api"] = "cli") -> HostMachine:
+        with self._lock:
+            key = (host, backend)
+            if key not in self._host_machines:
+                self._host_machines[key] = HostMachine(ssh_profile=SSHConfigManager.read_profile(host), backend=backend)
+            return self._host_machines[key]
+
+    def runpod_manager(self) -> RunPodManager:
+        with self._lock:
+            if self._runpod_manager is None:
+                self._runpod_manager = RunPodManager()
+            return self._runpod_manager
+
+    def pod_pool(self) -> PodPool:
+        runpod_manager = self.runpod_manager()
+        with self._lock:
+            if self._pod_pool is None:
+                self._pod_pool = PodPool(runpod_manager, **self.pool_options)
+                self._pod_pool.start()
+            return self._pod_pool
+
+    def close(self) -> None:
+        if self._pod_pool and self._owns_pod_pool:
+            self._pod_pool.close(terminate_idle=not self.keep_warm_pods)
+        for host_machine in self._host_machines.values():
+            host_machine.close()
+
+    def _run_container(self, spec: ContainerJobSpec) -> dict[str, Any]:
+        host_machine = self.host_machine(spec["host"], spec.get("backend", "cli"))
+        ports = [tuple(str(port).split(":", 1)) for port in spec.get("ports", DEFAULT_CONTAINER_PORTS)]
+        public_key_path = os.path.expanduser(spec.get("public_key_path", "~/.ssh/id_ed25519.pub"))
+        private_key_path = os.path.expanduser(spec.get("private_key_path", public_key_path.removesuffix(".pub")))
+
+        container = host_machine.create_container(
+            name=spec["name"],
+            image=spec["image"],
+            ports=ports,  # type: ignore
+            public_key_path=public_key_path,
+            private_key_path=private_key_path,
+            set_jupyter_lab=spec.get("jupyter", False),
+            register_ssh=spec.get("register_ssh", True)
+        )
+        return {
+            "host": spec["host"],
+            "name": container["name"],
+            "image": container["image_address"],
+            "ssh_host": container["container_profile"]["hostname"],
+            "ssh_port": container["ssh_port"],
+        }
+
+    def _run_pod(self, spec: PodJobSpec) -> dict[str, Any]:
+        runpod_manager = self.runpod_manager()
+        cloud_type = spec.get("cloud_type", "ALL")
+        gpu_ids = self._resolve_gpus(spec["gpus"], cloud_type, spec.get("max_price_per_hr"))
+
+        # 동기화 대상 컨테이너를 먼저 확인해 pod를 만든 뒤에 실패하지 않도록 함
+        container: Optional[ContainerProfile] = None
+        if spec.get("sync_target"):
+            host_machine = self.host_machine(spec["host"])  # type: ignore
+            container = next((c for c in host_machine.list_containers(status="running") if c["name"] == spec["sync_target"]), None)
+            if container is None:
+                raise RuntimeError(f"실행 중인 동기화 대상 컨테이너가 없습니다: {spec['sync_target']}")
+
+        if spec.get("pool"):
+            return self._run_pooled_pod({**spec, "gpus": gpu_ids}, container)
+
+        # 데이터셋을 올리는 동안 pod의 학습 코드가 기다리도록 환경변수로 알림 (resolve_dataset)
+        datasets = spec.get("datasets") or []
+        env = dict(spec.get("env") or {})
+        if datasets:
+            env.update(DatasetStager.pod_env(datasets))
+
+        pod = runpod_manager.create_pod(
+            name=spec["name"],
+            image_name=spec["image"],
+            gpu_type_id=gpu_ids,
+            cloud_type=cloud_type,
+            gpu_count=spec.get("gpu_count", 1),
+            container_disk_in_gb=spec.get("container_disk_in_gb"),
+            env=env or None,
+            start_jupyter=spec.get("jupyter", False),
+            public_keys=[SyncKeyRegistry.default().public_key(container["host_profile"]["host"], container["name"])] if container else None
+        )
+        staging = self._start_dataset_staging(pod, container, datasets)
+        connect_pod_to_container(runpod_manager, pod, container, register_ssh=spec.get("register_ssh", True), key_preinstalled=True)
+        return {
+            "id": pod["id"],
+            "name": pod["name"],
+            "image": pod["image_name"],
+            "gpu": pod["gpu_display_name"],
+            "gpu_count": pod["gpu_count"],
+            "cost_per_hr": pod["cost_per_hr"],
+            "ssh_host": pod["ssh_profile"]["hostname"],
+            "ssh_port": pod["ssh_profile"]["port"],
+            "sync_target": spec.get("sync_target", ""),
+            "datasets": self._wait_dataset_staging(pod, staging),
+        }
+
+    def _run_pooled_pod(self, spec: PodJobSpec, container: Optional[ContainerProfile]) -> dict[str, Any]:
+        """풀에서 pod를 임대해 command를 실행하고 반납 (작업 공간은 반납 시 정리)"""
+        with self.pod_pool().lease(spec) as lease:
+            pod = lease.pod
+            staging = self._start_dataset_staging(pod, container, spec.get("datasets") or [])
+            sync_dir = f"{pod['id']}-{lease.id}"
+            connect_pod_to_container(self.runpod_manager(), pod, container, register_ssh=False, sync_dir=sync_dir)
+
+            # 반납(작업 공간 정리) 전에 동기화를 끊어 다음 임대가 이 작업의 결과 디렉터리를 건드리지 않도록 함
+            try:
+                # 데이터셋이 모두 올라온 뒤 명령 실행 (실패하면 캐시를 쓰지 않고 학습 코드가 직접 받음)
+                command = spec["command"]  # type: ignore
+                staged = self._wait_dataset_staging(pod, staging)
+                if staged:
+                    command = f"export DOLAB_DATASET_CACHE={shlex.quote(POD_DATASET_DIR)}; {command}"
+
+                job = SSHExecutor(pod["ssh_profile"]).stream(lease.wrap_command(command), timeout=spec.get("timeout"))
+                for _, line in job:
+                    Log.v(f"[{spec['name']}] {line}")
+                result = job.wait()
+            finally:
+                disconnect_pod_from_container(self.runpod_manager(), pod, container, sync_dir=sync_dir)
+            if result["returncode"] != 0:
+                raise RuntimeError(f"pod 명령 실패 (rc={result['returncode']}): {result['stderr'][-500:]}")
+
+            return {
+                "id": pod["id"],
+                "name": pod["name"],
+                "gpu": pod["gpu_display_name"],
+                "cost_per_hr": pod["cost_per_hr"],
+                "pooled": True,
+                "lease_seconds": time.time() - lease.leased_at,
+                "returncode": result["returncode"],
+                "stdout": result["stdout"][-2000:],
+                "sync_target": spec.get("sync_target", ""),
+                "sync_dir": sync_dir if container else "",
+                "datasets": staged,
+            }
+
+    def _start_dataset_staging(
+        self, pod: RunPodProfile, container: Optional[ContainerProfile], datasets: list[str]
+    ) -> "Optional[Future[list[StagedDataset]]]":
+        """pod가 SSH로 접속 가능해지면 바로 데이터셋 업로드 시작 (pod 연결/학습 준비와 동시에 진행)"""
+        if not datasets or container is None:
+            return None
+        key_path = SyncKeyRegistry.default().install_private_key(container)
+        return DatasetStager(container, key_path).start(pod, datasets)
+
+    def _wait_dataset_staging(
+        self, pod: RunPodProfile, staging: "Optional[Future[list[StagedDataset]]]"
+    ) -> list[StagedDataset]:
+        if staging is None:
+            return []
+        try:
+            return staging.result()
+        except RuntimeError as e:
+            Log.w(f"[{pod['id']}] 데이터셋을 미리 올리지 못해 학습 코드가 직접 받음: {e}")
+            return []
+
+    def _resolve_gpus(self, preferences: list[str], cloud_type: str, max_price_per_hr: Optional[float]) -> list[str]:
+        with self._lock:
+            if self._gpu_types is None:
+                self._gpu_types = RunPodManager.get_gpus_detailed()
+            gpu_types = self._gpu_types
+        return [gpu_id for gpu_id, _ in resolve_gpus(gpu_types, preferences, cloud_type, max_price_per_hr)]
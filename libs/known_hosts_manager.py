@@ -0,0 +1,160 @@
+from .logger import Log
+from .file_utils import file_lock, atomic_write_text
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import subprocess
+import threading
+import hashlib
+import base64
+import hmac
+
+
+class KnownHostsManager:
+    """
+    known_hosts 파일 일괄 관리
+
+    - 여러 항목의 제거/추가를 파일 한 번 읽고 한 번 쓰는 것으로 처리 (ssh-keygen -R 반복 호출 대체)
+    - ssh-keyscan으로 새 컨테이너/pod의 호스트 키를 수집해 고정(pin)하여
+      이후 접속이 StrictHostKeyChecking=no 없이 가능하도록 함
+    """
+    _known_hosts_path = Path("~/.ssh/known_hosts").expanduser()
+    _lock = threading.Lock()
+
+    @classmethod
+    def set_known_hosts_path(cls, path: str) -> None:
+        cls._known_hosts_path = Path(path).expanduser()
+
+    @classmethod
+    def get_known_hosts_path(cls) -> Path:
+        return cls._known_hosts_path
+
+    @staticmethod
+    def host_token(hostname: str, port: str | int) -> str:
+        """known_hosts에 기록되는 호스트 표기 (22번 포트는 포트 생략)"""
+        return hostname if str(port) == "22" else f"[{hostname}]:{port}"
+
+    @classmethod
+    def apply(cls, removals: list[tuple[str, str]] | None = None, additions: list[str] | None = None) -> int:
+        """
+        제거와 추가를 한 번의 파일 재작성으로 적용
+
+        :param removals: 제거할 (hostname, port) 목록 (해시된 항목도 매칭)
+        :param additions: 추가할 known_hosts 형식의 줄 목록
+        :return: 제거된 호스트 항목 수
+        """
+        tokens = {cls.host_token(hostname, port) for hostname, port in (removals or [])}
+        additions = [line.strip() for line in (additions or []) if line.strip()]
+        if not tokens and not additions:
+            return 0
+
+        path = cls.get_known_hosts_path()
+        with cls._lock, file_lock(path):
+            lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+
+            removed = 0
+            new_lines: list[str] = []
+            for line in lines:
+                kept_line, removed_count = _remove_tokens(line, tokens)
+                removed += removed_count
+                if kept_line is not None:
+                    new_lines.append(kept_line)
+
+            new_lines += [line for line in additions if line not in new_lines]
+            atomic_write_text(path, "\n".join(new_lines) + "\n" if new_lines else "")
+
+        Log.i(f"known_hosts 갱신: 제거 {removed}개, 추가 {len(additions)}개")
+        return removed
+
+    @classmethod
+    def remove(cls, hostname: str, port: str | int) -> int:
+        return cls.apply(removals=[(hostname, str(port))])
+
+    @staticmethod
+    def scan(targets: list[tuple[str, str]], timeout: int = 5, max_workers: int = 8) -> dict[tuple[str, str], list[str]]:
+        """
+        ssh-keyscan으로 호스트 키 수집. 포트별로 묶어 ssh-keyscan 한 번에 여러 호스트를 조회하고,
+        포트 그룹끼리는 병렬로 실행한다.
+
+        :return: (hostname, port) → known_hosts 형식의 줄 목록 (수집 실패 시 빈 목록)
+        """
+        by_port: dict[str, list[str]] = {}
+        for hostname, port in targets:
+            by_port.setdefault(str(port), []).append(hostname)
+
+        def scan_port(port: str, hostnames: list[str]) -> list[str]:
+            cmd = ["ssh-keyscan", "-T", str(timeout), "-p", port, *hostnames]
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout * len(hostnames) + 10)
+            except Exception as e:
+                Log.w(f"ssh-keyscan 실행 실패 (port={port}): {e}")
+                return []
+            return [line for line in result.stdout.splitlines() if line.strip() and not line.startswith("#")]
+
+        results: dict[tuple[str, str], list[str]] = {(hostname, str(port)): [] for hostname, port in targets}
+        if not by_port:
+            return results
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(by_port)))) as pool:
+            futures = {port: pool.submit(scan_port, port, hostnames) for port, hostnames in by_port.items()}
+            for port, future in futures.items():
+                for line in future.result():
+                    token = line.split(None, 1)[0]
+                    for hostname in by_port[port]:
+                        if token == KnownHostsManager.host_token(hostname, port):
+                            results[(hostname, port)].append(line)
+        return results
+
+    @classmethod
+    def pin(cls, targets: list[tuple[str, str]], timeout: int = 5) -> list[tuple[str, str]]:
+        """
+        호스트 키를 수집해 기존 항목을 교체 (파일 재작성 1회)
+
+        :return: 키 고정에 성공한 (hostname, port) 목록
+        """
+        scanned = cls.scan(targets, timeout=timeout)
+        pinned = [target for target, lines in scanned.items() if lines]
+        if pinned:
+            additions = [line for target in pinned for line in scanned[target]]
+            cls.apply(removals=pinned, additions=additions)
+            Log.v(f"호스트 키 고정: {[cls.host_token(*target) for target in pinned]}")
+        return pinned
+
+
+def _remove_tokens(line: str, tokens: set[str]) -> tuple[str | None, int]:
+    """한 줄에서 tokens에 해당하는 호스트를 제거. 남는 호스트가 없으면 (None, 제거 수) 반환"""
+    stripped = line.strip()
+    if not tokens or not stripped or stripped.startswith("#"):
+        return line, 0
+
+    fields = stripped.split()
+    marker_offset = 1 if fields[0].startswith("@") else 0
+    if len(fields) <= marker_offset:
+        return line, 0
+
+    hosts = fields[marker_offset].split(",")
+    kept_hosts = [host for host in hosts if not _host_matches(host, tokens)]
+    removed = len(hosts) - len(kept_hosts)
+    if removed == 0:
+        return line, 0
+    if not kept_hosts:
+        return None, removed
+
+    fields[marker_offset] = ",".join(kept_hosts)
+    return " ".join(fields), removed
+
+
+def _host_matches(host: str, tokens: set[str]) -> bool:
+    if not host.startswith("|1|"):
+        return host in tokens
+
+    # 해시된 항목: |1|base64(salt)|base64(HMAC-SHA1(salt, host))
+    try:
+        _, _, salt_b64, hash_b64 = host.split("|", 3)
+        salt = base64.b64decode(salt_b64)
+        expected = base64.b64decode(hash_b64)
+    except ValueError:
+        return False
+    return any(
+        hmac.compare_digest(hmac.new(salt, token.encode(), hashlib.sha1).digest(), expected)
+        for token in tokens
+    )
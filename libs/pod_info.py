@@ -16,13 +16,26 @@ class PodInfoBuilder:
             "runpod_api_key": runpod_api_key,
             "identity_file": identity_file_path,
         }
-    
+
+
+POD_INFO_DIR = "/root/DOLAB/pods"
+
+
 class PodInfoUploader:
     @staticmethod
-    def upload(info: dict, ssh_profile: SSHProfile, remote_path: str = "/root/DOLAB/pod_info.json") -> None:
+    def upload(info: dict, ssh_profile: SSHProfile, remote_path: str | None = None) -> None:
+        # pod마다 파일을 따로 두어 여러 pod가 같은 컨테이너로 동기화할 수 있도록 함 (websocket_client가 pods/*.json을 감시)
+        remote_path = remote_path or f"{POD_INFO_DIR}/{info['pod_id']}.json"
         executor = SSHExecutor(profile=ssh_profile)
+        executor.execute(f"mkdir -p {os.path.dirname(remote_path)}", log=False)
         with tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8") as f:
             json.dump(info, f, indent=2)
             tmp_path = f.name
         executor.upload_file(tmp_path, remote_path)
-        os.remove(tmp_path)
\ No newline at end of file
+        os.remove(tmp_path)
+
+    @staticmethod
+    def remove(name: str, ssh_profile: SSHProfile) -> bool:
+        """컨테이너의 pod 정보 파일(pods/<name>.json) 삭제. websocket_client가 해당 연결의 동기화를 멈춤"""
+        result = SSHExecutor(profile=ssh_profile).execute(f"rm -f {POD_INFO_DIR}/{name}.json", log=False)
+        return result["returncode"] == 0
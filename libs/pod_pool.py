@@ -0,0 +1,461 @@
+from .logger import Log
+from .job_spec import PodJobSpec
+from .runpod_manager import RunPodManager
+from .runpod_profile import RunPodProfile
+from .ssh_config_manager import SSHConfigManager
+from .ssh_executor import SSHExecutor
+from .known_hosts_manager import KnownHostsManager
+from typing import Any, Literal, Optional
+import threading
+import hashlib
+import shlex
+import uuid
+import time
+
+POOL_NAME_PREFIX = "dolab-pool"
+
+# 임대 표시 디렉터리. mkdir이 원자적이라 여러 프로세스가 같은 pod를 동시에 임대하지 못함
+LEASE_MARKER = "/root/.dolab_lease"
+
+# 임대 중에는 LEASE_MARKER/heartbeat를 주기적으로 갱신. 오래 갱신되지 않은 표시는 임대한 프로세스가 죽은 것으로 보고 회수
+LEASE_HEARTBEAT_INTERVAL = 60.0
+
+# 임대 중 실행한 명령의 프로세스 그룹 ID 목록 (PodLease.wrap_command가 기록, 반납 시 그룹 단위로 종료)
+LEASE_PGIDS = f"{LEASE_MARKER}/pgids"
+
+# 반납 시 임대 중 실행한 명령을 자식 프로세스(torchrun 워커 등)까지 종료. pod의 websocket_server 등 다른 프로세스는 그대로 둠
+KILL_LEASE_PROCESSES_COMMAND = (
+    f"if [ -f {LEASE_PGIDS} ]; then "
+    f"while read -r pgid; do kill -TERM -- \"-$pgid\" 2>/dev/null || true; done < {LEASE_PGIDS}; sleep 2; "
+    f"while read -r pgid; do kill -KILL -- \"-$pgid\" 2>/dev/null || true; done < {LEASE_PGIDS}; fi"
+)
+
+# 반납 시 다음 작업을 위해 실행하는 작업 공간 정리 명령
+RESET_WORKSPACE_COMMAND = "find /workspace -mindepth 1 -maxdepth 1 -exec rm -rf -- {} + 2>/dev/null || true"
+
+# 임대 표시 확인/생성. 오래된(stale_after초 동안 heartbeat 없음) 표시는 이전 임대의 프로세스와 작업 공간을 정리하고 회수
+# 여러 프로세스가 같은 표시를 동시에 회수하지 않도록 pod에서 flock으로 직렬화. 임대 중이면 종료 코드 3
+_MARKER_SCRIPT = """exec 9>{marker}.lock && flock -w 30 9 || exit 3
+if [ -d {marker} ]; then
+    last=$(stat -c %Y {marker}/heartbeat 2>/dev/null || cat {marker}/since 2>/dev/null || echo 0)
+    [ $(( $(date +%s) - last )) -gt {stale_after} ] || exit 3
+    {kill}; {reset}; rm -rf {marker}
+fi
+{acquire}
+"""
+
+
+class _PoolEntry:
+    __slots__ = ("pod", "key", "state", "last_used")
+
+    def __init__(self, pod: RunPodProfile, key: str, state: Literal["idle", "leased", "busy"]):
+        self.pod = pod
+        self.key = key
+        self.state = state
+        self.last_used = time.time()
+
+
+class PodLease:
+    """임대한 pod. with 블록을 벗어나면 작업 공간을 정리하고 풀에 반납"""
+
+    def __init__(self, pool: "PodPool", entry: _PoolEntry):
+        self.pool = pool
+        self.pod = entry.pod
+        self.leased_at = time.time()
+        # 임대마다 다른 동기화 디렉터리(<pod_id>-<id>)를 써서 다음 임대의 rsync --delete가 이전 결과를 지우지 않도록 함
+        self.id = uuid.uuid4().hex[:8]
+        self._entry = entry
+        self._released = False
+        self._stop = threading.Event()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name=f"pod-lease-{self.pod['id']}", daemon=True)
+        self._heartbeat.start()
+
+    def _heartbeat_loop(self) -> None:
+        """임대 중임을 pod의 임대 표시에 주기적으로 기록 (이 프로세스가 죽으면 갱신이 멈춰 다른 프로세스가 회수)"""
+        command = f"[ -d {LEASE_MARKER} ] && touch {LEASE_MARKER}/heartbeat"
+        while not self._stop.wait(LEASE_HEARTBEAT_INTERVAL):
+            if SSHExecutor(self.pod["ssh_profile"]).execute(command, log=False)["returncode"] != 0:
+                Log.w(f"[풀] 임대 heartbeat 갱신 실패: {self.pod['id']}")
+
+    @staticmethod
+    def wrap_command(command: str) -> str:
+        """
+        임대한 pod에서 실행할 명령을 새 세션(프로세스 그룹)으로 감쌈. 반납 시 이 그룹을 종료한다
+
+        setsid -w는 명령이 끝날 때까지 기다리고 종료 코드를 그대로 돌려준다.
+        """
+        script = f"echo $$ >> {LEASE_PGIDS}; exec bash -c {shlex.quote(command)}"
+        return f"setsid -w bash -c {shlex.quote(script)}"
+
+    def release(self, reset: bool = True) -> None:
+        if not self._released:
+            self._released = True
+            self._stop.set()
+            self.pool.release(self, reset=reset)
+
+    def __enter__(self) -> "PodLease":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.release()
+
+
+class PodPool:
+    """
+    이미지/GPU 사양별로 준비된 pod를 유지하고 작업에 빌려주는 풀
+
+    - warm(): 사양별로 대기 pod를 미리 만들어 둠 (백그라운드)
+    - lease(): 대기 pod가 있으면 바로 반환, 없으면 한도 안에서 새로 만들거나 반납을 기다림
+    - 반납 시 임대 중 실행한 명령의 프로세스 그룹을 종료하고 RESET_WORKSPACE_COMMAND로 작업 공간을 정리 (실패하면 pod를 종료)
+    - 다른 곳에서 임대 중인 pod는 busy로 두고 비용/개수에 포함. shrink()가 다시 확인해 반납되었거나
+      임대한 프로세스가 죽어 heartbeat가 lease_stale_after초 넘게 멈춘 pod를 회수
+    - idle_timeout 동안 임대가 없는 사양의 대기 pod와 비용 한도를 넘는 대기 pod는 종료
+    - pod 이름에 사양 해시를 넣어, 이전 실행에서 남겨 둔 풀 pod를 다시 가져다 씀 (adopt)
+    """
+
+    def __init__(
+        self,
+        runpod_manager: RunPodManager,
+        warm_per_spec: int = 1,
+        max_pods: int = 4,
+        idle_timeout: float = 900.0,
+        max_cost_per_hr: Optional[float] = None,
+        reset_command: str = RESET_WORKSPACE_COMMAND,
+        register_ssh: bool = False,
+        maintenance_interval: float = 60.0,
+        lease_stale_after: float = 600.0
+    ):
+        """
+        :param warm_per_spec: 사양별로 유지할 대기 pod 수 (최근 idle_timeout 안에 임대가 있었던 사양만)
+        :param max_pods: 풀 전체 pod 수 상한 (임대 중 + 대기 + 생성 중, 다른 곳에서 임대 중인 pod 포함)
+        :param max_cost_per_hr: 풀 전체 시간당 비용 상한($). 넘으면 새로 만들지 않고 대기 pod부터 종료
+        :param lease_stale_after: 임대 표시의 heartbeat가 이 시간(초) 넘게 멈추면 임대한 프로세스가 죽은 것으로 보고 회수
+        """
+        self.runpod_manager = runpod_manager
+        self.warm_per_spec = warm_per_spec
+        self.max_pods = max_pods
+        self.idle_timeout = idle_timeout
+        self.max_cost_per_hr = max_cost_per_hr
+        self.reset_command = reset_command
+        self.register_ssh = register_ssh
+        self.maintenance_interval = maintenance_interval
+        self.lease_stale_after = lease_stale_after
+
+        self._entries: list[_PoolEntry] = []
+        self._specs: dict[str, PodJobSpec] = {}
+        self._last_leased: dict[str, float] = {}
+        self._provisioning: dict[str, int] = {}
+        self._adopted = False
+        self._closed = threading.Event()
+        self._terminate_idle = True
+        self._maintenance: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def pool_key(spec: PodJobSpec) -> str:
+        """pod를 서로 바꿔 쓸 수 있는 사양의 해시 (이미지, GPU 후보, cloud, GPU 수, 디스크, 환경변수)"""
+        identity = "|".join([
+            spec["image"],
+            ",".join(spec["gpus"]),
+            spec.get("cloud_type", "ALL"),
+            str(spec.get("gpu_count", 1)),
+            str(spec.get("container_disk_in_gb") or ""),
+            ",".join(f"{k}={v}" for k, v in sorted((spec.get("env") or {}).items())),
+            str(bool(spec.get("jupyter", False))),
+        ])
+        return hashlib.sha256(identity.encode()).hexdigest()[:10]
+
+    # ---------------------------------------------------------------- 임대/반납
+
+    def lease(self, spec: PodJobSpec, timeout: Optional[float] = None) -> PodLease:
+        """
+        사양에 맞는 pod 임대
+
+        :param timeout: 한도가 차서 반납을 기다릴 최대 시간(초). None이면 무한 대기
+        :raises TimeoutError: 시간 안에 임대하지 못한 경우
+        """
+        key = self.pool_key(spec)
+        self._adopt_once()
+        deadline = time.time() + timeout if timeout is not None else None
+
+        while True:
+            entry: Optional[_PoolEntry] = None
+            provision = False
+            with self._cond:
+                self._specs.setdefault(key, spec)
+                self._last_leased[key] = time.time()
+                while True:
+                    entry = next((e for e in self._entries if e.key == key and e.state == "idle"), None)
+                    if entry:
+                        entry.state = "leased"
+                        break
+                    if self._can_provision():
+                        self._provisioning[key] = self._provisioning.get(key, 0) + 1
+                        provision = True
+                        break
+                    remaining = deadline - time.time() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"풀에서 pod를 임대하지 못했습니다. (spec={key})")
+                    self._cond.wait(remaining)
+
+            if provision:
+                entry = self._provision(key, spec, state="leased")
+                if entry is None:
+                    raise RuntimeError(f"풀 pod 생성 실패 (spec={key})")
+
+            assert entry
+            marker = self._check_marker(entry.pod)
+            if marker == "ok":
+                Log.i(f"[풀] pod 임대: {entry.pod['name']} ({entry.pod['id']})")
+                return PodLease(self, entry)
+
+            # 다른 프로세스가 임대 중인 pod는 busy로 남겨 비용/개수에 포함 (shrink가 반납/회수 여부를 다시 확인)
+            # 응답이 없거나 방금 만든 pod는 풀에서 빼고 종료
+            Log.w(f"[풀] 임대할 수 없는 pod ({marker}): {entry.pod['id']}")
+            with self._cond:
+                if marker == "busy" and not provision:
+                    entry.state = "busy"
+                    entry.last_used = time.time()
+                elif entry in self._entries:
+                    self._entries.remove(entry)
+                self._cond.notify_all()
+            if marker == "unreachable" or provision:
+                self._terminate(entry.pod)
+            if provision:
+                raise RuntimeError(f"새로 만든 풀 pod에 접속할 수 없습니다: {entry.pod['id']}")
+
+    def release(self, lease: PodLease, reset: bool = True) -> None:
+        entry = lease._entry
+        pod = entry.pod
+        ok = True
+        if reset:
+            command = f"{KILL_LEASE_PROCESSES_COMMAND}; {self.reset_command}; rm -rf {LEASE_MARKER}"
+        else:
+            command = f"{KILL_LEASE_PROCESSES_COMMAND}; rm -rf {LEASE_MARKER}"
+        result = SSHExecutor(pod["ssh_profile"]).execute(command, log=False)
+        if result["returncode"] != 0:
+            Log.w(f"[풀] 반납 정리 실패, pod 종료: {pod['id']} ({result['stderr']})")
+            ok = False
+
+        with self._cond:
+            if ok and not (self._closed.is_set() and self._terminate_idle):
+                entry.state = "idle"
+                entry.last_used = time.time()
+                Log.i(f"[풀] pod 반납: {pod['name']} ({pod['id']}), 사용 시간 {entry.last_used - lease.leased_at:.0f}s")
+            elif entry in self._entries:
+                self._entries.remove(entry)
+                ok = False
+            self._cond.notify_all()
+        if not ok:
+            self._terminate(pod)
+
+    # ---------------------------------------------------------------- 용량 관리
+
+    def warm(self, spec: PodJobSpec, count: Optional[int] = None) -> int:
+        """사양별 대기 pod를 count개(기본값: warm_per_spec)까지 백그라운드로 생성. 생성을 시작한 개수 반환"""
+        key = self.pool_key(spec)
+        count = self.warm_per_spec if count is None else count
+        self._adopt_once()
+
+        started = 0
+        with self._cond:
+            self._specs.setdefault(key, spec)
+            self._last_leased.setdefault(key, time.time())
+            idle = sum(1 for e in self._entries if e.key == key and e.state == "idle") + self._provisioning.get(key, 0)
+            while idle + started < count and self._can_provision():
+                self._provisioning[key] = self._provisioning.get(key, 0) + 1
+                started += 1
+
+        for _ in range(started):
+            threading.Thread(target=self._provision, args=(key, spec, "idle"), name=f"pod-pool-{key}", daemon=True).start()
+        if started:
+            Log.i(f"[풀] 대기 pod {started}개 생성 시작 (spec={key})")
+        return started
+
+    def shrink(self) -> list[str]:
+        """
+        오래 쓰이지 않은 사양의 대기 pod와 비용 한도를 넘는 대기 pod 종료. 종료한 pod ID 반환
+
+        다른 곳에서 임대 중(busy)이던 pod는 먼저 다시 확인해, 반납되었거나 오래된 임대 표시를 회수했으면 대기 pod로,
+        응답이 없으면 종료 대상으로 돌림
+        """
+        with self._cond:
+            busy = [entry for entry in self._entries if entry.state == "busy"]
+        unreachable: list[_PoolEntry] = []
+        for entry in busy:
+            marker = self._check_marker(entry.pod, acquire=False)
+            if marker == "busy":
+                continue
+            with self._cond:
+                if entry not in self._entries or entry.state != "busy":
+                    continue
+                if marker == "ok":
+                    Log.i(f"[풀] 임대가 끝난 pod 회수: {entry.pod['id']}")
+                    entry.state = "idle"
+                    entry.last_used = time.time()
+                else:
+                    self._entries.remove(entry)
+                    unreachable.append(entry)
+                self._cond.notify_all()
+
+        now = time.time()
+        victims: list[_PoolEntry] = []
+        with self._cond:
+            for entry in self._entries:
+                if entry.state == "idle" and now - self._last_leased.get(entry.key, 0.0) > self.idle_timeout \
+                        and now - entry.last_used > self.idle_timeout:
+                    victims.append(entry)
+
+            if self.max_cost_per_hr is not None:
+                cost = self._cost_per_hr() - sum(e.pod["cost_per_hr"] for e in victims)
+                idle = sorted((e for e in self._entries if e.state == "idle" and e not in victims), key=lambda e: e.last_used)
+                while cost > self.max_cost_per_hr and idle:
+                    entry = idle.pop(0)
+                    victims.append(entry)
+                    cost -= entry.pod["cost_per_hr"]
+
+            for entry in victims:
+                self._entries.remove(entry)
+            self._cond.notify_all()
+
+        for entry in unreachable:
+            Log.w(f"[풀] 응답 없는 pod 종료: {entry.pod['name']} ({entry.pod['id']})")
+            self._terminate(entry.pod)
+        for entry in victims:
+            Log.i(f"[풀] 대기 pod 정리: {entry.pod['name']} ({entry.pod['id']})")
+            self._terminate(entry.pod)
+        return [entry.pod["id"] for entry in unreachable + victims]
+
+    def start(self) -> None:
+        """주기적으로 shrink()와 최근 쓰인 사양의 warm()을 실행하는 관리 스레드 시작"""
+        if self._maintenance and self._maintenance.is_alive():
+            return
+
+        def loop() -> None:
+            while not self._closed.wait(self.maintenance_interval):
+                try:
+                    self.shrink()
+                    now = time.time()
+                    with self._cond:
+                        active = [self._specs[key] for key, ts in self._last_leased.items() if now - ts <= self.idle_timeout]
+                    for spec in active:
+                        self.warm(spec)
+                except Exception as e:
+                    Log.w(f"[풀] 관리 작업 실패: {e}")
+
+        self._maintenance = threading.Thread(target=loop, name="pod-pool-maintenance", daemon=True)
+        self._maintenance.start()
+
+    def close(self, terminate_idle: bool = True) -> None:
+        """관리 스레드 중지. terminate_idle이면 대기 pod 종료 (False면 다음 실행에서 다시 가져다 씀)"""
+        self._terminate_idle = terminate_idle
+        self._closed.set()
+        with self._cond:
+            idle = [e for e in self._entries if e.state == "idle"] if terminate_idle else []
+            for entry in idle:
+                self._entries.remove(entry)
+            self._cond.notify_all()
+        for entry in idle:
+            self._terminate(entry.pod)
+
+    def status(self) -> list[dict[str, Any]]:
+        now = time.time()
+        with self._cond:
+            return [{
+                "id": e.pod["id"], "name": e.pod["name"], "spec": e.key, "state": e.state,
+                "cost_per_hr": e.pod["cost_per_hr"], "idle_for": now - e.last_used if e.state == "idle" else 0.0,
+            } for e in self._entries]
+
+    # ---------------------------------------------------------------- 내부
+
+    def _can_provision(self) -> bool:
+        """_cond를 잡은 상태에서 호출"""
+        count = len(self._entries) + sum(self._provisioning.values())
+        if count >= self.max_pods:
+            return False
+        return self.max_cost_per_hr is None or self._cost_per_hr() < self.max_cost_per_hr
+
+    def _cost_per_hr(self) -> float:
+        return sum(entry.pod["cost_per_hr"] for entry in self._entries)
+
+    def _provision(self, key: str, spec: PodJobSpec, state: Literal["idle", "leased"]) -> Optional[_PoolEntry]:
+        entry: Optional[_PoolEntry] = None
+        try:
+            pod = self.runpod_manager.create_pod(
+                name=f"{POOL_NAME_PREFIX}-{key}-{uuid.uuid4().hex[:6]}",
+                image_name=spec["image"],
+                gpu_type_id=spec["gpus"],
+                cloud_type=spec.get("cloud_type", "ALL"),
+                gpu_count=spec.get("gpu_count", 1),
+                container_disk_in_gb=spec.get("container_disk_in_gb"),
+                env=spec.get("env"),
+                start_jupyter=spec.get("jupyter", False)
+            )
+            if self.register_ssh:
+                SSHConfigManager.add_profile(pod["ssh_profile"])
+            if not KnownHostsManager.pin([(pod["ssh_profile"]["hostname"], pod["ssh_profile"]["port"])]):
+                self._terminate(pod)
+                raise RuntimeError(f"pod 호스트 키 수집 실패: {pod['id']}")
+            entry = _PoolEntry(pod, key, state)
+        except Exception as e:
+            Log.e(f"[풀] pod 생성 실패 (spec={key}): {e}")
+
+        with self._cond:
+            self._provisioning[key] -= 1
+            if entry:
+                self._entries.append(entry)
+            self._cond.notify_all()
+        return entry
+
+    def _adopt_once(self) -> None:
+        """이전 실행에서 남겨 둔 풀 pod를 대기 pod로 등록"""
+        with self._cond:
+            if self._adopted:
+                return
+            self._adopted = True
+        try:
+            records = self.runpod_manager.list_pods(cached=False)
+        except Exception as e:
+            Log.w(f"[풀] 기존 pod 조회 실패: {e}")
+            return
+
+        adopted = 0
+        with self._cond:
+            known = {entry.pod["id"] for entry in self._entries}
+            for record in records:
+                parts = record["name"].split("-")
+                if not record["name"].startswith(f"{POOL_NAME_PREFIX}-") or len(parts) < 4:
+                    continue
+                if record["profile"] is None or record["desired_status"] != "RUNNING" or record["id"] in known:
+                    continue
+                self._entries.append(_PoolEntry(record["profile"], parts[-2], "idle"))
+                adopted += 1
+            self._cond.notify_all()
+        if adopted:
+            Log.i(f"[풀] 기존 풀 pod {adopted}개 재사용")
+
+    def _check_marker(self, pod: RunPodProfile, acquire: bool = True) -> Literal["ok", "busy", "unreachable"]:
+        """
+        pod의 임대 표시 확인 (응답 확인 겸용). 다른 곳에서 임대 중이면 busy
+
+        :param acquire: 참이면 임대 표시를 만듦. 거짓이면 오래된 표시만 회수하고 비어 있는지만 확인
+        """
+        script = _MARKER_SCRIPT.format(
+            marker=LEASE_MARKER,
+            stale_after=int(self.lease_stale_after),
+            kill=KILL_LEASE_PROCESSES_COMMAND,
+            reset=self.reset_command,
+            acquire=f"mkdir {LEASE_MARKER} && date +%s > {LEASE_MARKER}/since && touch {LEASE_MARKER}/heartbeat" if acquire else "true",
+        )
+        result = SSHExecutor(pod["ssh_profile"]).execute(f"bash -c {shlex.quote(script)}", log=False)
+        if result["returncode"] == 0:
+            return "ok"
+        return "unreachable" if result["returncode"] == 255 else "busy"
+
+    def _terminate(self, pod: RunPodProfile) -> None:
+        try:
+            self.runpod_manager.terminate_pod(pod=pod)
+            if self.register_ssh:
+                SSHConfigManager.remove_profile(profile=pod["ssh_profile"])
+        except Exception as e:
+            Log.w(f"[풀] pod 종료 실패: {pod['id']} ({e})")
@@ -0,0 +1,116 @@
+from .logger import Log
+from typing import Literal, Optional, TYPE_CHECKING
+import threading
+import time
+
+if TYPE_CHECKING:
+    from .host_machine import HostMachine
+
+PortKind = Literal["ssh", "jupyter", "websocket"]
+
+# 용도별 (컨테이너 포트, 호스트 포트 검색 범위)
+PORT_KINDS: dict[PortKind, tuple[int, range]] = {
+    "ssh": (22, range(2222, 3000)),
+    "jupyter": (8888, range(8888, 9000)),
+    "websocket": (8080, range(8080, 8200)),
+}
+
+
+
+def port_kind_for(container_port: int | str) -> Optional[PortKind]:
+    """컨테이너 포트에 해당하는 자동 할당 용도 (없으면 None)"""
+    return next((kind for kind, (port, _) in PORT_KINDS.items() if str(port) == str(container_port)), None)
+
+
+class PortAllocator:
+    """
+    호스트 포트 사용 현황 인덱스
+
+    - docker 포트 바인딩(정지된 컨테이너 포함)과 선택적으로 `ss -ltn` 결과를 한 번에 조회해 집합으로 보관
+    - 이후 사용 여부 확인/예약은 원격 호출 없이 O(1)
+    - 예약한 포트는 컨테이너 생성이 끝나 docker에 반영될 때까지 다른 요청에 할당하지 않음
+    """
+
+    def __init__(self, host_machine: "HostMachine", include_listening: bool = True, ttl: float = 60.0):
+        """
+        :param include_listening: docker 외 프로세스가 LISTEN 중인 포트도 사용 중으로 취급
+        :param ttl: 인덱스를 다시 조회하기까지의 시간(초)
+        """
+        self.host_machine = host_machine
+        self.include_listening = include_listening
+        self.ttl = ttl
+
+        self._used: set[int] = set()
+        self._reserved: set[int] = set()
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """원격 호스트의 사용 중 포트를 다시 조회 (SSH 왕복 1회)"""
+        used = self.host_machine.list_bound_ports(include_listening=self.include_listening)
+        with self._lock:
+            self._used = used
+            # docker에 반영된 예약은 더 이상 따로 보관할 필요 없음
+            self._reserved -= used
+            self._refreshed_at = time.time()
+        Log.d(f"포트 인덱스 갱신: 사용 중 {len(used)}개, 예약 {len(self._reserved)}개")
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._refreshed_at = None
+
+    def is_free(self, port: int | str) -> bool:
+        self._ensure_fresh()
+        port = int(port)
+        with self._lock:
+            return port not in self._used and port not in self._reserved
+
+    def reserve(self, port: int | str) -> int:
+        """지정한 포트 예약. 이미 사용/예약 중이면 RuntimeError"""
+        self._ensure_fresh()
+        port = int(port)
+        with self._lock:
+            if port in self._used or port in self._reserved:
+                Log.w(f"[{port}] 이미 사용 중인 포트입니다.")
+                raise RuntimeError(f"이미 사용 중인 포트: {port}")
+            self._reserved.add(port)
+        return port
+
+    def reserve_range(self, start: int, count: int) -> list[int]:
+        """start부터 연속된 count개 포트를 모두 예약 (하나라도 사용 중이면 아무것도 예약하지 않음)"""
+        self._ensure_fresh()
+        ports = list(range(start, start + count))
+        with self._lock:
+            taken = [port for port in ports if port in self._used or port in self._reserved]
+            if taken:
+                Log.w(f"포트 범위 {start}-{start + count - 1} 중 사용 중인 포트: {taken}")
+                raise RuntimeError(f"포트 범위에 사용 중인 포트가 있습니다: {taken}")
+            self._reserved.update(ports)
+        return ports
+
+    def next_free(self, kind: PortKind = "ssh", search: Optional[range] = None, reserve: bool = True) -> int:
+        """
+        kind 용도의 검색 범위(또는 search)에서 비어 있는 첫 포트 반환
+
+        :param reserve: False면 예약하지 않고 후보만 반환 (이후 create_container에서 예약)
+        """
+        self._ensure_fresh()
+        candidates = search or PORT_KINDS[kind][1]
+        with self._lock:
+            for port in candidates:
+                if port not in self._used and port not in self._reserved:
+                    if reserve:
+                        self._reserved.add(port)
+                    Log.d(f"[{kind}] 포트 자동 할당: {port}")
+                    return port
+        Log.e(f"[{kind}] 사용 가능한 포트 없음 ({candidates.start}-{candidates.stop - 1})")
+        raise RuntimeError(f"사용 가능한 {kind} 포트가 없습니다.")
+
+    def release(self, ports: list[int | str]) -> None:
+        """컨테이너 생성 실패 등으로 쓰지 않게 된 예약 해제"""
+        with self._lock:
+            self._reserved -= {int(port) for port in ports}
+
+    def _ensure_fresh(self) -> None:
+        if self._refreshed_at is None or time.time() - self._refreshed_at > self.ttl:
+            self.refresh()
@@ -0,0 +1,9 @@
+from typing import TypedDict
+
+class PushPlan(TypedDict):
+    image: str            # 푸시할 로컬 이미지
+    repository: str       # username/repository
+    tags: list[str]
+    layers: list[str]     # 로컬 이미지의 레이어 diff_id (아래 → 위)
+    existing: list[str]   # 레지스트리에 이미 있는 레이어 (업로드 생략)
+    missing: list[str]    # 업로드가 필요한 레이어
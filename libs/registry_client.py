@@ -0,0 +1,109 @@
+from .logger import Log
+from typing import Any, Optional
+import threading
+import requests
+
+MANIFEST_ACCEPT = ", ".join([
+    "application/vnd.docker.distribution.manifest.v2+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.oci.image.index.v1+json",
+])
+
+
+class RegistryClient:
+    """
+    Docker Registry HTTP API v2 조회 (DockerHub 기본)
+
+    푸시 전에 레지스트리에 이미 있는 레이어를 파악하기 위해 태그의 manifest → config 블롭을 읽어
+    rootfs.diff_ids(로컬 `docker image inspect`의 RootFS.Layers와 같은 값)를 반환한다.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        registry_base: str = "https://registry-1.docker.io",
+        auth_url: Optional[str] = "https://auth.docker.io/token",
+        service: str = "registry.docker.io",
+        platform: tuple[str, str] = ("linux", "amd64"),
+        timeout: float = 15.0
+    ):
+        """
+        :param auth_url: 토큰 발급 주소. None이면 인증 없이 요청 (로컬 레지스트리/테스트용)
+        """
+        self.session = session
+        self.registry_base = registry_base.rstrip("/")
+        self.auth_url = auth_url
+        self.service = service
+        self.platform = platform
+        self.timeout = timeout
+        self._tokens: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get_diff_ids(self, repository: str, tag: str) -> Optional[list[str]]:
+        """태그 이미지의 레이어 diff_id 목록. 태그가 없거나 조회할 수 없으면 None"""
+        manifest = self._get_json(repository, f"/manifests/{tag}", accept=MANIFEST_ACCEPT)
+        if manifest is None:
+            return None
+
+        # 멀티 플랫폼 이미지는 대상 플랫폼의 manifest로 한 번 더 조회
+        if "manifests" in manifest:
+            os_name, architecture = self.platform
+            digest = next((
+                entry["digest"] for entry in manifest["manifests"]
+                if entry.get("platform", {}).get("os") == os_name and entry.get("platform", {}).get("architecture") == architecture
+            ), None)
+            if digest is None:
+                return None
+            manifest = self._get_json(repository, f"/manifests/{digest}", accept=MANIFEST_ACCEPT)
+            if manifest is None:
+                return None
+
+        config_digest = manifest.get("config", {}).get("digest")
+        if not config_digest:
+            return None
+        config = self._get_json(repository, f"/blobs/{config_digest}")
+        if config is None:
+            return None
+        return list(config.get("rootfs", {}).get("diff_ids", []))
+
+    def _get_json(self, repository: str, path: str, accept: Optional[str] = None) -> Optional[dict[str, Any]]:
+        url = f"{self.registry_base}/v2/{repository}{path}"
+        headers = {"Accept": accept} if accept else {}
+        token = self._token(repository)
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            Log.w(f"레지스트리 조회 실패 ({url}): {e}")
+            return None
+
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            # 비공개 저장소 등 익명 토큰으로 조회할 수 없는 경우
+            Log.w(f"레지스트리 조회 실패 ({url}): {response.status_code}")
+            return None
+        return response.json()
+
+    def _token(self, repository: str) -> Optional[str]:
+        if not self.auth_url:
+            return None
+        with self._lock:
+            if repository in self._tokens:
+                return self._tokens[repository]
+
+        params = {"service": self.service, "scope": f"repository:{repository}:pull"}
+        try:
+            response = self.session.get(self.auth_url, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            token = response.json().get("token") or response.json().get("access_token")
+        except (requests.RequestException, ValueError) as e:
+            Log.w(f"레지스트리 토큰 발급 실패 ({repository}): {e}")
+            return None
+
+        with self._lock:
+            self._tokens[repository] = token
+        return token
@@ -1,18 +1,33 @@
 from .runpod_profile import RunPodPort, RunPodProfile, GpuType
 from .ssh_profile import SSHProfile
 from .logger import Log
-import runpod
-from runpod.api.graphql import run_graphql_query
-from runpod.error import QueryError
-from typing import Any
+from .state_store import StateStore
+from .state_record import PodRecord
+from typing import Any, TYPE_CHECKING
 from pathlib import Path
 import json
 import time
 import os
 
+if TYPE_CHECKING:
+    import types
+
+# 설정에서 읽은 API 키. runpod SDK를 처음 로드할 때 적용
+_api_key: str | None = None
+
+
+def _runpod_sdk() -> "types.ModuleType":
+    """runpod SDK는 import 시 serverless 모듈(aiohttp 등)까지 불러와 1초 넘게 걸리므로 실제 API 호출 시점에 로드"""
+    import runpod
+    if _api_key and runpod.api_key != _api_key:
+        runpod.api_key = _api_key
+    return runpod
+
+
 class RunPodManager:
-    def __init__(self, config_path: str = "./.config/.runpod_config.json"):
+    def __init__(self, config_path: str = "./.config/.runpod_config.json", state_store: StateStore | None = None):
         self.config_path = Path(os.path.expanduser(config_path))
+        self.state_store = state_store or StateStore.default()
         self._load_config()
 
     def _load_config(self):
@@ -31,7 +46,8 @@ class RunPodManager:
             Log.w(f"RunPod API 키가 등록되어 있지 않음. config_path: {self.config_path}")
             raise ValueError("RunPod API 키가 설정되어 있지 않습니다.")
 
-        runpod.api_key = self.api_key
+        global _api_key
+        _api_key = self.api_key
         Log.v("RunPodManager 설정 불러오기 완료")
 
     def _create_config(self):
@@ -60,12 +76,20 @@ class RunPodManager:
         container_disk_in_gb: int | None = None,
         ports: str = "22/tcp,8080/http",
         env: dict | None = None,
-        start_jupyter: bool = False
+        start_jupyter: bool = False,
+        public_keys: list[str] | None = None
     ) -> RunPodProfile: 
-        
+        """
+        :param public_keys: pod의 authorized_keys에 추가할 공개키 (예: 동기화 대상 컨테이너의 키).
+                            RunPod 이미지의 시작 스크립트가 PUBLIC_KEY 환경변수를 authorized_keys에 쓰므로
+                            부팅 후 SSH로 키를 올리는 과정 없이 바로 접속할 수 있다.
+        """
         Log.v(f"Pod 생성 요청: name={name}, image={image_name}, gpu_count={gpu_count}, disk={container_disk_in_gb}, ports={ports}")
         
         env_dict = dict(env) if env else {}
+        if public_keys:
+            env_dict["PUBLIC_KEY"] = self._public_key_env(public_keys)
+            Log.v(f"env에 PUBLIC_KEY 추가됨 (공개키 {env_dict['PUBLIC_KEY'].count(chr(10)) + 1}개)")
         if start_jupyter:
             env_dict["JUPYTER_PASSWORD"] = self.jupyter_password
             Log.v(f"env에 JUPYTER_PASSWORD 추가됨. env={env_dict}")
@@ -76,10 +100,11 @@ class RunPodManager:
         if not isinstance(gpu_type_id, list) and gpu_type_id is not None:
             gpu_type_id = [gpu_type_id]
 
+        from runpod.error import QueryError
         for idx, current_gpu_id in enumerate(gpu_type_id):
             try:
                 Log.i(f"[{idx+1}/{len(gpu_type_id)}] GPU ID {current_gpu_id}로 생성 시도 중...")
-                pod = runpod.create_pod(
+                pod = _runpod_sdk().create_pod(
                     name=name,
                     image_name=image_name,
                     gpu_type_id=current_gpu_id,
@@ -90,7 +115,9 @@ class RunPodManager:
                     env=env_dict
                 )
                 Log.i(f"Pod 생성 성공: pod_id={pod['id']}, gpu_id={current_gpu_id}")
-                return self._wait_until_ready(pod_id=pod["id"])
+                profile = self._wait_until_ready(pod_id=pod["id"])
+                self.state_store.record_pod(profile, action="create")
+                return profile
 
             except QueryError as e:
                 if "no longer any instances" in str(e):
@@ -101,12 +128,42 @@ class RunPodManager:
         Log.e("사용 가능한 GPU 인스턴스가 없어 Pod 생성 불가")
         raise RuntimeError("사용 가능한 GPU 인스턴스가 없어 Pod를 생성할 수 없습니다.")
 
+    def _public_key_env(self, public_keys: list[str]) -> str:
+        """
+        PUBLIC_KEY를 직접 지정하면 계정에 등록된 공개키 대신 쓰이므로 설정의 identity_file_path 공개키를 함께 넣음
+        """
+        keys: list[str] = []
+        user_public_key_path = Path(f"{self.identity_file_path}.pub")
+        if user_public_key_path.exists():
+            keys.append(user_public_key_path.read_text(encoding="utf-8").strip())
+        else:
+            Log.w(f"공개키 파일이 없어 PUBLIC_KEY에 포함하지 못함: {user_public_key_path} (계정에 등록된 키로는 접속할 수 없을 수 있음)")
+        for key in public_keys:
+            if key.strip() and key.strip() not in keys:
+                keys.append(key.strip())
+        return "\n".join(keys)
+
     def get_pod_info(self, pod_id: str, suppress_log: bool = False) -> RunPodProfile: 
-        runpod_profile = self.convert_to_runpod_profile(data=runpod.get_pod(pod_id=pod_id), suppress_log=suppress_log)
+        runpod_profile = self.convert_to_runpod_profile(data=_runpod_sdk().get_pod(pod_id=pod_id), suppress_log=suppress_log)
         return runpod_profile
 
     def get_pods(self) -> dict:
-        return runpod.get_pods()
+        pods = _runpod_sdk().get_pods()
+        self.state_store.sync_pods([self._pod_record(pod) for pod in pods])
+        return pods
+
+    def list_pods(self, cached: bool = True) -> list[PodRecord]:
+        """
+        pod 목록
+
+        :param cached: 참이면 상태 저장소의 목록을 바로 반환하고 RunPod 목록과는 백그라운드에서 맞춤
+                       (한 번도 동기화한 적이 없으면 RunPod 조회)
+        """
+        if cached and self.state_store.last_synced("pods"):
+            self.state_store.reconcile_in_background("pods", self.get_pods)
+        else:
+            self.get_pods()
+        return self.state_store.get_pods()
 
     def get_api_key(self) -> str:
         return self.api_key
@@ -114,7 +171,8 @@ class RunPodManager:
     def terminate_pod(self, pod: str | RunPodProfile) -> None: 
         pod_id = pod if isinstance(pod, str) else pod["id"]
         Log.v(f"terminating pod: pod_id={pod_id}")
-        runpod.terminate_pod(pod_id=pod_id)
+        _runpod_sdk().terminate_pod(pod_id=pod_id)
+        self.state_store.mark_pod_terminated(pod_id)
 
     def _wait_until_ready(self, pod_id: str, timeout: int = 180, interval: int = 10) -> RunPodProfile: 
         """
@@ -205,6 +263,26 @@ class RunPodManager:
             ssh_profile=ssh_profile
         )
 
+    def _pod_record(self, data: dict[str, Any]) -> PodRecord:
+        """runpod.get_pods() 항목 → PodRecord (SSH가 아직 열리지 않은 pod는 profile=None)"""
+        try:
+            profile = self.convert_to_runpod_profile(data=data, suppress_log=True)
+        except (ValueError, KeyError):
+            profile = None
+        return {
+            "id": data["id"],
+            "name": data.get("name", ""),
+            "image_name": data.get("imageName", ""),
+            "gpu_display_name": (data.get("machine") or {}).get("gpuDisplayName", ""),
+            "gpu_count": data.get("gpuCount", 0),
+            "cost_per_hr": data.get("costPerHr", 0.0),
+            "desired_status": data.get("desiredStatus", ""),
+            "profile": profile,
+            "created_at": 0.0,
+            "updated_at": 0.0,
+            "terminated_at": None,
+        }
+
     @staticmethod
     def get_gpus_detailed() -> list[GpuType]:
         QUERY_GPU_TYPES_DETAILED = """
@@ -221,6 +299,8 @@ query GpuTypes {
   }
 }
 """
+        _runpod_sdk()
+        from runpod.api.graphql import run_graphql_query
         raw_response = run_graphql_query(QUERY_GPU_TYPES_DETAILED)
         cleaned_response = raw_response["data"]["gpuTypes"]
         gpu_types: list[GpuType] = []
@@ -0,0 +1,557 @@
+from .logger import Log
+from .job_spec import ExperimentJobSpec, PodJobSpec
+from .experiment_record import ExperimentRecord, ExperimentState, Placement
+from .experiment_queue import ExperimentQueue, HEARTBEAT_TIMEOUT
+from .host_machine import HostMachine
+from .runpod_manager import RunPodManager, RunPodProfile
+from .runpod_profile import GpuType
+from .known_hosts_manager import KnownHostsManager
+from .pod_pool import PodLease, PodPool
+from .ssh_executor import SSHExecutor
+from .jobs import resolve_gpus
+from typing import Callable, Optional
+from pathlib import Path
+import subprocess
+import threading
+import shlex
+import time
+
+DEFAULT_OUTPUTS = "/workspace/logs"
+SYNC_ROOT = "/workspace/dolab"   # 결과를 받을 컨테이너 안의 경로 (<SYNC_ROOT>/<작업 이름>/)
+
+LineCallback = Callable[[str, str], None]
+
+
+class CapacityError(RuntimeError):
+    """GPU/pod를 확보하지 못함 (잠시 후 다시 배치하면 성공할 수 있음)"""
+
+
+def _pipe(source: list[str], destination: list[str], timeout: Optional[float] = None) -> None:
+    """source 명령의 stdout을 destination 명령의 stdin으로 연결 (tar 스트림 전달용)"""
+    producer = subprocess.Popen(source, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    consumer = subprocess.Popen(destination, stdin=producer.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert producer.stdout
+    producer.stdout.close()
+    _, consumer_err = consumer.communicate(timeout=timeout)
+    _, producer_err = producer.communicate(timeout=timeout)
+    if producer.returncode != 0 or consumer.returncode != 0:
+        detail = (producer_err or consumer_err).decode(errors="replace").strip()
+        raise RuntimeError(f"결과 전송 실패 (rc={producer.returncode}/{consumer.returncode}): {detail[-500:]}")
+
+
+class ExecutionBackend:
+    """
+    스케줄러가 작업을 실행하는 대상
+
+    reserve()는 자원이 바로 있을 때만 Placement를 반환하고(없으면 None),
+    나머지 단계는 작업 스레드에서 provision → run → sync → teardown 순서로 호출된다.
+    """
+    name: str = ""
+    kind: str = ""   # local | runpod
+
+    def reserve(self, record: ExperimentRecord) -> Optional[Placement]:
+        raise NotImplementedError
+
+    def release(self, placement: Placement) -> None:
+        """reserve()로 잡은 자원 반환 (teardown 뒤 또는 배치 실패 시)"""
+        raise NotImplementedError
+
+    def provision(self, record: ExperimentRecord, placement: Placement) -> Placement:
+        """:raises CapacityError: 자원이 부족해 지금은 준비할 수 없는 경우"""
+        raise NotImplementedError
+
+    def run(self, record: ExperimentRecord, placement: Placement, on_line: Optional[LineCallback] = None) -> int:
+        raise NotImplementedError
+
+    def export_command(self, record: ExperimentRecord, placement: Placement) -> list[str]:
+        """결과 디렉터리(outputs)를 tar 스트림으로 stdout에 쓰는 로컬 명령"""
+        raise NotImplementedError
+
+    def teardown(self, record: ExperimentRecord, placement: Placement) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def _placement(record: ExperimentRecord, backend: str) -> Placement:
+        return {"job_id": record["id"], "backend": backend, "host": "", "gpus": [], "container": "", "pod_id": "", "cost_per_hr": 0.0}
+
+
+class LocalGPUBackend(ExecutionBackend):
+    """
+    로컬 호스트의 빈 GPU에 docker 컨테이너로 작업 실행
+
+    nvidia-smi로 사용 중인 메모리/사용률이 기준 이하인 GPU를 빈 GPU로 보고,
+    이 스케줄러가 이미 배정한 GPU는 제외한다.
+    """
+    kind = "local"
+
+    def __init__(
+        self,
+        host_machine: HostMachine,
+        max_used_memory_mb: int = 1024,
+        max_utilization: int = 10,
+        probe_ttl: float = 15.0
+    ):
+        """
+        :param max_used_memory_mb: 이 값 이하로 메모리를 쓰는 GPU만 빈 GPU로 취급
+        :param probe_ttl: nvidia-smi 결과를 재사용할 시간(초)
+        """
+        self.host_machine = host_machine
+        self.host = host_machine.host_key
+        self.name = f"local:{self.host}"
+        self.max_used_memory_mb = max_used_memory_mb
+        self.max_utilization = max_utilization
+        self.probe_ttl = probe_ttl
+        self._reserved: dict[int, str] = {}
+        self._probed_at = 0.0
+        self._free: list[int] = []
+        self._lock = threading.Lock()
+
+    def free_gpus(self, refresh: bool = False) -> list[int]:
+        with self._lock:
+            if refresh or time.time() - self._probed_at > self.probe_ttl:
+                self._free = self._probe()
+                self._probed_at = time.time()
+            return [gpu for gpu in self._free if gpu not in self._reserved]
+
+    def reserve(self, record: ExperimentRecord) -> Optional[Placement]:
+        spec = record["spec"]
+        if spec.get("hosts") and self.host not in spec["hosts"]:
+            return None
+        gpu_count = spec.get("gpu_count", 1)
+        free = self.free_gpus()
+        with self._lock:
+            free = [gpu for gpu in free if gpu not in self._reserved]
+            if len(free) < gpu_count:
+                return None
+            gpus = free[:gpu_count]
+            for gpu in gpus:
+                self._reserved[gpu] = record["id"]
+        placement = self._placement(record, self.name)
+        placement.update(host=self.host, gpus=gpus, container=f"dolab-exp-{record['id']}")
+        return placement
+
+    def release(self, placement: Placement) -> None:
+        with self._lock:
+            for gpu in placement["gpus"]:
+                if self._reserved.get(gpu) == placement["job_id"]:
+                    del self._reserved[gpu]
+            # 방금 끝난 작업의 메모리가 아직 반환되지 않았을 수 있으므로 다음 배치 때 다시 조회
+            self._probed_at = 0.0
+
+    def provision(self, record: ExperimentRecord, placement: Placement) -> Placement:
+        spec = record["spec"]
+        devices = ",".join(str(gpu) for gpu in placement["gpus"])
+        env = " ".join(f"-e {shlex.quote(f'{key}={value}')}" for key, value in (spec.get("env") or {}).items())
+        command = (
+            f"docker rm -f {placement['container']} >/dev/null 2>&1; "
+            f"docker create --name {placement['container']} --label dolab.experiment={record['id']} "
+            f"--gpus '\"device={devices}\"' {env} {shlex.quote(spec['image'])} "
+            f"bash -lc {shlex.quote(f'mkdir -p {spec.get('outputs', DEFAULT_OUTPUTS)} && {spec['command']}')}"
+        )
+        result = self.host_machine.executor.execute(command, log=False)
+        if result["returncode"] != 0:
+            Log.e(f"[{spec['name']}] 실험 컨테이너 생성 실패: {result['stderr']}")
+            raise RuntimeError(f"실험 컨테이너 생성 실패: {result['stderr'][-500:]}")
+        Log.i(f"[{spec['name']}] {self.host} GPU {devices}에 배치: {placement['container']}")
+        return placement
+
+    def run(self, record: ExperimentRecord, placement: Placement, on_line: Optional[LineCallback] = None) -> int:
+        job = self.host_machine.executor.stream(f"docker start -a {placement['container']}", timeout=record["spec"].get("timeout"), log=False)
+        for stream_name, line in job:
+            if on_line:
+                on_line(stream_name, line)
+        return job.wait()["returncode"]
+
+    def export_command(self, record: ExperimentRecord, placement: Placement) -> list[str]:
+        outputs = record["spec"].get("outputs", DEFAULT_OUTPUTS).rstrip("/")
+        # docker cp는 마지막 경로 이름을 최상위 디렉터리로 둔 tar를 만들므로 받는 쪽에서 한 단계 벗겨냄
+        return self.host_machine.executor.build_ssh_command() + [f"docker cp {placement['container']}:{outputs} -"]
+
+    def teardown(self, record: ExperimentRecord, placement: Placement) -> None:
+        self.host_machine.executor.execute(f"docker rm -f {placement['container']}", log=False)
+
+    def _probe(self) -> list[int]:
+        result = self.host_machine.executor.execute(
+            "nvidia-smi --query-gpu=index,memory.used,utilization.gpu --format=csv,noheader,nounits", log=False)
+        if result["returncode"] != 0:
+            Log.w(f"[{self.host}] GPU 조회 실패: {result['stderr'].strip()}")
+            return []
+        free = []
+        for line in result["stdout"].splitlines():
+            try:
+                index, used, utilization = (int(value.strip()) for value in line.split(","))
+            except ValueError:
+                continue
+            if used <= self.max_used_memory_mb and utilization <= self.max_utilization:
+                free.append(index)
+        return free
+
+
+class RunPodBackend(ExecutionBackend):
+    """
+    RunPod pod에서 작업 실행 (로컬 GPU가 부족할 때 넘기는 곳)
+
+    동시에 띄울 pod 수와 시간당 총비용을 제한하며, 비용은 예약 시 후보 GPU 중 가장 비싼 요금으로 추정하고
+    pod가 만들어지면 실제 요금으로 바꾼다. pool을 켠 작업은 PodPool에서 pod를 임대한다.
+    """
+    kind = "runpod"
+    name = "runpod"
+
+    def __init__(
+        self,
+        runpod_manager: RunPodManager,
+        pod_pool: Optional[PodPool] = None,
+        max_pods: int = 2,
+        max_cost_per_hr: Optional[float] = None,
+        default_gpus: Optional[list[str]] = None,
+        lease_timeout: float = 60.0
+    ):
+        """
+        :param max_cost_per_hr: 이 스케줄러가 띄운 pod 전체의 시간당 비용 상한($)
+        :param default_gpus: 작업에 runpod_gpus가 없을 때 쓸 GPU 후보
+        :param lease_timeout: 풀에서 pod를 기다릴 최대 시간(초). 넘으면 용량 부족으로 보고 다시 대기열로
+        """
+        self.runpod_manager = runpod_manager
+        self.pod_pool = pod_pool
+        self.max_pods = max_pods
+        self.max_cost_per_hr = max_cost_per_hr
+        self.default_gpus = default_gpus or []
+        self.lease_timeout = lease_timeout
+        self._gpu_types: Optional[list[GpuType]] = None
+        self._gpu_ids: dict[str, list[str]] = {}
+        self._pods: dict[str, RunPodProfile] = {}
+        self._leases: dict[str, PodLease] = {}
+        self._committed: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, record: ExperimentRecord) -> Optional[Placement]:
+        spec = record["spec"]
+        preferences = spec.get("runpod_gpus") or self.default_gpus
+        if not preferences:
+            raise ValueError("RunPod GPU 후보가 없습니다. (runpod_gpus 또는 --runpod-gpus)")
+        candidates = resolve_gpus(self._load_gpu_types(), preferences, spec.get("cloud_type", "ALL"), spec.get("max_price_per_hr"))
+        prices = [price for _, price in candidates if price is not None]
+        estimate = max(prices, default=0.0) * spec.get("gpu_count", 1)
+
+        with self._lock:
+            if len(self._committed) >= self.max_pods:
+                return None
+            if self.max_cost_per_hr is not None and sum(self._committed.values()) + estimate > self.max_cost_per_hr:
+                return None
+            self._committed[record["id"]] = estimate
+            self._gpu_ids[record["id"]] = [gpu_id for gpu_id, _ in candidates]
+        placement = self._placement(record, self.name)
+        placement["cost_per_hr"] = estimate
+        return placement
+
+    def release(self, placement: Placement) -> None:
+        with self._lock:
+            self._committed.pop(placement["job_id"], None)
+            self._gpu_ids.pop(placement["job_id"], None)
+
+    def provision(self, record: ExperimentRecord, placement: Placement) -> Placement:
+        spec = record["spec"]
+        pod_spec: PodJobSpec = {
+            "kind": "pod",
+            "name": f"dolab-exp-{spec['name']}",
+            "image": spec["image"],
+            "gpus": self._gpu_ids[record["id"]],
+            "cloud_type": spec.get("cloud_type", "ALL"),
+            "gpu_count": spec.get("gpu_count", 1),
+            "env": spec.get("env") or {},
+            "command": spec["command"],
+        }
+
+        if spec.get("pool") and self.pod_pool is not None:
+            try:
+                lease = self.pod_pool.lease(pod_spec, timeout=self.lease_timeout)
+            except TimeoutError as e:
+                raise CapacityError(str(e)) from e
+            pod = lease.pod
+            with self._lock:
+                self._leases[record["id"]] = lease
+        else:
+            try:
+                pod = self.runpod_manager.create_pod(
+                    name=pod_spec["name"],
+                    image_name=pod_spec["image"],
+                    gpu_type_id=pod_spec["gpus"],
+                    cloud_type=pod_spec["cloud_type"],  # type: ignore
+                    gpu_count=pod_spec["gpu_count"],  # type: ignore
+                    env=pod_spec["env"]  # type: ignore
+                )
+            except RuntimeError as e:
+                if "사용 가능한 GPU" in str(e):
+                    raise CapacityError(str(e)) from e
+                raise
+            with self._lock:
+                self._pods[record["id"]] = pod
+            if not KnownHostsManager.pin([(pod["ssh_profile"]["hostname"], pod["ssh_profile"]["port"])]):
+                raise RuntimeError(f"pod 호스트 키를 가져오지 못했습니다: {pod['id']}")
+
+        with self._lock:
+            self._committed[record["id"]] = pod["cost_per_hr"]
+        placement.update(pod_id=pod["id"], cost_per_hr=pod["cost_per_hr"])
+        Log.i(f"[{spec['name']}] RunPod에 배치: {pod['name']} ({pod['id']}, {pod['gpu_display_name']}, ${pod['cost_per_hr']:.2f}/hr)")
+        return placement
+
+    def run(self, record: ExperimentRecord, placement: Placement, on_line: Optional[LineCallback] = None) -> int:
+        spec = record["spec"]
+        command = f"mkdir -p {spec.get('outputs', DEFAULT_OUTPUTS)} && {spec['command']}"
+        with self._lock:
+            lease = self._leases.get(record["id"])
+        if lease is not None:
+            command = lease.wrap_command(command)
+        job = SSHExecutor(self._pod(record)["ssh_profile"]).stream(command, timeout=spec.get("timeout"), log=False)
+        for stream_name, line in job:
+            if on_line:
+                on_line(stream_name, line)
+        return job.wait()["returncode"]
+
+    def export_command(self, record: ExperimentRecord, placement: Placement) -> list[str]:
+        outputs = Path(record["spec"].get("outputs", DEFAULT_OUTPUTS).rstrip("/"))
+        return SSHExecutor(self._pod(record)["ssh_profile"]).build_ssh_command() + [f"tar -C {outputs.parent} -cf - {outputs.name}"]
+
+    def teardown(self, record: ExperimentRecord, placement: Placement) -> None:
+        with self._lock:
+            lease = self._leases.pop(record["id"], None)
+            pod = self._pods.pop(record["id"], None)
+        if lease is not None:
+            lease.release()
+        elif pod is not None or placement["pod_id"]:
+            # 이전 실행에서 남은 pod는 placement의 pod_id로 종료
+            self.runpod_manager.terminate_pod(pod or placement["pod_id"])
+
+    def _pod(self, record: ExperimentRecord) -> RunPodProfile:
+        with self._lock:
+            lease = self._leases.get(record["id"])
+            return lease.pod if lease else self._pods[record["id"]]
+
+    def _load_gpu_types(self) -> list[GpuType]:
+        with self._lock:
+            if self._gpu_types is None:
+                self._gpu_types = RunPodManager.get_gpus_detailed()
+            return self._gpu_types
+
+
+class Scheduler:
+    """
+    실험 큐의 작업을 로컬 GPU와 RunPod에 나눠 실행
+
+    - 배치 순서: 작업의 placement가 auto면 로컬 백엔드(등록 순서)를 먼저, 빈 GPU가 없으면 RunPod
+    - 작업마다 스레드 하나가 provisioning → running → syncing → teardown을 진행하고 상태를 큐에 기록
+    - CapacityError(GPU/pod 부족)는 retry_backoff × 시도 횟수만큼 기다렸다가 다시 배치 (max_retries까지)
+    - 예약 중 일시적 오류가 난 백엔드는 retry_backoff 동안 건너뛰고, 사양 오류(ValueError)는 모든 후보에서 났을 때만 실패 처리
+    - 같은 큐를 여러 스케줄러가 써도 작업은 claim한 스케줄러 하나만 실행하고, heartbeat가 끊긴 스케줄러의 작업만 넘겨받음
+    - 결과(outputs)는 sync_target 컨테이너의 SYNC_ROOT/<이름>/ 또는 results_dir/<이름>-<ID>/로 받음
+    """
+
+    def __init__(
+        self,
+        queue: ExperimentQueue,
+        backends: list[ExecutionBackend],
+        host_machine: Optional[Callable[[str], HostMachine]] = None,
+        max_concurrent: int = 4,
+        poll_interval: float = 5.0,
+        retry_backoff: float = 60.0,
+        default_max_retries: int = 3,
+        results_dir: str | Path = "./experiments",
+        on_finish: Optional[Callable[[ExperimentRecord], None]] = None
+    ):
+        """
+        :param host_machine: 호스트 별칭으로 HostMachine을 얻는 함수 (sync_target 결과 전송용)
+        :param on_finish: 작업이 끝나거나(succeeded/failed) 다시 대기열로 갈 때 호출
+        """
+        self.queue = queue
+        self.backends = backends
+        self.host_machine = host_machine
+        self.max_concurrent = max(1, max_concurrent)
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.default_max_retries = default_max_retries
+        self.results_dir = Path(results_dir)
+        self.on_finish = on_finish
+        self._workers: dict[str, threading.Thread] = {}
+        self._backend_retry_at: dict[str, float] = {}   # 일시적 오류로 배치를 쉬는 백엔드 → 다시 시도할 시각
+        self._wake = threading.Event()
+
+    def run(self, until_empty: bool = True, stop: Optional[threading.Event] = None) -> None:
+        """
+        큐 처리 루프
+
+        :param until_empty: 참이면 끝나지 않은 작업이 없을 때 반환
+        :param stop: 설정되면 새 배치를 멈추고 실행 중인 작업이 끝나기를 기다린 뒤 반환
+        """
+        stop = stop or threading.Event()
+        step_id = Log.start(f"실험 스케줄러 시작 (백엔드: {[backend.name for backend in self.backends]}, 동시 {self.max_concurrent}개)")
+        try:
+            while not stop.is_set():
+                # 종료된 다른 스케줄러의 작업은 실행 중에도 넘겨받음
+                self.queue.heartbeat()
+                self._recover()
+                self._reap()
+                self._dispatch()
+                if until_empty and not self._workers and not self.queue.has_unfinished():
+                    break
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+        finally:
+            # 기다리는 동안에도 heartbeat를 갱신해 다른 스케줄러가 작업을 가져가지 않도록 함
+            for thread in list(self._workers.values()):
+                while thread.is_alive():
+                    self.queue.heartbeat()
+                    thread.join(self.poll_interval)
+            self._reap()
+            Log.end(step_id=step_id)
+
+    # ---------------------------------------------------------------- 배치
+
+    def _candidates(self, spec: ExperimentJobSpec) -> list[ExecutionBackend]:
+        policy = spec.get("placement", "auto")
+        local = [backend for backend in self.backends if backend.kind == "local"]
+        remote = [backend for backend in self.backends if backend.kind == "runpod"]
+        if policy == "local":
+            return local
+        if policy == "runpod":
+            return remote
+        return local + remote
+
+    def _dispatch(self) -> None:
+        for record in self.queue.pending():
+            if len(self._workers) >= self.max_concurrent:
+                return
+            if record["id"] in self._workers:
+                continue
+            candidates = self._candidates(record["spec"])
+            if not candidates:
+                if self.queue.claim(record["id"]):
+                    self._finish(record, "failed", error=f"실행할 수 있는 백엔드가 없습니다. (placement={record['spec'].get('placement', 'auto')})")
+                continue
+
+            unplaceable: list[str] = []
+            for backend in candidates:
+                if self._backend_retry_at.get(backend.name, 0.0) > time.time():
+                    continue
+                try:
+                    placement = backend.reserve(record)
+                except ValueError as e:
+                    # 작업 사양으로는 이 백엔드에 배치할 수 없음 (GPU 후보 없음 등) → 다음 후보
+                    unplaceable.append(f"{backend.name}: {e}")
+                    continue
+                except Exception as e:
+                    # API 조회 실패 등 일시적 오류 → 이 백엔드는 retry_backoff 동안 쉬고 다음 후보
+                    Log.w(f"[{record['name']}] 배치 보류 ({backend.name}, {self.retry_backoff:.0f}초 뒤 재시도): {e}")
+                    self._backend_retry_at[backend.name] = time.time() + self.retry_backoff
+                    continue
+                if placement is None:
+                    continue
+                # 같은 큐를 쓰는 다른 스케줄러가 먼저 가져갔으면 예약한 자원을 돌려놓고 넘어감
+                if not self.queue.claim(record["id"]):
+                    backend.release(placement)
+                    break
+                thread = threading.Thread(target=self._execute, args=(record, backend, placement), name=f"experiment-{record['id']}", daemon=True)
+                self._workers[record["id"]] = thread
+                thread.start()
+                break
+            else:
+                # 어느 후보에도 배치할 수 없는 사양이면 실패 (일부만 불가능하면 다른 백엔드의 자원을 기다림)
+                if len(unplaceable) == len(candidates) and self.queue.claim(record["id"]):
+                    Log.e(f"[{record['name']}] 배치 실패: {'; '.join(unplaceable)}")
+                    self._finish(record, "failed", error="; ".join(unplaceable))
+
+    def _reap(self) -> None:
+        for job_id, thread in list(self._workers.items()):
+            if not thread.is_alive():
+                del self._workers[job_id]
+
+    def _recover(self) -> None:
+        """종료된 스케줄러가 남긴 컨테이너/pod를 정리한 뒤 작업을 다시 대기열로 (정리 전에 다른 스케줄러가 배치하지 않도록)"""
+        for record in self.queue.recover(stale_after=max(HEARTBEAT_TIMEOUT, self.poll_interval * 3)):
+            placement = record["placement"]
+            backend = next((b for b in self.backends if placement and b.name == placement["backend"]), None)
+            if placement is not None and backend is not None:
+                try:
+                    backend.teardown(record, placement)
+                except Exception as e:
+                    Log.w(f"[{record['name']}] 이전 실행 정리 실패 ({backend.name}): {e}")
+            self._finish(record, "queued", placement=None)
+
+    # ---------------------------------------------------------------- 실행
+
+    def _execute(self, record: ExperimentRecord, backend: ExecutionBackend, placement: Placement) -> None:
+        spec = record["spec"]
+        attempts = record["attempts"] + 1
+        started_at = time.time()
+        state: ExperimentState = "failed"
+        error = ""
+        returncode: Optional[int] = None
+        retry = False
+        self.queue.transition(record["id"], "provisioning", attempts=attempts, placement=placement, started_at=started_at, error="")
+
+        try:
+            placement = backend.provision(record, placement)
+            self.queue.transition(record["id"], "running", placement=placement)
+            returncode = backend.run(record, placement, on_line=lambda _, line: Log.v(f"[{spec['name']}] {line}"))
+            self.queue.transition(record["id"], "syncing", returncode=returncode)
+            # 실패한 작업도 로그를 확인할 수 있도록 결과는 항상 받음
+            sync_error = ""
+            try:
+                self._sync(record, backend, placement)
+            except Exception as e:
+                Log.w(f"[{spec['name']}] 결과 동기화 실패: {e}")
+                sync_error = f"결과 동기화 실패: {e}"
+            if returncode != 0:
+                error = f"명령 실패 (rc={returncode})"
+            elif sync_error:
+                error = sync_error
+            else:
+                state = "succeeded"
+        except CapacityError as e:
+            retry = attempts <= spec.get("max_retries", self.default_max_retries)
+            error = str(e)
+            Log.w(f"[{spec['name']}] 용량 부족 ({backend.name}, {attempts}회째): {e}")
+        except Exception as e:
+            error = str(e)
+            Log.e(f"[{spec['name']}] 작업 실패 ({backend.name}): {e}")
+
+        self.queue.transition(record["id"], "teardown")
+        try:
+            backend.teardown(record, placement)
+        except Exception as e:
+            Log.w(f"[{spec['name']}] 정리 실패 ({backend.name}): {e}")
+        finally:
+            backend.release(placement)
+
+        cost = placement["cost_per_hr"] * (time.time() - started_at) / 3600 if placement["pod_id"] else 0.0
+        cost += record["cost"]  # 재시도 전 시도에서 쓴 비용 누적
+        if retry:
+            self._finish(record, "queued", error=error, cost=cost, placement=None, not_before=time.time() + self.retry_backoff * attempts)
+        else:
+            self._finish(record, state, error=error, cost=cost, returncode=returncode, finished_at=time.time())
+        self._wake.set()
+
+    def _sync(self, record: ExperimentRecord, backend: ExecutionBackend, placement: Placement) -> None:
+        spec = record["spec"]
+        source = backend.export_command(record, placement)
+        if spec.get("sync_target"):
+            if self.host_machine is None:
+                raise RuntimeError("sync_target으로 결과를 보내려면 host_machine이 필요합니다.")
+            destination_dir = f"{SYNC_ROOT}/{spec['name']}"
+            extract = f"mkdir -p {destination_dir} && tar -xf - -C {destination_dir} --strip-components=1"
+            destination = self.host_machine(spec["sync_host"]).executor.build_ssh_command() + [
+                f"docker exec -i {spec['sync_target']} bash -c {shlex.quote(extract)}"]
+            target = f"{spec['sync_host']}:{spec['sync_target']}:{destination_dir}"
+        else:
+            local_dir = self.results_dir / f"{spec['name']}-{record['id']}"
+            local_dir.mkdir(parents=True, exist_ok=True)
+            destination = ["tar", "-xf", "-", "-C", str(local_dir), "--strip-components=1"]
+            target = str(local_dir)
+        _pipe(source, destination)
+        Log.i(f"[{spec['name']}] 결과 동기화 완료: {target}")
+
+    def _finish(self, record: ExperimentRecord, state: ExperimentState, **fields) -> None:
+        self.queue.transition(record["id"], state, **fields)
+        if self.on_finish:
+            updated = self.queue.get(record["id"])
+            if updated:
+                self.on_finish(updated)
@@ -0,0 +1,66 @@
+import shlex
+
+# 원격 호스트에서 실행되는 squash 커밋 스크립트 (인자: 컨테이너, 대상 이미지)
+#
+# docker commit은 컨테이너의 쓰기 레이어를 통째로 기존 레이어 위에 쌓기 때문에
+# 커밋 → 실행 → 커밋을 반복하면 레이어가 계속 늘어나고 푸시할 양도 커진다.
+# 이 스크립트는 최초 베이스 이미지(라벨 dolab.base_image)를 기준으로 누적 변경 목록(/.dolab_changes)을 유지하고
+#   FROM <베이스> + ADD <변경 파일 tar> (+ 삭제가 있으면 RUN rm)
+# 형태로 다시 빌드해, 베이스 레이어(레지스트리에 이미 있음) 위에 변경분 레이어만 남긴다.
+SQUASH_COMMIT_SCRIPT = r"""
+set -euo pipefail
+container=$1
+target=$2
+
+image=$(docker inspect --format '{{.Config.Image}}' "$container")
+base=$(docker image inspect --format '{{with .Config.Labels}}{{index . "dolab.base_image"}}{{end}}' "$image" 2>/dev/null || true)
+[ -n "$base" ] || base=$image
+echo "베이스 이미지: $base"
+
+work=$(mktemp -d)
+trap 'rm -rf "$work"' EXIT
+
+# 이전 squash 커밋까지의 누적 변경 + 이번 컨테이너 변경 병합 (같은 경로는 마지막 상태 우선, C는 A로 취급)
+docker exec "$container" cat /.dolab_changes > "$work/previous" 2>/dev/null || : > "$work/previous"
+docker diff "$container" > "$work/diff"
+cat "$work/previous" "$work/diff" | awk '
+    length($0) > 2 {
+        state = substr($0, 1, 1); path = substr($0, 3)
+        if (path == "/.dolab_changes") next
+        if (state == "C") state = "A"
+        if (!(path in states)) order[++count] = path
+        states[path] = state
+    }
+    END { for (i = 1; i <= count; i++) print states[order[i]] " " order[i] }
+' > "$work/dolab_changes"
+
+sed -n 's|^A /||p' "$work/dolab_changes" > "$work/add_list"
+deleted=$(grep -c '^D ' "$work/dolab_changes" || true)
+echo "변경 경로 $(wc -l < "$work/add_list")개, 삭제 경로 ${deleted}개"
+
+# 변경 경로만 tar로 추출 (디렉터리는 하위 항목이 목록에 따로 있으므로 --no-recursion)
+set +e
+docker exec -i "$container" tar -cf - --no-recursion -C / -T - < "$work/add_list" > "$work/changes.tar"
+tar_rc=$?
+set -e
+# 1: 추출 중 파일 변경, 2: 일부 경로 없음 (실행 중 삭제된 임시 파일 등) → 경고만
+if [ "$tar_rc" -gt 2 ]; then echo "변경 파일 추출 실패 (tar rc=$tar_rc)" >&2; exit "$tar_rc"; fi
+
+{
+    echo "FROM $base"
+    echo "ADD changes.tar /"
+    echo "COPY dolab_changes /.dolab_changes"
+    if [ "$deleted" -gt 0 ]; then
+        echo "RUN sed -n 's/^D //p' /.dolab_changes | while IFS= read -r p; do rm -rf -- \"\$p\"; done"
+    fi
+    echo "LABEL dolab.base_image=\"$base\""
+} > "$work/Dockerfile"
+
+docker build -q -t "$target" "$work"
+docker image inspect --format '{{.Id}}' "$target"
+"""
+
+
+def build_squash_commit_command(container_name: str, target_image: str) -> str:
+    """컨테이너를 target_image로 squash 커밋하는 원격 명령. 마지막 출력 줄은 이미지 ID"""
+    return f"bash -c {shlex.quote(SQUASH_COMMIT_SCRIPT)} dolab-squash {shlex.quote(container_name)} {shlex.quote(target_image)}"
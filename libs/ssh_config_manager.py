@@ -1,16 +1,46 @@
 from .logger import Log
 from .ssh_profile import SSHProfile
-from typing import List
+from .file_utils import file_lock, atomic_write_text
+from .known_hosts_manager import KnownHostsManager
+from typing import List, NamedTuple, Optional
 from pathlib import Path
-import subprocess
+import threading
+import glob
+import os
+import re
+
+
+class SSHConfigBlock(NamedTuple):
+    patterns: list[str]         # Host 줄의 패턴 목록 (Match 블록은 빈 목록)
+    options: dict[str, str]     # 소문자 키워드 → 값 (먼저 나온 값 우선)
+    source: Path                # 블록이 정의된 파일
+    start: int                  # Host/Match 줄의 인덱스
+    end: int                    # 블록 끝 (다음 블록 시작 줄, exclusive)
+
+
+class _ParsedConfig(NamedTuple):
+    blocks: list[SSHConfigBlock]
+    index: dict[str, SSHConfigBlock]                # 구체적인 host 이름 → 첫 번째 블록
+    file_stats: dict[Path, Optional[tuple[int, int]]]  # 파싱에 사용된 파일 → (mtime_ns, size)
+    include_globs: dict[str, list[str]]             # Include 패턴 → 당시 매칭된 파일 목록
+
+
+_KEYWORD_PATTERN = re.compile(r"^(\S+?)(?:\s*=\s*|\s+)(.*)$")
+_HOST_LINE_PREFIX = re.compile(r"^(\s*host(?:\s*=\s*|\s+)).*$", re.IGNORECASE)
+_WILDCARD_CHARS = set("*?!")
+_MAX_INCLUDE_DEPTH = 16
 
 
 class SSHConfigManager:
     _config_file_path = Path("~/.ssh/config").expanduser()
+    _cache: Optional[_ParsedConfig] = None
+    _cache_lock = threading.RLock()
 
     @classmethod
     def set_config_file_path(cls, path: str) -> None:
-        cls._config_file_path = Path(path).expanduser()
+        with cls._cache_lock:
+            cls._config_file_path = Path(path).expanduser()
+            cls._cache = None
 
     @classmethod
     def get_config_file_path(cls) -> Path:
@@ -21,37 +51,38 @@ class SSHConfigManager:
         host = profile['host']
         config_path = SSHConfigManager.get_config_file_path()
 
-        # config 파일이 존재하지 않으면 생성
-        if not config_path.exists():
-            config_path.parent.mkdir(parents=True, exist_ok=True)
-            config_path.touch()
-            Log.i(f"SSH config 파일 생성됨: {config_path}")
-
-        # 기존에 동일 Host가 있는지 확인
-        with config_path.open("r", encoding="utf-8") as f:
-            config_content = f.read()
-            if f"Host {host}" in config_content:
+        with file_lock(config_path):
+            # config 파일이 존재하지 않으면 생성
+            if not config_path.exists():
+                config_path.parent.mkdir(parents=True, exist_ok=True)
+                config_path.touch()
+                Log.i(f"SSH config 파일 생성됨: {config_path}")
+
+            # 기존에 동일 Host가 있는지 확인 (잠금 안에서는 항상 최신 내용으로 재파싱)
+            parsed = SSHConfigManager._load(force=True)
+            if host in parsed.index:
                 Log.w(f"이미 존재하는 SSH Host: {host}")
                 raise ValueError(f"[error] 이미 존재하는 SSH Host: {host}")
-            
-        # 기존 fingerprint를 known_hosts에서 제거
-        SSHConfigManager.remove_known_host(profile["hostname"], profile["port"])
 
-        # SSH 프로필 포맷 구성
-        lines = [
-            f"Host {host}",
-            f"    HostName {profile['hostname']}",
-            f"    Port {profile['port']}",
-            f"    User {profile['user']}",
-        ]
-        if profile.get("identity_file"):
-            lines.append(f"    IdentityFile {profile['identity_file']}")
+            # 기존 fingerprint를 known_hosts에서 제거
+            SSHConfigManager.remove_known_host(profile["hostname"], profile["port"])
 
-        entry_block = "\n".join(lines) + "\n"
+            # SSH 프로필 포맷 구성
+            lines = [
+                f"Host {host}",
+                f"    HostName {profile['hostname']}",
+                f"    Port {profile['port']}",
+                f"    User {profile['user']}",
+            ]
+            if profile.get("identity_file"):
+                lines.append(f"    IdentityFile {profile['identity_file']}")
 
-        # config 파일에 append
-        with config_path.open("a", encoding="utf-8") as f:
-            f.write("\n" + entry_block)
+            entry_block = "\n".join(lines) + "\n"
+
+            # 임시 파일 + 원자적 rename으로 append
+            content = config_path.read_text(encoding="utf-8")
+            atomic_write_text(config_path, content + "\n" + entry_block)
+            SSHConfigManager._invalidate()
 
         Log.i(f"SSH 프로필 추가됨: {host}")
         return True
@@ -65,47 +96,39 @@ class SSHConfigManager:
             Log.e(f"SSH config 파일이 존재하지 않음: {config_path}")
             raise FileNotFoundError(f"SSH config 파일이 존재하지 않습니다: {config_path}")
 
-        # 기존 내용 읽기
-        with config_path.open("r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        # 해당 host 블록 추출
-        new_lines: List[str] = []
-        in_target_block = False
-        removed = False
-
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith("Host "):
-                if in_target_block:
-                    in_target_block = False # 블록 종료
-                    continue
-                in_target_block = stripped == f"Host {host}"
-                if in_target_block:
-                    removed = True
-                    continue  # "Host" 줄도 버림
-            if not in_target_block:
-                new_lines.append(line)
-
-        if not removed:
-            Log.w(f"SSH config에 host '{host}' 항목이 없음")
-            raise ValueError(f"SSH config에 해당 host '{host}'를 찾을 수 없습니다.")
-        
-        # 불필요한 연속 빈 줄 제거
-        cleaned_lines: List[str] = []
-        prev_blank = False
-        for line in new_lines:
-            if line.strip() == "":
-                if not prev_blank:
-                    cleaned_lines.append(line)
-                prev_blank = True
+        with file_lock(config_path):
+            parsed = SSHConfigManager._load(force=True)
+            block = parsed.index.get(host)
+            if block is None:
+                Log.w(f"SSH config에 host '{host}' 항목이 없음")
+                raise ValueError(f"SSH config에 해당 host '{host}'를 찾을 수 없습니다.")
+
+            with block.source.open("r", encoding="utf-8") as f:
+                lines = f.readlines()
+
+            if len(block.patterns) > 1:
+                # 여러 패턴을 가진 Host 줄은 해당 패턴만 제거하고 블록은 유지
+                remaining = [pattern for pattern in block.patterns if pattern != host]
+                lines[block.start] = _HOST_LINE_PREFIX.sub(lambda m: m.group(1) + " ".join(remaining), lines[block.start].rstrip("\n")) + "\n"
+                new_lines = lines
             else:
-                cleaned_lines.append(line)
-                prev_blank = False
+                new_lines = lines[:block.start] + lines[block.end:]
+
+            # 불필요한 연속 빈 줄 제거
+            cleaned_lines: List[str] = []
+            prev_blank = False
+            for line in new_lines:
+                if line.strip() == "":
+                    if not prev_blank:
+                        cleaned_lines.append(line)
+                    prev_blank = True
+                else:
+                    cleaned_lines.append(line)
+                    prev_blank = False
 
-        # 새 내용 덮어쓰기
-        with config_path.open("w", encoding="utf-8") as f:
-            f.writelines(cleaned_lines)
+            # 새 내용으로 원자적 교체
+            atomic_write_text(block.source, "".join(cleaned_lines))
+            SSHConfigManager._invalidate()
 
         # 기존 fingerprint를 known_hosts에서 제거
         SSHConfigManager.remove_known_host(profile["hostname"], profile["port"])
@@ -121,25 +144,8 @@ class SSHConfigManager:
             Log.e(f"SSH config 파일이 존재하지 않음: {config_path}")
             raise FileNotFoundError(f"SSH config 파일이 존재하지 않습니다: {config_path}")
 
-        with config_path.open("r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        in_target_block = False
-        data: dict[str, str] = {}
-
-        for line in lines:
-            stripped = line.strip()
-            if stripped.startswith("Host "):
-                in_target_block = (stripped == f"Host {host}")
-                continue
-
-            if in_target_block:
-                if stripped == "":
-                    break  # 블록 종료
-                key_value = stripped.split(None, 1)
-                if len(key_value) == 2:
-                    key, value = key_value
-                    data[key.lower()] = value
+        block = SSHConfigManager._load().index.get(host)
+        data = block.options if block else {}
 
         if not data:
             Log.w(f"SSH config에 host '{host}' 항목이 존재하지 않음")
@@ -170,23 +176,124 @@ class SSHConfigManager:
             Log.e(f"SSH config 파일이 존재하지 않음: {config_path}")
             raise FileNotFoundError(f"SSH config 파일이 존재하지 않습니다: {config_path}")
 
-        hosts: List[str] = []
-        with config_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                stripped = line.strip()
-                if stripped.startswith("Host "):
-                    parts = stripped.split()
-                    if len(parts) == 2:
-                        hosts.append(parts[1])  # Host 이름만 추출
+        # 와일드카드/부정 패턴을 제외한 구체적인 host 이름만 (정의 순서 유지)
+        hosts: List[str] = list(SSHConfigManager._load().index)
 
         Log.i(f"발견된 SSH host 목록: {hosts}")
         return hosts
 
+    @staticmethod
+    def host_exists(host: str) -> bool:
+        config_path = SSHConfigManager.get_config_file_path()
+        if not config_path.exists():
+            return False
+        return host in SSHConfigManager._load().index
+
+    @classmethod
+    def _invalidate(cls) -> None:
+        with cls._cache_lock:
+            cls._cache = None
+
+    @classmethod
+    def _load(cls, force: bool = False) -> _ParsedConfig:
+        """파싱된 config 반환. 관련 파일의 mtime/크기가 바뀌지 않았으면 캐시 재사용"""
+        with cls._cache_lock:
+            if not force and cls._cache is not None and cls._is_cache_valid(cls._cache):
+                return cls._cache
+
+            parsed = _ParsedConfig(blocks=[], index={}, file_stats={}, include_globs={})
+            cls._parse_file(cls._config_file_path, parsed, depth=0)
+            for block in parsed.blocks:
+                for pattern in block.patterns:
+                    if not (_WILDCARD_CHARS & set(pattern)):
+                        parsed.index.setdefault(pattern, block)
+
+            cls._cache = parsed
+            Log.v(f"SSH config 파싱: 블록 {len(parsed.blocks)}개, host {len(parsed.index)}개")
+            return parsed
+
+    @classmethod
+    def _is_cache_valid(cls, parsed: _ParsedConfig) -> bool:
+        for path, stat in parsed.file_stats.items():
+            if _file_stat(path) != stat:
+                return False
+        for pattern, matched in parsed.include_globs.items():
+            if sorted(glob.glob(pattern)) != matched:
+                return False
+        return True
+
+    @classmethod
+    def _parse_file(cls, path: Path, parsed: _ParsedConfig, depth: int) -> None:
+        if depth > _MAX_INCLUDE_DEPTH:
+            Log.w(f"SSH config Include 깊이 초과: {path}")
+            return
+
+        parsed.file_stats[path] = _file_stat(path)
+        if parsed.file_stats[path] is None:
+            return
+
+        with path.open("r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        current: Optional[SSHConfigBlock] = None
+        for line_no, line in enumerate(lines):
+            stripped = line.strip()
+            if not stripped or stripped.startswith("#"):
+                continue
+            match = _KEYWORD_PATTERN.match(stripped)
+            if not match:
+                continue
+            keyword, value = match.group(1).lower(), match.group(2).strip()
+
+            if keyword in ("host", "match"):
+                if current is not None:
+                    parsed.blocks.append(current._replace(end=line_no))
+                patterns = _split_patterns(value) if keyword == "host" else []
+                current = SSHConfigBlock(patterns=patterns, options={}, source=path, start=line_no, end=len(lines))
+            elif keyword == "include":
+                for include_pattern in _split_patterns(value):
+                    expanded = _expand_include(include_pattern, cls._config_file_path.parent)
+                    matched = sorted(glob.glob(expanded))
+                    parsed.include_globs[expanded] = matched
+                    for include_path in matched:
+                        cls._parse_file(Path(include_path), parsed, depth + 1)
+            elif current is not None:
+                current.options.setdefault(keyword, _unquote(value))
+
+        if current is not None:
+            parsed.blocks.append(current._replace(end=len(lines)))
+
     @staticmethod
     def remove_known_host(ip: str, port: str) -> None:
-        target = f"[{ip}]:{port}"
+        target = KnownHostsManager.host_token(ip, port)
         try:
-            subprocess.run(["ssh-keygen", "-R", target], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            KnownHostsManager.remove(ip, port)
             Log.i(f"known_hosts에서 {target} 항목 제거 완료")
         except Exception as e:
-            Log.w(f"known_hosts에서 {target} 항목 제거 실패: {e}")
\ No newline at end of file
+            Log.w(f"known_hosts에서 {target} 항목 제거 실패: {e}")
+
+
+def _file_stat(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _split_patterns(value: str) -> list[str]:
+    return [_unquote(token) for token in re.findall(r'"[^"]*"|\S+', value)]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1]
+    return value
+
+
+def _expand_include(pattern: str, base_dir: Path) -> str:
+    # 상대 경로 Include는 사용자 config 기준 ~/.ssh 디렉터리를 기준으로 해석
+    expanded = os.path.expanduser(pattern)
+    if not os.path.isabs(expanded):
+        expanded = str(base_dir / expanded)
+    return expanded
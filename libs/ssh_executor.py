@@ -1,16 +1,40 @@
 from .logger import Log
 from .ssh_profile import SSHProfile
 from .ssh_result import SSHResult
+from .ssh_transfer import SSHTransfer
+from .ssh_job import SSHJob, LineCallback
+from typing import Optional
 import subprocess
+import base64
+import shlex
+import uuid
 import os
 
+# execute_batch 원격 스크립트: 각 명령을 독립 셸에서 실행하고 결과를 한 줄씩 출력
+# 형식: <marker>|<index>|<returncode>|<duration_ns>|<stdout base64>|<stderr base64>
+_BATCH_PRELUDE = r"""
+__dolab_tmp=$(mktemp -d) || exit 255
+trap 'rm -rf "$__dolab_tmp"' EXIT
+__dolab_run() {
+    __start=$(date +%s%N)
+    printf '%s' "$3" | base64 -d > "$__dolab_tmp/cmd"
+    bash "$__dolab_tmp/cmd" > "$__dolab_tmp/out" 2> "$__dolab_tmp/err" < /dev/null
+    __rc=$?
+    __end=$(date +%s%N)
+    printf '%s|%s|%s|%s|%s|%s\n' "$1" "$2" "$__rc" "$((__end - __start))" \
+        "$(base64 -w0 < "$__dolab_tmp/out")" "$(base64 -w0 < "$__dolab_tmp/err")"
+    return $__rc
+}
+"""
+
 
 class SSHExecutor:
     def __init__(self, profile: SSHProfile):
         self.profile = profile
 
 
-    def execute(self, command: str | list[str], log: bool = True, StrictHostKeyChecking: bool = True) -> SSHResult:
+    def build_ssh_command(self, StrictHostKeyChecking: bool = True, compress: bool = False) -> list[str]:
+        """원격 명령을 제외한 ssh 명령 구성"""
         user = self.profile["user"]
         hostname = self.profile["hostname"]
         port = self.profile["port"]
@@ -21,12 +45,14 @@ class SSHExecutor:
             ssh_command += ["-i", identity]
         if not StrictHostKeyChecking:
             ssh_command += ["-o", "StrictHostKeyChecking=no"]
+        if compress:
+            ssh_command += ["-C"]
+        return ssh_command
 
-        # list[str]이면 ' && '로 연결하여 하나의 문자열 명령어로 변환
-        if isinstance(command, list):
-            joined_command = " && ".join(command)
-        else:
-            joined_command = command
+    def execute(self, command: str | list[str], log: bool = True, StrictHostKeyChecking: bool = True) -> SSHResult:
+        ssh_command = self.build_ssh_command(StrictHostKeyChecking=StrictHostKeyChecking)
+
+        joined_command = self._join_command(command)
 
         # 복잡한 명령어 실행 시 bash -c 사용 고려
         ssh_command += [joined_command]
@@ -48,42 +74,127 @@ class SSHExecutor:
 
         return ssh_result
     
-    def upload_file(self, local_path: str, remote_path: str) -> bool:
-        user = self.profile["user"]
-        hostname = self.profile["hostname"]
-        port = self.profile["port"]
-        identity = self.profile.get("identity_file")
+    def execute_batch(
+        self,
+        commands: list[str],
+        stop_on_error: bool = False,
+        log: bool = True,
+        StrictHostKeyChecking: bool = True
+    ) -> list[SSHResult]:
+        """
+        여러 명령을 하나의 SSH 세션에서 실행하고 명령별 결과를 반환
+
+        execute(list)와 달리 각 명령은 독립적으로 실행되며(이전 명령의 cd/변수는 유지되지 않음)
+        명령마다 returncode, stdout, stderr, duration을 따로 돌려준다.
+
+        :param stop_on_error: True면 실패한 명령 이후의 명령은 실행하지 않음 (결과 목록에서도 제외)
+        :return: 실행된 명령 순서대로의 SSHResult 목록
+        """
+        if not commands:
+            return []
+
+        marker = f"__DOLAB_BATCH_{uuid.uuid4().hex}__"
+        lines = [_BATCH_PRELUDE]
+        for index, command in enumerate(commands):
+            encoded = base64.b64encode(command.encode("utf-8")).decode("ascii")
+            line = f"__dolab_run {marker} {index} {shlex.quote(encoded)}"
+            lines.append(f"{line} || exit 0" if stop_on_error else line)
+        script = "\n".join(lines) + "\n"
+
+        ssh_command = self.build_ssh_command(StrictHostKeyChecking=StrictHostKeyChecking) + ["bash -s"]
+        if log: Log.v(f"SSH 일괄 실행 ({len(commands)}개): {commands}")
 
+        try:
+            result = subprocess.run(ssh_command, input=script, capture_output=True, text=True)
+        except Exception as e:
+            if log: Log.e(f"SSH 일괄 실행 실패 ({' '.join(ssh_command)}): {e}")
+            raise RuntimeError(f"SSH 일괄 실행 실패: {e}")
+
+        results: list[SSHResult] = []
+        for line in result.stdout.splitlines():
+            if not line.startswith(marker + "|"):
+                continue
+            _, _, returncode, duration_ns, stdout_b64, stderr_b64 = line.split("|", 5)
+            results.append({
+                "returncode": int(returncode),
+                "stdout": base64.b64decode(stdout_b64).decode("utf-8", errors="replace").strip(),
+                "stderr": base64.b64decode(stderr_b64).decode("utf-8", errors="replace").strip(),
+                "duration": int(duration_ns) / 1e9 if duration_ns.isdigit() else 0.0,
+            })
+
+        # 세션 자체가 실패한 경우(접속 실패 등) 결과가 하나도 없음
+        if not results and result.returncode != 0:
+            if log: Log.e(f"[SSH 일괄 실행 오류] {result.stderr.strip()}")
+            raise RuntimeError(f"SSH 일괄 실행 실패: {result.stderr.strip()}")
+
+        if log:
+            for command, command_result in zip(commands, results):
+                if command_result["returncode"] != 0:
+                    Log.w(f"[SSH 오류] {command} → {command_result}")
+                else:
+                    Log.i(f"[SSH 성공] {command} ({command_result['duration']:.2f}s)")
+            if len(results) < len(commands):
+                Log.w(f"이전 명령 실패로 {len(commands) - len(results)}개 명령을 실행하지 않음")
+
+        return results
+
+    def start(
+        self,
+        command: str | list[str],
+        on_line: Optional[LineCallback] = None,
+        timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        tail_lines: int = 200,
+        log: bool = True
+    ) -> SSHJob:
+        """
+        명령을 백그라운드로 실행하고 작업 핸들 반환
+
+        :param on_line: (stdout|stderr, 줄) 콜백. 출력이 도착하는 즉시 호출됨
+        :param timeout: 전체 실행 시간 제한(초)
+        :param idle_timeout: 출력이 없는 상태로 허용할 시간(초). 초과 시 멈춘 명령으로 보고 취소
+        :param tail_lines: 결과에 보관할 마지막 출력 줄 수
+        """
+        ssh_command = self.build_ssh_command() + [self._join_command(command)]
+        return SSHJob(ssh_command, on_line=on_line, timeout=timeout, idle_timeout=idle_timeout,
+                      tail_lines=tail_lines, log=log)
+
+    def stream(
+        self,
+        command: str | list[str],
+        timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        tail_lines: int = 200,
+        log: bool = True
+    ) -> SSHJob:
+        """
+        출력 줄을 순회할 수 있는 작업 시작
+
+        사용 예:
+            job = executor.stream("docker push ...")
+            for stream_name, line in job: ...       # 또는 async for
+            result = job.wait()
+        """
+        ssh_command = self.build_ssh_command() + [self._join_command(command)]
+        return SSHJob(ssh_command, timeout=timeout, idle_timeout=idle_timeout,
+                      tail_lines=tail_lines, iterable=True, log=log)
+
+    def upload_file(self, local_path: str, remote_path: str, compress: bool = False) -> bool:
+        """
+        로컬 파일/디렉터리를 원격으로 업로드 (scp -r과 같은 경로 규칙)
+
+        작은 파일은 하나의 tar 스트림으로, 큰 파일은 병렬 청크 스트림으로 전송하고
+        원격에서 sha256 검증까지 마친 경우에만 True를 반환한다.
+        """
         if not os.path.exists(local_path):
             Log.e(f"로컬 파일이 존재하지 않음: {local_path}")
             raise FileNotFoundError(f"로컬 파일이 존재하지 않습니다: {local_path}")
 
-        scp_command = ["scp", "-r", "-P", port]
-        if identity:
-            scp_command += ["-i", identity]
+        return SSHTransfer(executor=self, compress=compress).upload(local_path=local_path, remote_path=remote_path)
 
-        scp_command += [local_path, f"{user}@{hostname}:{remote_path}"]
-
-        Log.d(f"SCP 파일 전송: {' '.join(scp_command)}")
-
-        try:
-            result = subprocess.run(scp_command, capture_output=True, text=True)
-        except Exception as e:
-            Log.e(f"SCP 중 예외 발생: {e}")
-            raise RuntimeError(f"SCP 실패: {e}")
-
-        if result.returncode != 0:
-            Log.w(f"[SCP 오류] {result.stderr.strip()}")
-            return False
-
-        Log.i(f"[SCP 성공] {local_path} → {remote_path}")
-
-        # 업로드 후 원격 존재 확인
-        if not self.exists(remote_path):
-            Log.w(f"[SCP 후 확인 실패] 원격 파일 존재하지 않음: {remote_path}")
-            return False
-        
-        return True
+    def download_file(self, remote_path: str, local_path: str, compress: bool = False) -> bool:
+        """원격 파일/디렉터리를 로컬로 다운로드 (upload_file의 역방향, sha256 검증 포함)"""
+        return SSHTransfer(executor=self, compress=compress).download(remote_path=remote_path, local_path=local_path)
 
     def exists(self, remote_path: str) -> bool:
         test_command = f"test -e {remote_path}"
@@ -101,6 +212,13 @@ class SSHExecutor:
             Log.d(f"[존재 확인] 원격 경로 없음: {remote_path}")
             return False
 
+    @staticmethod
+    def _join_command(command: str | list[str]) -> str:
+        # list[str]이면 ' && '로 연결하여 하나의 문자열 명령어로 변환
+        if isinstance(command, list):
+            return " && ".join(command)
+        return command
+
     def _build_result(self, result: subprocess.CompletedProcess) -> SSHResult:
         return {
             "returncode": result.returncode,
@@ -0,0 +1,170 @@
+from .logger import Log
+from .ssh_result import SSHResult
+from collections import deque
+from typing import AsyncIterator, Callable, Iterator, Literal, Optional
+import subprocess
+import threading
+import queue
+import time
+
+StreamName = Literal["stdout", "stderr"]
+LineCallback = Callable[[StreamName, str], None]
+
+_END = object()
+
+
+class SSHJob:
+    """
+    백그라운드로 실행 중인 SSH 명령 핸들
+
+    - 출력은 도착하는 대로 줄 단위로 콜백/이터레이터에 전달
+    - 결과에는 마지막 tail_lines줄만 보관해 출력이 커도 메모리 사용량이 일정
+    - timeout(전체 실행 시간), idle_timeout(출력 없는 시간) 초과 시 자동 취소
+    """
+
+    def __init__(
+        self,
+        ssh_command: list[str],
+        on_line: Optional[LineCallback] = None,
+        timeout: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        tail_lines: int = 200,
+        iterable: bool = False,
+        log: bool = True
+    ):
+        self.ssh_command = ssh_command
+        self.on_line = on_line
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.cancel_reason: Optional[str] = None
+        self.started_at = time.time()
+        self.last_output_at = self.started_at
+        self._log = log
+
+        self._tails: dict[StreamName, deque[str]] = {"stdout": deque(maxlen=tail_lines), "stderr": deque(maxlen=tail_lines)}
+        # 이터레이터로 소비하는 경우에만 큐 사용 (소비가 늦으면 원격 출력이 backpressure로 대기)
+        self._queue: Optional["queue.Queue[tuple[StreamName, str] | object]"] = queue.Queue(maxsize=1000) if iterable else None
+        self._done = threading.Event()
+        self._exhausted = False
+
+        if log: Log.v(f"SSH 작업 시작: {' '.join(ssh_command)}")
+        try:
+            self._proc = subprocess.Popen(
+                ssh_command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, encoding="utf-8", errors="replace", bufsize=1
+            )
+        except Exception as e:
+            if log: Log.e(f"SSH 작업 실행 실패 ({' '.join(ssh_command)}): {e}")
+            raise RuntimeError(f"SSH 작업 실행 실패: {e}")
+
+        self._readers = [
+            threading.Thread(target=self._read, args=("stdout", self._proc.stdout), daemon=True),
+            threading.Thread(target=self._read, args=("stderr", self._proc.stderr), daemon=True),
+        ]
+        for reader in self._readers:
+            reader.start()
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def poll(self) -> Optional[int]:
+        """실행 중이면 None, 종료되었으면 returncode"""
+        if not self._done.is_set():
+            return None
+        return self._proc.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> SSHResult:
+        """종료까지 대기 후 결과 반환 (이터레이터 모드에서는 남은 출력을 소비)"""
+        if self._queue is not None and not self._exhausted:
+            for _ in self:
+                pass
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"SSH 작업이 {timeout}초 안에 끝나지 않았습니다.")
+        return self.result()
+
+    async def wait_async(self) -> SSHResult:
+        import asyncio  # 비동기 호출자는 이미 asyncio를 로드한 상태이므로 여기서만 import (시작 시간 단축)
+        return await asyncio.to_thread(self.wait)
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """원격 명령 취소 (ssh 프로세스 종료 시 원격 세션도 종료됨)"""
+        if self._done.is_set() or self._proc.poll() is not None:
+            return
+        self.cancel_reason = reason
+        if self._log: Log.w(f"SSH 작업 취소 ({reason}): {' '.join(self.ssh_command)}")
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+
+    def result(self) -> SSHResult:
+        if not self._done.is_set():
+            raise RuntimeError("SSH 작업이 아직 실행 중입니다.")
+        stderr = "\n".join(self._tails["stderr"]).strip()
+        if self.cancel_reason:
+            stderr = f"{stderr}\n[작업 취소: {self.cancel_reason}]".strip()
+        return {
+            "returncode": self._proc.returncode,
+            "stdout": "\n".join(self._tails["stdout"]).strip(),
+            "stderr": stderr,
+        }
+
+    def __iter__(self) -> Iterator[tuple[StreamName, str]]:
+        if self._queue is None:
+            raise RuntimeError("이터레이터로 소비하려면 SSHExecutor.stream()으로 작업을 시작하세요.")
+        if self._exhausted:
+            return
+        finished_readers = 0
+        while finished_readers < len(self._readers):
+            item = self._queue.get()
+            if item is _END:
+                finished_readers += 1
+                continue
+            yield item  # type: ignore
+        self._exhausted = True
+        self._done.wait()
+
+    async def __aiter__(self) -> AsyncIterator[tuple[StreamName, str]]:
+        import asyncio
+        iterator = iter(self)
+        while True:
+            item = await asyncio.to_thread(next, iterator, _END)
+            if item is _END:
+                return
+            yield item  # type: ignore
+
+    def _read(self, name: StreamName, pipe) -> None:
+        try:
+            for raw_line in pipe:
+                line = raw_line.rstrip("\r\n")
+                self.last_output_at = time.time()
+                self._tails[name].append(line)
+                if self.on_line:
+                    try:
+                        self.on_line(name, line)
+                    except Exception as e:
+                        Log.w(f"출력 콜백 오류: {e}")
+                if self._queue is not None:
+                    self._queue.put((name, line))
+        finally:
+            pipe.close()
+            if self._queue is not None:
+                self._queue.put(_END)
+
+    def _watch(self) -> None:
+        while self._proc.poll() is None:
+            now = time.time()
+            if self.timeout is not None and now - self.started_at > self.timeout:
+                self.cancel(reason=f"timeout {self.timeout}s")
+            elif self.idle_timeout is not None and now - self.last_output_at > self.idle_timeout:
+                self.cancel(reason=f"{self.idle_timeout}s 동안 출력 없음")
+            time.sleep(0.2)
+
+        for reader in self._readers:
+            reader.join()
+        self._done.set()
+
+        if self._log:
+            if self._proc.returncode != 0:
+                Log.w(f"[SSH 작업 오류] returncode={self._proc.returncode}, {self.result()['stderr'][-500:]}")
+            else:
+                Log.i(f"[SSH 작업 완료] ({time.time() - self.started_at:.2f}s)")
@@ -1,9 +1,16 @@
 from .ssh_profile import SSHProfile
 from .ssh_executor import SSHExecutor
+from .known_hosts_manager import KnownHostsManager
+from .container_profile import ContainerProfile
 from .logger import Log
+from typing import Optional
 import os
 from pathlib import Path
 import subprocess
+import threading
+import hashlib
+import shlex
+import re
 
 class SSHKeyProvisioner:
     def __init__(self, key_name: str = "id_pod_sync", key_dir: str = "~/.ssh"):
@@ -12,7 +19,16 @@ class SSHKeyProvisioner:
         self.private_key_path = self.key_dir / self.key_name
         self.public_key_path = self.key_dir / f"{self.key_name}.pub"
 
-    def generate_keypair(self) -> tuple[str, str]:
+    def generate_keypair(self, overwrite: bool = False) -> tuple[str, str]:
+        """
+        키 쌍 생성. 이미 있으면 그대로 재사용
+
+        :param overwrite: 참이면 기존 키를 지우고 새로 생성 (이 키를 쓰던 pod/컨테이너의 접속이 끊김)
+        """
+        if not overwrite and self.private_key_path.exists() and self.public_key_path.exists():
+            Log.v(f"기존 키 재사용: {self.private_key_path}")
+            return str(self.private_key_path), str(self.public_key_path)
+
         # 기존 키 파일이 있으면 삭제
         if self.private_key_path.exists(): self.private_key_path.unlink()
         if self.public_key_path.exists(): self.public_key_path.unlink()
@@ -23,7 +39,7 @@ class SSHKeyProvisioner:
             "-t", "ed25519",
             "-f", str(self.private_key_path),
             "-N", "",
-            "-C", "pod sync key"
+            "-C", f"pod sync key ({self.key_name})"
         ]
         Log.v(f"키 생성: {' '.join(cmd)}")
         result = subprocess.run(cmd, capture_output=True, text=True)
@@ -42,9 +58,20 @@ class SSHKeyProvisioner:
         with open(public_key_path, "r", encoding="utf-8") as f:
             public_key = f.read().strip()
 
-        remote_cmd = f"echo '{public_key}' >> ~/.ssh/authorized_keys"
+        # pod의 호스트 키를 먼저 고정해 엄격한 호스트 키 검사로 접속
+        if not KnownHostsManager.pin([(ssh_profile["hostname"], ssh_profile["port"])]):
+            Log.e(f"pod 호스트 키 수집 실패: {ssh_profile['hostname']}:{ssh_profile['port']}")
+            raise RuntimeError("pod 호스트 키 수집 실패")
+
         Log.v("pod에 공개키 추가 중...")
-        executor.execute(remote_cmd, StrictHostKeyChecking=False)
+        results = executor.execute_batch([
+            "mkdir -p ~/.ssh && chmod 700 ~/.ssh",
+            f"grep -qxF {shlex.quote(public_key)} ~/.ssh/authorized_keys 2>/dev/null || echo {shlex.quote(public_key)} >> ~/.ssh/authorized_keys",
+            "chmod 600 ~/.ssh/authorized_keys",
+        ], stop_on_error=True)
+        if len(results) < 3 or results[-1]["returncode"] != 0:
+            Log.e(f"pod에 공개키 추가 실패: {results[-1]['stderr'] if results else ''}")
+            raise RuntimeError("pod에 공개키 추가 실패")
 
     def upload_private_key_to_container(self, ssh_profile: SSHProfile, private_key_path: str | None = None) -> None:
         private_key_path = private_key_path or str(self.private_key_path)
@@ -56,6 +83,81 @@ class SSHKeyProvisioner:
             Log.e("컨테이너로 개인키 업로드 실패")
             raise RuntimeError("컨테이너로 개인키 업로드 실패")
 
-        # 권한 설정
-        executor.execute(f"chmod 600 {remote_path}/*")
+        # 권한 설정 (개인키만 600, 디렉터리는 700)
+        key_file = f"{remote_path}/{os.path.basename(private_key_path)}"
+        results = executor.execute_batch([f"chmod 700 {remote_path}", f"chmod 600 {key_file}"])
+        failed = [r for r in results if r["returncode"] != 0]
+        if failed:
+            Log.w(f"개인키 권한 설정 실패: {failed[0]['stderr']}")
         Log.v("컨테이너에 개인키 전송 완료")
+
+
+class SyncKeyRegistry:
+    """
+    동기화 대상 컨테이너별 키 쌍 관리 (pod → 컨테이너 동기화용)
+
+    - 키는 (호스트, 컨테이너)마다 하나씩 만들어 ~/.ssh/dolab_sync/에 두고 계속 재사용
+    - 같은 컨테이너로 동기화하는 pod들은 같은 키를 쓰므로 여러 pod가 동시에 연결되어도 서로의 키를 무효화하지 않음
+    - 공개키는 pod 생성 시 RunPod의 PUBLIC_KEY 환경변수로 넘기고, 개인키는 컨테이너에 없거나 다를 때만 업로드
+    """
+    _default: Optional["SyncKeyRegistry"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, key_dir: str = "~/.ssh/dolab_sync"):
+        self.key_dir = key_dir
+        self._keys: dict[tuple[str, str], SSHKeyProvisioner] = {}
+        self._public_keys: dict[tuple[str, str], str] = {}
+        self._key_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "SyncKeyRegistry":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def key_name(host: str, container: str) -> str:
+        return "id_sync_" + re.sub(r"[^A-Za-z0-9_.-]", "_", f"{host}_{container}")
+
+    def key_for(self, host: str, container: str) -> SSHKeyProvisioner:
+        """컨테이너용 키 쌍 (없으면 생성)"""
+        with self._key_lock(host, container):
+            provisioner = self._keys.get((host, container))
+            if provisioner is None:
+                provisioner = SSHKeyProvisioner(key_name=self.key_name(host, container), key_dir=self.key_dir)
+                provisioner.generate_keypair()
+                self._keys[(host, container)] = provisioner
+            return provisioner
+
+    def public_key(self, host: str, container: str) -> str:
+        """PUBLIC_KEY 환경변수/authorized_keys에 넣을 공개키 한 줄"""
+        provisioner = self.key_for(host, container)
+        with self._lock:
+            if (host, container) not in self._public_keys:
+                self._public_keys[(host, container)] = provisioner.public_key_path.read_text(encoding="utf-8").strip()
+            return self._public_keys[(host, container)]
+
+    def install_private_key(self, container: ContainerProfile) -> str:
+        """
+        컨테이너에 개인키를 두고 컨테이너 안의 경로 반환
+
+        이미 같은 키가 있으면(sha256 비교) 업로드하지 않는다.
+        """
+        host = container["host_profile"]["host"]
+        provisioner = self.key_for(host, container["name"])
+        remote_path = f"~/.ssh/{provisioner.key_name}"
+        local_hash = hashlib.sha256(provisioner.private_key_path.read_bytes()).hexdigest()
+
+        with self._key_lock(host, container["name"]):
+            result = SSHExecutor(container["container_profile"]).execute(f"sha256sum {remote_path} 2>/dev/null", log=False)
+            if result["returncode"] == 0 and result["stdout"].split()[:1] == [local_hash]:
+                Log.v(f"컨테이너에 동기화 키가 이미 있음: {container['name']}:{remote_path}")
+            else:
+                provisioner.upload_private_key_to_container(container["container_profile"], str(provisioner.private_key_path))
+        return remote_path
+
+    def _key_lock(self, host: str, container: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault((host, container), threading.Lock())
@@ -1,6 +1,7 @@
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 class SSHResult(TypedDict):
     returncode: int
     stdout: str
-    stderr: str
\ No newline at end of file
+    stderr: str
+    duration: NotRequired[float]  # 실행 시간(초). execute_batch 결과에만 포함
@@ -0,0 +1,385 @@
+from .logger import Log
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, TYPE_CHECKING, NamedTuple
+import subprocess
+import threading
+import tempfile
+import tarfile
+import hashlib
+import shutil
+import shlex
+import uuid
+import time
+import os
+
+if TYPE_CHECKING:
+    from .ssh_executor import SSHExecutor
+
+
+CHUNK_THRESHOLD = 64 * 1024 * 1024      # 이 크기 이상인 파일은 병렬 청크 스트림으로 전송
+MIN_CHUNK_SIZE = 16 * 1024 * 1024
+IO_BLOCK_SIZE = 1024 * 1024
+
+
+class _LocalFile(NamedTuple):
+    path: str       # 로컬 경로
+    arcname: str    # 원격 기준 상대 경로 (최상위 이름 포함, '/' 구분)
+    size: int
+
+
+class _HashingReader:
+    """읽은 내용으로 sha256을 계산하는 파일 래퍼 (파일을 한 번만 읽기 위함)"""
+
+    def __init__(self, f: IO[bytes]):
+        self._f = f
+        self.digest = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self.digest.update(data)
+        return data
+
+
+def _remote_path_expr(path: str) -> str:
+    """원격 셸에서 사용할 경로 표현 ('~'는 $HOME으로 확장되도록 처리)"""
+    if path == "~":
+        return '"$HOME"'
+    if path.startswith("~/"):
+        return '"$HOME"/' + shlex.quote(path[2:])
+    return shlex.quote(path)
+
+
+# 원격 경로 해석: dest가 디렉터리면 그 안에, 아니면 dest 경로 자체로 배치 (scp -r 규칙)
+# 같은 파일시스템의 staging 디렉터리에 풀어 검증한 뒤 rename으로 반영한다.
+_REMOTE_PRELUDE = """set -e
+dest={dest}
+if [ -d "$dest" ]; then mode=dir; root="$dest"; else mode=path; root=$(dirname "$dest"); mkdir -p "$root"; fi
+"""
+
+_REMOTE_FINALIZE = """cd "$stage"
+sha256sum -c --quiet {sums}
+rm -f {sums}
+src="$stage"/{name}
+if [ "$mode" = dir ]; then tgt="$dest"/{name}; else tgt="$dest"; fi
+if [ -d "$src" ] && [ -d "$tgt" ]; then
+    (cd "$src" && find . -type d -exec mkdir -p "$tgt/{{}}" \\; && find . ! -type d -exec mv -f {{}} "$tgt/{{}}" \\;)
+else
+    mv -f "$src" "$tgt"
+fi
+rm -rf "$stage"
+"""
+
+
+class SSHTransfer:
+    """
+    SSH 기반 파일 전송 엔진
+
+    - 작은 파일들은 하나의 tar 스트림으로 묶어 단일 채널로 전송
+    - CHUNK_THRESHOLD 이상인 파일은 여러 청크로 나눠 병렬 SSH 스트림으로 전송
+    - 전송한 파일의 sha256 목록을 함께 보내 원격에서 검증 후 반영
+    """
+
+    def __init__(self, executor: "SSHExecutor", compress: bool = False,
+                 chunk_threshold: int = CHUNK_THRESHOLD, max_streams: int = 4):
+        self.executor = executor
+        self.compress = compress
+        self.chunk_threshold = chunk_threshold
+        self.max_streams = max(1, max_streams)
+
+    def upload(self, local_path: str, remote_path: str) -> bool:
+        files, dirs = self._collect_local(local_path)
+        name = os.path.basename(os.path.normpath(local_path))
+        large_files = [f for f in files if f.size >= self.chunk_threshold]
+        small_files = [f for f in files if f.size < self.chunk_threshold]
+        sums_name = f".dolab_sha256sums.{uuid.uuid4().hex}"
+        total_size = sum(f.size for f in files)
+
+        step_id = Log.start(f"업로드: {local_path} → {remote_path} (파일 {len(files)}개, {total_size} bytes, 대용량 {len(large_files)}개)")
+        start = time.perf_counter()
+        try:
+            if not large_files:
+                script = (_REMOTE_PRELUDE.format(dest=_remote_path_expr(remote_path))
+                          + 'stage=$(mktemp -d "$root/.dolab_upload.XXXXXX")\n'
+                          + "trap 'rm -rf \"$stage\"' EXIT\n"
+                          + 'tar -xf - -C "$stage"\n'
+                          + _REMOTE_FINALIZE.format(sums=shlex.quote(sums_name), name=shlex.quote(name)))
+                ok = self._send_tar(script, small_files, dirs, sums_name, large_files=[])
+            else:
+                ok = self._upload_with_chunks(remote_path, name, small_files, large_files, dirs, sums_name)
+        except Exception as e:
+            Log.e(f"업로드 중 예외 발생: {e}")
+            raise RuntimeError(f"업로드 실패: {e}")
+        finally:
+            Log.end(step_id=step_id)
+
+        if not ok:
+            Log.w(f"[업로드 실패] {local_path} → {remote_path}")
+            return False
+
+        elapsed = time.perf_counter() - start
+        Log.i(f"[업로드 성공] {local_path} → {remote_path} ({total_size / max(elapsed, 1e-6) / 1024 / 1024:.1f} MB/s)")
+        return True
+
+    def download(self, remote_path: str, local_path: str) -> bool:
+        script = f"""set -e
+src={_remote_path_expr(remote_path.rstrip("/") or "/")}
+cd "$(dirname "$src")"
+name=$(basename "$src")
+tmp=$(mktemp -d)
+trap 'rm -rf "$tmp"' EXIT
+find "$name" -type f -print0 | xargs -0 -r sha256sum > "$tmp/.dolab_sha256sums"
+tar -cf - "$name" -C "$tmp" .dolab_sha256sums
+"""
+        step_id = Log.start(f"다운로드: {remote_path} → {local_path}")
+        cmd = self.executor.build_ssh_command(compress=self.compress) + [script]
+        Log.d(f"다운로드 명령: {' '.join(cmd[:-1])}")
+
+        local_parent = local_path if os.path.isdir(local_path) else os.path.dirname(os.path.abspath(local_path))
+        os.makedirs(local_parent, exist_ok=True)
+        stage = tempfile.mkdtemp(prefix=".dolab_download.", dir=local_parent)
+        try:
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            stderr_chunks: list[bytes] = []
+            stderr_thread = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)  # type: ignore
+            stderr_thread.start()
+
+            digests: dict[str, str] = {}
+            expected: dict[str, str] = {}
+            top_name = None
+            with tarfile.open(fileobj=proc.stdout, mode="r|") as tar:
+                for member in tar:
+                    if member.name == ".dolab_sha256sums":
+                        content = tar.extractfile(member).read().decode("utf-8")  # type: ignore
+                        for line in content.splitlines():
+                            digest, path = line.split(None, 1)
+                            expected[path.lstrip("*")] = digest
+                        continue
+                    target = self._safe_local_path(stage, member.name)
+                    top_name = top_name or member.name.split("/")[0]
+                    if member.isdir():
+                        os.makedirs(target, exist_ok=True)
+                    elif member.isfile():
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        source = tar.extractfile(member)
+                        digest = hashlib.sha256()
+                        with open(target, "wb") as f:
+                            for block in iter(lambda: source.read(IO_BLOCK_SIZE), b""):  # type: ignore
+                                digest.update(block)
+                                f.write(block)
+                        digests[member.name] = digest.hexdigest()
+                        os.chmod(target, member.mode & 0o777)
+            proc.wait()
+            stderr_thread.join()
+
+            if proc.returncode != 0 or not top_name:
+                Log.w(f"[다운로드 오류] {b''.join(stderr_chunks).decode(errors='replace').strip()}")
+                return False
+            if digests != expected:
+                mismatched = sorted(set(digests.items()) ^ set(expected.items()))
+                Log.w(f"[다운로드 검증 실패] checksum 불일치: {mismatched[:5]}")
+                return False
+
+            target = os.path.join(local_path, top_name) if os.path.isdir(local_path) else local_path
+            _merge_local(os.path.join(stage, top_name), target)
+            Log.i(f"[다운로드 성공] {remote_path} → {target}")
+            return True
+        finally:
+            _remove_tree(stage)
+            Log.end(step_id=step_id)
+
+    def _upload_with_chunks(self, remote_path: str, name: str, small_files: list[_LocalFile],
+                            large_files: list[_LocalFile], dirs: list[str], sums_name: str) -> bool:
+        # 1) staging 디렉터리 생성 (모든 스트림이 같은 위치에 기록하도록 경로를 먼저 확정)
+        prepare = (_REMOTE_PRELUDE.format(dest=_remote_path_expr(remote_path))
+                   + 'stage=$(mktemp -d "$root/.dolab_upload.XXXXXX")\n'
+                   + 'echo "$mode"\necho "$stage"\n')
+        result = self.executor.execute(prepare, log=False)
+        if result["returncode"] != 0:
+            Log.w(f"[업로드 준비 실패] {result['stderr']}")
+            return False
+        mode, stage = result["stdout"].splitlines()[-2:]
+        stage_expr = shlex.quote(stage)
+
+        # 2) tar 스트림과 청크 스트림을 병렬 전송
+        chunks: list[tuple[_LocalFile, int, int]] = []
+        for f in large_files:
+            chunk_size = max(MIN_CHUNK_SIZE, -(-f.size // self.max_streams))
+            chunk_size = -(-chunk_size // IO_BLOCK_SIZE) * IO_BLOCK_SIZE
+            chunks += [(f, offset, min(chunk_size, f.size - offset)) for offset in range(0, f.size, chunk_size)]
+
+        tar_script = f"set -e\ntar -xf - -C {stage_expr}\n"
+        with ThreadPoolExecutor(max_workers=self.max_streams + 1) as pool:
+            tar_future = pool.submit(self._send_tar, tar_script, small_files, dirs, sums_name, large_files)
+            chunk_futures = [pool.submit(self._send_chunk, stage, f, offset, length) for f, offset, length in chunks]
+            ok = tar_future.result()
+            ok = all([future.result() for future in chunk_futures]) and ok
+
+        # 3) 검증 및 반영 (실패 시 staging 정리)
+        finalize = (f"set -e\ndest={_remote_path_expr(remote_path)}\nmode={shlex.quote(mode)}\nstage={stage_expr}\n"
+                    + ("" if ok else 'rm -rf "$stage"\nexit 1\n')
+                    + _REMOTE_FINALIZE.format(sums=shlex.quote(sums_name), name=shlex.quote(name)))
+        result = self.executor.execute(finalize, log=False)
+        if result["returncode"] != 0:
+            Log.w(f"[업로드 검증 실패] {result['stderr']}")
+            return False
+        return ok
+
+    def _send_tar(self, script: str, files: list[_LocalFile], dirs: list[str], sums_name: str,
+                  large_files: list[_LocalFile]) -> bool:
+        cmd = self.executor.build_ssh_command(compress=self.compress) + [script]
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output: dict[str, bytes] = {}
+        readers = [threading.Thread(target=lambda key=key, pipe=pipe: output.__setitem__(key, pipe.read()), daemon=True)
+                   for key, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr))]
+        for reader in readers:
+            reader.start()
+
+        sums: list[str] = []
+        try:
+            with tarfile.open(fileobj=proc.stdin, mode="w|", format=tarfile.PAX_FORMAT) as tar:  # type: ignore
+                for arcname in dirs:
+                    tar.addfile(_dir_info(arcname))
+                for f in files:
+                    with open(f.path, "rb") as fp:
+                        reader = _HashingReader(fp)
+                        tar.addfile(_file_info(f), fileobj=reader)  # type: ignore
+                    sums.append(f"{reader.digest.hexdigest()}  {f.arcname}")
+                # 대용량 파일은 청크 스트림과 별도로 로컬에서 해시 계산
+                for f in large_files:
+                    sums.append(f"{_sha256_file(f.path)}  {f.arcname}")
+
+                content = ("\n".join(sums) + "\n").encode("utf-8")
+                info = tarfile.TarInfo(sums_name)
+                info.size = len(content)
+                info.mtime = int(time.time())
+                tar.addfile(info, fileobj=_BytesReader(content))  # type: ignore
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                proc.stdin.close()  # type: ignore
+            except BrokenPipeError:
+                pass
+
+        proc.wait()
+        for reader in readers:
+            reader.join()
+        if proc.returncode != 0:
+            Log.w(f"[tar 스트림 오류] {output.get('stderr', b'').decode(errors='replace').strip()}")
+            return False
+        return True
+
+    def _send_chunk(self, stage: str, f: _LocalFile, offset: int, length: int) -> bool:
+        remote_file = shlex.quote(f"{stage}/{f.arcname}")
+        script = (f"mkdir -p \"$(dirname {remote_file})\" && "
+                  f"dd of={remote_file} bs={IO_BLOCK_SIZE} seek={offset} oflag=seek_bytes conv=notrunc status=none")
+        cmd = self.executor.build_ssh_command(compress=self.compress) + [script]
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        stderr_chunks: list[bytes] = []
+        stderr_thread = threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True)  # type: ignore
+        stderr_thread.start()
+
+        try:
+            with open(f.path, "rb") as fp:
+                fp.seek(offset)
+                remaining = length
+                while remaining > 0:
+                    block = fp.read(min(IO_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    proc.stdin.write(block)  # type: ignore
+                    remaining -= len(block)
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                proc.stdin.close()  # type: ignore
+            except BrokenPipeError:
+                pass
+
+        proc.wait()
+        stderr_thread.join()
+        if proc.returncode != 0:
+            Log.w(f"[청크 전송 오류] {f.arcname}@{offset}: {b''.join(stderr_chunks).decode(errors='replace').strip()}")
+            return False
+        return True
+
+    def _collect_local(self, local_path: str) -> tuple[list[_LocalFile], list[str]]:
+        local_path = os.path.normpath(local_path)
+        name = os.path.basename(local_path)
+        if os.path.isfile(local_path):
+            return [_LocalFile(local_path, name, os.path.getsize(local_path))], []
+
+        files: list[_LocalFile] = []
+        dirs: list[str] = [name]
+        for current, dir_names, file_names in os.walk(local_path):
+            rel = os.path.relpath(current, local_path)
+            prefix = name if rel == "." else f"{name}/{rel.replace(os.sep, '/')}"
+            dirs += [f"{prefix}/{d}" for d in sorted(dir_names)]
+            for file_name in sorted(file_names):
+                path = os.path.join(current, file_name)
+                if os.path.isfile(path):
+                    files.append(_LocalFile(path, f"{prefix}/{file_name}", os.path.getsize(path)))
+        return files, dirs
+
+    @staticmethod
+    def _safe_local_path(root: str, name: str) -> str:
+        target = os.path.normpath(os.path.join(root, name))
+        if os.path.isabs(name) or not target.startswith(os.path.normpath(root) + os.sep):
+            raise RuntimeError(f"허용되지 않는 경로가 포함되어 있습니다: {name}")
+        return target
+
+
+class _BytesReader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._data) if size < 0 else self._pos + size
+        chunk = self._data[self._pos:end]
+        self._pos += len(chunk)
+        return chunk
+
+
+def _dir_info(arcname: str) -> tarfile.TarInfo:
+    info = tarfile.TarInfo(arcname)
+    info.type = tarfile.DIRTYPE
+    info.mode = 0o755
+    info.mtime = int(time.time())
+    return info
+
+
+def _file_info(f: _LocalFile) -> tarfile.TarInfo:
+    stat = os.stat(f.path)
+    info = tarfile.TarInfo(f.arcname)
+    info.size = f.size
+    info.mtime = int(stat.st_mtime)
+    # Windows에서는 실행 권한 정보가 없으므로 기본 권한 사용
+    info.mode = stat.st_mode & 0o777 if os.name != "nt" else 0o644
+    return info
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(IO_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _merge_local(src: str, target: str) -> None:
+    """staging 결과를 대상 경로에 반영 (디렉터리끼리는 병합, 그 외는 교체)"""
+    if os.path.isdir(src) and os.path.isdir(target):
+        for current, dir_names, file_names in os.walk(src):
+            rel = os.path.relpath(current, src)
+            dest_dir = os.path.normpath(os.path.join(target, rel))
+            os.makedirs(dest_dir, exist_ok=True)
+            for file_name in file_names:
+                os.replace(os.path.join(current, file_name), os.path.join(dest_dir, file_name))
+    else:
+        os.replace(src, target)
+
+
+def _remove_tree(path: str) -> None:
+    shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,43 @@
+from typing import Optional, TypedDict
+from .runpod_profile import RunPodProfile
+
+class PodRecord(TypedDict):
+    id: str
+    name: str
+    image_name: str
+    gpu_display_name: str
+    gpu_count: int
+    cost_per_hr: float
+    desired_status: str
+    profile: Optional[RunPodProfile]   # SSH 포트가 열리기 전(준비 중)이면 None
+    created_at: float
+    updated_at: float
+    terminated_at: Optional[float]
+
+class SyncLink(TypedDict):
+    pod_id: str
+    host: str                 # 동기화 대상 컨테이너가 있는 호스트 (~/.ssh/config Host 별칭)
+    container: str
+    key_path: str             # 로컬에 생성된 동기화용 개인키
+    container_key_path: str   # 컨테이너에 업로드된 개인키 경로
+    created_at: float
+    removed_at: Optional[float]
+
+class PodUsage(TypedDict):
+    id: str
+    name: str
+    gpu_display_name: str
+    gpu_count: int
+    cost_per_hr: float
+    created_at: float
+    terminated_at: Optional[float]   # None이면 실행 중 (현재 시각까지 계산)
+    hours: float
+    cost: float
+
+class HistoryEntry(TypedDict):
+    ts: float
+    entity: str      # container | pod | sync
+    entity_id: str   # 컨테이너 이름 또는 pod ID
+    host: str        # 컨테이너 호스트 (pod는 빈 문자열)
+    action: str      # create | start | stop | delete | terminate | link ...
+    detail: str
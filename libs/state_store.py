@@ -0,0 +1,406 @@
+from .logger import Log
+from .container_profile import ContainerProfile
+from .runpod_profile import RunPodProfile
+from .state_record import HistoryEntry, PodRecord, PodUsage, SyncLink
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Literal, Optional
+from pathlib import Path
+import threading
+import sqlite3
+import json
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS containers (
+    host        TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    image       TEXT NOT NULL DEFAULT '',
+    ssh_port    TEXT NOT NULL DEFAULT '',
+    status      TEXT NOT NULL DEFAULT '',
+    profile     TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    removed_at  REAL,
+    PRIMARY KEY (host, name)
+);
+CREATE TABLE IF NOT EXISTS pods (
+    id                TEXT PRIMARY KEY,
+    name              TEXT NOT NULL DEFAULT '',
+    image_name        TEXT NOT NULL DEFAULT '',
+    gpu_display_name  TEXT NOT NULL DEFAULT '',
+    gpu_count         INTEGER NOT NULL DEFAULT 0,
+    cost_per_hr       REAL NOT NULL DEFAULT 0,
+    desired_status    TEXT NOT NULL DEFAULT '',
+    profile           TEXT,
+    created_at        REAL NOT NULL,
+    updated_at        REAL NOT NULL,
+    terminated_at     REAL
+);
+CREATE TABLE IF NOT EXISTS sync_links (
+    pod_id              TEXT NOT NULL,
+    host                TEXT NOT NULL,
+    container           TEXT NOT NULL,
+    key_path            TEXT NOT NULL DEFAULT '',
+    container_key_path  TEXT NOT NULL DEFAULT '',
+    created_at          REAL NOT NULL,
+    removed_at          REAL,
+    PRIMARY KEY (pod_id, host, container)
+);
+CREATE TABLE IF NOT EXISTS history (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts         REAL NOT NULL,
+    entity     TEXT NOT NULL,
+    entity_id  TEXT NOT NULL,
+    host       TEXT NOT NULL DEFAULT '',
+    action     TEXT NOT NULL,
+    detail     TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS history_entity ON history (entity, entity_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope      TEXT PRIMARY KEY,
+    synced_at  REAL NOT NULL
+);
+"""
+
+
+class StateStore:
+    """
+    컨테이너/pod/동기화 관계를 로컬 SQLite에 보관하는 상태 저장소
+
+    - 메뉴의 목록은 여기서 바로 읽고, 원격(docker ps, runpod.get_pods) 조회 결과로 백그라운드에서 맞춤
+    - 생성/시작/정지/삭제/종료는 history에 남겨 어디서 무엇이 얼마의 비용으로 실행됐는지 조회 가능
+    - WAL 모드라 여러 프로세스가 동시에 열어도 읽기가 막히지 않음
+    """
+
+    _default: Optional["StateStore"] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str | Path = "./.config/state.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._reconciling: set[str] = set()
+        self._reconcile_lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def default(cls) -> "StateStore":
+        """프로세스 전체에서 공유하는 기본 저장소 (./.config/state.db)"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------------------------------------------------------------- 컨테이너
+
+    def record_container(self, host: str, profile: ContainerProfile, status: str = "", action: str = "") -> None:
+        """컨테이너 정보 저장. action을 주면 history에도 기록"""
+        now = time.time()
+        with self._transaction() as conn:
+            self._upsert_container(conn, host, profile, status, now)
+            if action:
+                self._add_history(conn, now, "container", profile["name"], host, action, profile["image_address"])
+
+    def set_container_status(self, host: str, names: Iterable[str], status: str, action: str = "") -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            for name in names:
+                conn.execute(
+                    "UPDATE containers SET status = ?, updated_at = ? WHERE host = ? AND name = ? AND removed_at IS NULL",
+                    (status, now, host, name))
+                if action:
+                    self._add_history(conn, now, "container", name, host, action, status)
+
+    def mark_containers_removed(self, host: str, names: Iterable[str]) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            for name in names:
+                conn.execute(
+                    "UPDATE containers SET status = 'removed', updated_at = ?, removed_at = ? WHERE host = ? AND name = ? AND removed_at IS NULL",
+                    (now, now, host, name))
+                conn.execute(
+                    "UPDATE sync_links SET removed_at = ? WHERE host = ? AND container = ? AND removed_at IS NULL", (now, host, name))
+                self._add_history(conn, now, "container", name, host, "delete", "")
+
+    def sync_containers(self, host: str, containers: list[tuple[ContainerProfile, str]]) -> None:
+        """
+        원격에서 조회한 해당 호스트의 전체 컨테이너 목록으로 저장소를 맞춤
+
+        :param containers: [(ContainerProfile, 상태), ...]. 목록에 없는 컨테이너는 삭제된 것으로 처리
+        """
+        now = time.time()
+        names = {profile["name"] for profile, _ in containers}
+        with self._transaction() as conn:
+            for profile, status in containers:
+                self._upsert_container(conn, host, profile, status, now)
+            rows = conn.execute("SELECT name FROM containers WHERE host = ? AND removed_at IS NULL", (host,)).fetchall()
+            for row in rows:
+                if row["name"] not in names:
+                    conn.execute(
+                        "UPDATE containers SET status = 'removed', updated_at = ?, removed_at = ? WHERE host = ? AND name = ?",
+                        (now, now, host, row["name"]))
+                    conn.execute(
+                        "UPDATE sync_links SET removed_at = ? WHERE host = ? AND container = ? AND removed_at IS NULL", (now, host, row["name"]))
+                    self._add_history(conn, now, "container", row["name"], host, "disappear", "원격 목록에 없음")
+            self._set_synced(conn, f"containers:{host}", now)
+
+    def get_containers(self, host: str, status: Literal["running", "all", "exited"] = "all") -> list[ContainerProfile]:
+        query = "SELECT profile FROM containers WHERE host = ? AND removed_at IS NULL"
+        params: list[Any] = [host]
+        if status != "all":
+            query += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY name", params).fetchall()
+        return [json.loads(row["profile"]) for row in rows]
+
+    # ---------------------------------------------------------------- pod
+
+    def record_pod(self, pod: RunPodProfile, action: str = "") -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            self._upsert_pod(conn, self.pod_record(pod), now)
+            if action:
+                self._add_history(conn, now, "pod", pod["id"], "", action, f"{pod['gpu_count']}x {pod['gpu_display_name']}, ${pod['cost_per_hr']}/hr")
+
+    def mark_pod_terminated(self, pod_id: str) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE pods SET desired_status = 'TERMINATED', updated_at = ?, terminated_at = ? WHERE id = ? AND terminated_at IS NULL",
+                (now, now, pod_id))
+            conn.execute("UPDATE sync_links SET removed_at = ? WHERE pod_id = ? AND removed_at IS NULL", (now, pod_id))
+            self._add_history(conn, now, "pod", pod_id, "", "terminate", "")
+
+    def sync_pods(self, pods: list[PodRecord]) -> None:
+        """계정의 전체 pod 목록으로 저장소를 맞춤. 목록에 없는 pod는 종료된 것으로 처리"""
+        now = time.time()
+        ids = {pod["id"] for pod in pods}
+        with self._transaction() as conn:
+            for pod in pods:
+                self._upsert_pod(conn, pod, now)
+            rows = conn.execute("SELECT id FROM pods WHERE terminated_at IS NULL").fetchall()
+            for row in rows:
+                if row["id"] not in ids:
+                    conn.execute(
+                        "UPDATE pods SET desired_status = 'TERMINATED', updated_at = ?, terminated_at = ? WHERE id = ?", (now, now, row["id"]))
+                    conn.execute("UPDATE sync_links SET removed_at = ? WHERE pod_id = ? AND removed_at IS NULL", (now, row["id"]))
+                    self._add_history(conn, now, "pod", row["id"], "", "disappear", "RunPod 목록에 없음")
+            self._set_synced(conn, "pods", now)
+
+    def get_pods(self, include_terminated: bool = False) -> list[PodRecord]:
+        query = "SELECT * FROM pods"
+        if not include_terminated:
+            query += " WHERE terminated_at IS NULL"
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at").fetchall()
+        return [self._pod_from_row(row) for row in rows]
+
+    def get_pod(self, pod_id: str) -> Optional[PodRecord]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM pods WHERE id = ?", (pod_id,)).fetchone()
+        return self._pod_from_row(row) if row else None
+
+    @staticmethod
+    def pod_record(pod: RunPodProfile) -> PodRecord:
+        return {
+            "id": pod["id"],
+            "name": pod["name"],
+            "image_name": pod["image_name"],
+            "gpu_display_name": pod["gpu_display_name"],
+            "gpu_count": pod["gpu_count"],
+            "cost_per_hr": pod["cost_per_hr"],
+            "desired_status": pod["desired_status"],
+            "profile": pod,
+            "created_at": 0.0,
+            "updated_at": 0.0,
+            "terminated_at": None,
+        }
+
+    # ---------------------------------------------------------------- 동기화 관계
+
+    def link_sync(self, pod_id: str, host: str, container: str, key_path: str, container_key_path: str) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO sync_links (pod_id, host, container, key_path, container_key_path, created_at, removed_at)
+                VALUES (?, ?, ?, ?, ?, ?, NULL)
+                ON CONFLICT (pod_id, host, container) DO UPDATE SET
+                    key_path = excluded.key_path, container_key_path = excluded.container_key_path, removed_at = NULL
+                """,
+                (pod_id, host, container, key_path, container_key_path, now))
+            self._add_history(conn, now, "sync", pod_id, host, "link", container)
+
+    def unlink_sync(self, pod_id: str, host: str, container: str) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE sync_links SET removed_at = ? WHERE pod_id = ? AND host = ? AND container = ? AND removed_at IS NULL",
+                (now, pod_id, host, container))
+            self._add_history(conn, now, "sync", pod_id, host, "unlink", container)
+
+    def get_sync_links(
+        self,
+        pod_id: Optional[str] = None,
+        host: Optional[str] = None,
+        container: Optional[str] = None,
+        include_removed: bool = False
+    ) -> list[SyncLink]:
+        conditions, params = [], []
+        for column, value in (("pod_id", pod_id), ("host", host), ("container", container)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if not include_removed:
+            conditions.append("removed_at IS NULL")
+        query = "SELECT * FROM sync_links" + (f" WHERE {' AND '.join(conditions)}" if conditions else "")
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at", params).fetchall()
+        return [dict(row) for row in rows]  # type: ignore
+
+    # ---------------------------------------------------------------- 이력/비용
+
+    def get_history(
+        self, entity: Optional[str] = None, entity_id: Optional[str] = None, since: Optional[float] = None, limit: int = 100
+    ) -> list[HistoryEntry]:
+        conditions, params = [], []
+        if entity:
+            conditions.append("entity = ?")
+            params.append(entity)
+        if entity_id:
+            conditions.append("entity_id = ?")
+            params.append(entity_id)
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        query = "SELECT ts, entity, entity_id, host, action, detail FROM history"
+        if conditions:
+            query += f" WHERE {' AND '.join(conditions)}"
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id DESC LIMIT ?", [*params, limit]).fetchall()
+        return [dict(row) for row in rows]  # type: ignore
+
+    def get_pod_usage(self, since: Optional[float] = None) -> list[PodUsage]:
+        """pod별 실행 시간과 비용 (실행 중인 pod는 현재 시각까지)"""
+        query = "SELECT id, name, gpu_display_name, gpu_count, cost_per_hr, created_at, terminated_at FROM pods"
+        params: list[Any] = []
+        if since is not None:
+            query += " WHERE terminated_at IS NULL OR terminated_at >= ?"
+            params.append(since)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at", params).fetchall()
+
+        now = time.time()
+        usage: list[PodUsage] = []
+        for row in rows:
+            start = max(row["created_at"], since) if since is not None else row["created_at"]
+            hours = max(0.0, ((row["terminated_at"] or now) - start) / 3600)
+            usage.append({**dict(row), "hours": hours, "cost": hours * row["cost_per_hr"]})  # type: ignore
+        return usage
+
+    # ---------------------------------------------------------------- 원격 동기화
+
+    def last_synced(self, scope: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute("SELECT synced_at FROM sync_state WHERE scope = ?", (scope,)).fetchone()
+        return row["synced_at"] if row else None
+
+    def reconcile_in_background(self, scope: str, func: Callable[[], Any]) -> Optional[threading.Thread]:
+        """func(원격 조회 → sync_*)를 백그라운드에서 실행. 같은 scope가 이미 실행 중이면 생략"""
+        with self._reconcile_lock:
+            if scope in self._reconciling:
+                return None
+            self._reconciling.add(scope)
+
+        def run() -> None:
+            try:
+                func()
+            except Exception as e:
+                Log.w(f"상태 동기화 실패 ({scope}): {e}")
+            finally:
+                with self._reconcile_lock:
+                    self._reconciling.discard(scope)
+
+        thread = threading.Thread(target=run, name=f"reconcile-{scope}", daemon=True)
+        thread.start()
+        return thread
+
+    # ---------------------------------------------------------------- 내부
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """잠금을 잡고 BEGIN IMMEDIATE ~ COMMIT (예외 시 ROLLBACK)"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _upsert_container(conn: sqlite3.Connection, host: str, profile: ContainerProfile, status: str, now: float) -> None:
+        conn.execute(
+            """
+            INSERT INTO containers (host, name, image, ssh_port, status, profile, created_at, updated_at, removed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)
+            ON CONFLICT (host, name) DO UPDATE SET
+                image = excluded.image,
+                ssh_port = excluded.ssh_port,
+                status = CASE WHEN excluded.status = '' THEN containers.status ELSE excluded.status END,
+                profile = excluded.profile,
+                created_at = CASE WHEN containers.removed_at IS NULL THEN containers.created_at ELSE excluded.created_at END,
+                updated_at = excluded.updated_at,
+                removed_at = NULL
+            """,
+            (host, profile["name"], profile["image_address"], profile["ssh_port"], status, json.dumps(profile), now, now))
+
+    @staticmethod
+    def _upsert_pod(conn: sqlite3.Connection, pod: PodRecord, now: float) -> None:
+        conn.execute(
+            """
+            INSERT INTO pods (id, name, image_name, gpu_display_name, gpu_count, cost_per_hr, desired_status, profile, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                name = excluded.name,
+                image_name = excluded.image_name,
+                gpu_display_name = excluded.gpu_display_name,
+                gpu_count = excluded.gpu_count,
+                cost_per_hr = excluded.cost_per_hr,
+                desired_status = excluded.desired_status,
+                profile = COALESCE(excluded.profile, pods.profile),
+                updated_at = excluded.updated_at,
+                terminated_at = NULL
+            """,
+            (pod["id"], pod["name"], pod["image_name"], pod["gpu_display_name"], pod["gpu_count"], pod["cost_per_hr"],
+             pod["desired_status"], json.dumps(pod["profile"]) if pod["profile"] else None, now, now))
+
+    @staticmethod
+    def _pod_from_row(row: sqlite3.Row) -> PodRecord:
+        record = dict(row)
+        record["profile"] = json.loads(record["profile"]) if record["profile"] else None
+        return record  # type: ignore
+
+    @staticmethod
+    def _add_history(conn: sqlite3.Connection, ts: float, entity: str, entity_id: str, host: str, action: str, detail: str) -> None:
+        conn.execute(
+            "INSERT INTO history (ts, entity, entity_id, host, action, detail) VALUES (?, ?, ?, ?, ?, ?)",
+            (ts, entity, entity_id, host, action, detail))
+
+    @staticmethod
+    def _set_synced(conn: sqlite3.Connection, scope: str, ts: float) -> None:
+        conn.execute(
+            "INSERT INTO sync_state (scope, synced_at) VALUES (?, ?) ON CONFLICT (scope) DO UPDATE SET synced_at = excluded.synced_at",
+            (scope, ts))
+
@@ -3,20 +3,30 @@ from libs.ssh_config_manager import SSHConfigManager
 from libs.logger import Log, LogLevel
 from libs.host_machine import HostMachine
 from libs.runpod_manager import RunPodManager
+import sys
 
 Log.set_console_output(False)
 Log.set_log_file("./logs")
 
 def main():
-    runpod_manager = RunPodManager()
+    runpod_manager: RunPodManager | None = None
     host_machine: HostMachine | None = None
 
+    def ensure_runpod_manager() -> RunPodManager:
+        # 설정 파일을 읽고(없으면 입력을 받고) runpod SDK를 쓰는 작업을 고를 때 생성
+        nonlocal runpod_manager
+        if not runpod_manager:
+            runpod_manager = RunPodManager()
+        return runpod_manager
+
     def ensure_host_machine() -> HostMachine:
         nonlocal host_machine
         if not host_machine:
             print("SSH 호스트가 선택되지 않았습니다. 선택이 필요합니다.")
             host_profile = cli.select_host()
-            host_machine = HostMachine(ssh_profile=host_profile)
+            backend = cli.get_cli_config(
+                key="docker_backend", prompt="Docker 제어 방식 (cli: docker CLI, api: Engine API) (기본값: cli)", default_value="cli")
+            host_machine = HostMachine(ssh_profile=host_profile, backend="api" if backend == "api" else "cli")
         return host_machine
 
     menu_options = {
@@ -28,6 +38,7 @@ def main():
         "6": "도커 이미지 DockerHub 푸시",
         "7": "Pod 생성 (RunPod)",
         "8": "Pod 제거 (RunPod)",
+        "9": "컨테이너 일괄 작업 (시작/정지/커밋/제거)",
         "0": "종료"
     }
 
@@ -61,17 +72,22 @@ def main():
                 cli.tag_and_push_to_dockerhub(host_machine=ensure_host_machine())
 
             elif choice == "7":
-                cli.create_pod(runpod_manager=runpod_manager, host_machine=ensure_host_machine())
+                cli.create_pod(runpod_manager=ensure_runpod_manager(), host_machine=ensure_host_machine())
 
             elif choice == "8":
-                pod_profile = cli.select_pods(runpod_manager)
+                pod_profile = cli.select_pods(ensure_runpod_manager())
                 if pod_profile:
-                    runpod_manager.terminate_pod(pod=pod_profile)
+                    ensure_runpod_manager().terminate_pod(pod=pod_profile)
                     SSHConfigManager.remove_profile(
                         profile=pod_profile["ssh_profile"])
 
+            elif choice == "9":
+                cli.bulk_container_operation(host_machine=ensure_host_machine())
+
             elif choice == "0":
                 print("프로그램을 종료합니다.")
+                if host_machine:
+                    host_machine.close()
                 break
 
             else:
@@ -82,4 +98,8 @@ def main():
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # 인자가 있으면 비대화형 명령 (python main.py run jobs.yaml -j 8 등)
+        from libs import commands
+        sys.exit(commands.main(sys.argv[1:]))
     main()